@@ -2,6 +2,7 @@
 import os
 import signal
 import logging
+import weakref
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import yaml
@@ -9,16 +10,46 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Environment variable values treated as true
+_TRUTHY = frozenset({'true', '1', 'yes', 'on'})
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable value."""
+    return value.lower() in _TRUTHY
+
+
 class ConfigManager:
     """Manages configuration loading and hot-reloading."""
     
+    # Live managers reloaded on SIGHUP; the process-wide handler is installed once
+    _instances: "weakref.WeakSet[ConfigManager]" = weakref.WeakSet()
+    _sighup_installed = False
+    
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = Path(config_path)
         self._config = {}
         self._callbacks = []
         
         # Set up signal handler for hot reload
-        signal.signal(signal.SIGHUP, self._handle_sighup)
+        self._register_for_sighup(self)
+    
+    @classmethod
+    def _register_for_sighup(cls, manager: "ConfigManager"):
+        """Track a manager for SIGHUP reloads, installing the handler on first use."""
+        cls._instances.add(manager)
+        if not cls._sighup_installed:
+            signal.signal(signal.SIGHUP, cls._dispatch_sighup)
+            cls._sighup_installed = True
+    
+    @classmethod
+    def _dispatch_sighup(cls, signum, frame):
+        """Fan SIGHUP out to every live ConfigManager."""
+        for manager in list(cls._instances):
+            manager._handle_sighup(signum, frame)
         
     def _handle_sighup(self, signum, frame):
         """Handle SIGHUP for configuration hot-reload."""
@@ -40,8 +71,7 @@ class ConfigManager:
         try:
             # Load YAML configuration
             if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    self._config = yaml.safe_load(f)
+                self._config = yaml.load(self.config_path.read_bytes(), Loader=_YAML_LOADER)
             else:
                 logger.warning(f"Config file {self.config_path} not found, using defaults")
                 self._config = self._get_default_config()
@@ -93,13 +123,13 @@ class ConfigManager:
         
         # NMEA input configuration  
         if os.getenv('EDGEBOT_NMEA_ENABLED'):
-            self._config.setdefault('inputs', {}).setdefault('nmea', {})['enabled'] = os.getenv('EDGEBOT_NMEA_ENABLED').lower() in ('true', '1', 'yes', 'on')
+            self._config.setdefault('inputs', {}).setdefault('nmea', {})['enabled'] = _parse_bool(os.getenv('EDGEBOT_NMEA_ENABLED'))
         if os.getenv('EDGEBOT_NMEA_UDP_PORT'):
             self._config.setdefault('inputs', {}).setdefault('nmea', {})['udp_port'] = int(os.getenv('EDGEBOT_NMEA_UDP_PORT'))
         
         # Persistent queue configuration (new)
         if os.getenv('QUEUE_ENABLED'):
-            self._config.setdefault('queue', {})['enabled'] = os.getenv('QUEUE_ENABLED').lower() in ('true', '1', 'yes', 'on')
+            self._config.setdefault('queue', {})['enabled'] = _parse_bool(os.getenv('QUEUE_ENABLED'))
         if os.getenv('QUEUE_DIR'):
             self._config.setdefault('queue', {})['dir'] = os.getenv('QUEUE_DIR')
         if os.getenv('QUEUE_MAX_BYTES'):
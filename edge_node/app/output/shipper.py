@@ -18,6 +18,20 @@ from .queue import PersistentQueue
 
 logger = structlog.get_logger(__name__)
 
+# Spool metadata fields that never leave the edge node
+_INTERNAL_FIELDS = frozenset({'status', 'attempts', 'last_error', 'enqueued_at'})
+
+
+def _sanitize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Return message without internal fields, or message itself if it has none."""
+    for k in message:
+        if k[:2] == '__' or k in _INTERNAL_FIELDS:
+            return {
+                k: v for k, v in message.items()
+                if k[:2] != '__' and k not in _INTERNAL_FIELDS
+            }
+    return message
+
 
 def build_sanitized_envelope(batch_messages: List[Dict[str, Any]], is_retry: bool = False) -> str:
     """Build sanitized envelope from batch messages, removing all internal fields.
@@ -34,18 +48,9 @@ def build_sanitized_envelope(batch_messages: List[Dict[str, Any]], is_retry: boo
     Returns:
         JSON string ready for output (both .json and .json.gz)
     """
-    # Internal field keys to remove
-    internal_fields = {'status', 'attempts', 'last_error', 'enqueued_at'}
-    
-    # Sanitize messages by removing internal fields
-    sanitized_messages = []
-    for message in batch_messages:
-        # Remove any keys starting with "__" and specific internal fields
-        clean_message = {
-            k: v for k, v in message.items() 
-            if not k.startswith('__') and k not in internal_fields
-        }
-        sanitized_messages.append(clean_message)
+    # Remove any keys starting with "__" and specific internal fields; clean
+    # messages are serialized as-is without copying
+    sanitized_messages = [_sanitize_message(message) for message in batch_messages]
     
     # Build consistent envelope structure
     envelope = {
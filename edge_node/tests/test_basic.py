@@ -65,6 +65,23 @@ class TestConfig(unittest.TestCase):
             # Clean up environment
             os.environ.pop('EDGEBOT_HOST', None)
             os.environ.pop('EDGEBOT_SYSLOG_UDP_PORT', None)
+    
+    def test_sighup_handler_installed_once(self):
+        """Test that SIGHUP is registered once and reloads every manager."""
+        import signal
+        import weakref
+        from unittest.mock import patch
+        
+        with patch('signal.signal') as mock_signal, \
+                patch.object(ConfigManager, '_sighup_installed', False), \
+                patch.object(ConfigManager, '_instances', weakref.WeakSet()):
+            first = ConfigManager('missing.yaml')
+            second = ConfigManager('missing.yaml')
+            self.assertEqual(mock_signal.call_count, 1)
+            
+            with patch.object(ConfigManager, 'load_config') as mock_load:
+                ConfigManager._dispatch_sighup(signal.SIGHUP, None)
+                self.assertEqual(mock_load.call_count, 2)
 
 
 class TestSyslogParser(unittest.TestCase):
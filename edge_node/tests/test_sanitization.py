@@ -10,7 +10,7 @@ from pathlib import Path
 # Add the app directory to the path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'app'))
 
-from output.shipper import build_sanitized_envelope
+from output.shipper import build_sanitized_envelope, _sanitize_message
 
 
 class TestSanitization(unittest.TestCase):
@@ -116,6 +116,15 @@ class TestSanitization(unittest.TestCase):
         # Check internal field is removed
         self.assertNotIn('__spool_id', message)
     
+    def test_sanitize_message_copies_only_when_needed(self):
+        """Test that clean messages pass through and dirty ones are copied."""
+        clean = {'message': 'ok', 'severity': 'INFO'}
+        dirty = {'message': 'ok', '__spool_id': 1, 'attempts': 2}
+        
+        self.assertIs(_sanitize_message(clean), clean)
+        self.assertEqual(_sanitize_message(dirty), {'message': 'ok'})
+        self.assertIn('__spool_id', dirty)
+    
     def test_json_and_gzip_equivalence(self):
         """Test that .json and .json.gz contain identical data after decompression."""
         batch_messages = [
@@ -1,18 +1,248 @@
 """Configuration management for Mothership with dual-sink support."""
 import os
+import copy
+import json
 import signal
+import functools
 import logging
+import weakref
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import yaml
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping, Tuple
 import structlog
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = structlog.get_logger()
+# Level checks go through the stdlib logger structlog forwards to
+_level_logger = logging.getLogger(__name__)
 
 
-class LokiConfig(BaseModel):
-    """Loki sink configuration."""
+def _load_yaml(data: bytes) -> Any:
+    """Parse YAML, importing PyYAML on first use to keep module import cheap."""
+    import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    return yaml.load(data, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+# Environment variable values treated as true
+_TRUTHY = frozenset({'true', '1', 'yes', 'on'})
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable value."""
+    return value.lower() in _TRUTHY
+
+
+# Sinks whose reliability settings can be overridden from the environment,
+# as (env var prefix, key under 'sinks')
+_SINK_ENV_PREFIXES = (
+    ('LOKI', 'loki'),
+    ('TSDB', 'timescaledb'),
+)
+
+# Per-sink reliability overrides as (env var suffix, sub-section, key, parser)
+_SINK_RELIABILITY_ENV = (
+    ('MAX_RETRIES', 'retry', 'max_retries', int),
+    ('INITIAL_BACKOFF_MS', 'retry', 'initial_backoff_ms', int),
+    ('MAX_BACKOFF_MS', 'retry', 'max_backoff_ms', int),
+    ('JITTER_FACTOR', 'retry', 'jitter_factor', float),
+    ('JITTER_MODE', 'retry', 'jitter_mode', str),
+    ('TIMEOUT_MS', 'retry', 'timeout_ms', int),
+    ('FAILURE_THRESHOLD', 'circuit_breaker', 'failure_threshold', int),
+    ('OPEN_DURATION_SEC', 'circuit_breaker', 'open_duration_sec', int),
+    ('HALF_OPEN_MAX_INFLIGHT', 'circuit_breaker', 'half_open_max_inflight', int),
+    ('QUEUE_ENABLED', 'queue', 'enabled', _parse_bool),
+    ('QUEUE_DIR', 'queue', 'queue_dir', str),
+    ('QUEUE_MAX_BYTES', 'queue', 'queue_max_bytes', int),
+    ('QUEUE_FLUSH_INTERVAL_MS', 'queue', 'queue_flush_interval_ms', int),
+    ('DLQ_DIR', 'queue', 'dlq_dir', str),
+)
+
+# Environment overrides applied by ConfigManager, as
+# (env var, section path, key, parser). Empty values are ignored.
+_ENV_OVERRIDES = (
+    # Server configuration
+    ('MOTHERSHIP_HOST', ('server',), 'host', str),
+    ('MOTHERSHIP_PORT', ('server',), 'port', int),
+    ('MOTHERSHIP_MAX_BODY_BYTES', ('server',), 'max_body_bytes', int),
+    ('MOTHERSHIP_MAX_DECOMPRESSED_BYTES', ('server',), 'max_decompressed_bytes', int),
+    
+    # Database configuration
+    ('MOTHERSHIP_DB_DSN', ('database',), 'dsn', str),
+    ('MOTHERSHIP_DB_HOST', ('database',), 'host', str),
+    ('MOTHERSHIP_DB_PORT', ('database',), 'port', int),
+    ('MOTHERSHIP_DB_NAME', ('database',), 'database', str),
+    ('MOTHERSHIP_DB_USER', ('database',), 'user', str),
+    ('MOTHERSHIP_DB_PASS', ('database',), 'password', str),
+    
+    # LLM configuration
+    ('MOTHERSHIP_LLM_ENABLED', ('llm',), 'enabled', _parse_bool),
+    ('MOTHERSHIP_LLM_ENDPOINT', ('llm',), 'endpoint', str),
+    ('MOTHERSHIP_LLM_API_KEY', ('llm',), 'api_key', str),
+    ('MOTHERSHIP_LLM_MODEL', ('llm',), 'model', str),
+    ('MOTHERSHIP_LLM_CONFIDENCE_THRESHOLD', ('llm',), 'confidence_threshold', float),
+    ('LLM_BACKEND', ('llm',), 'backend', str),
+    
+    # Ollama-specific configuration
+    ('OLLAMA_BASE_URL', ('llm',), 'ollama_base_url', str),
+    ('OLLAMA_MODEL', ('llm',), 'ollama_model', str),
+    ('OLLAMA_TIMEOUT_MS', ('llm',), 'ollama_timeout_ms', int),
+    ('OLLAMA_MAX_TOKENS', ('llm',), 'ollama_max_tokens', int),
+    
+    # Loki sink configuration
+    ('LOKI_ENABLED', ('sinks', 'loki'), 'enabled', _parse_bool),
+    ('LOKI_URL', ('sinks', 'loki'), 'url', str),
+    ('LOKI_TENANT_ID', ('sinks', 'loki'), 'tenant_id', str),
+    ('LOKI_USERNAME', ('sinks', 'loki'), 'username', str),
+    ('LOKI_PASSWORD', ('sinks', 'loki'), 'password', str),
+    ('LOKI_BATCH_SIZE', ('sinks', 'loki'), 'batch_size', int),
+    ('LOKI_BATCH_TIMEOUT_SECONDS', ('sinks', 'loki'), 'batch_timeout_seconds', float),
+    
+    # TimescaleDB sink configuration
+    ('TSDB_ENABLED', ('sinks', 'timescaledb'), 'enabled', _parse_bool),
+) + tuple(
+    # Per-sink reliability configuration (retry / circuit breaker / queue)
+    (f'{env_prefix}_{suffix}', ('sinks', sink_key, section), key, parse)
+    for env_prefix, sink_key in _SINK_ENV_PREFIXES
+    for suffix, section, key, parse in _SINK_RELIABILITY_ENV
+) + (
+    # Sink reliability defaults (SATCOM-friendly)
+    ('SINK_DEFAULT_MAX_RETRIES', ('sink_defaults',), 'max_retries', int),
+    ('SINK_DEFAULT_INITIAL_BACKOFF_MS', ('sink_defaults',), 'initial_backoff_ms', int),
+    ('SINK_DEFAULT_MAX_BACKOFF_MS', ('sink_defaults',), 'max_backoff_ms', int),
+    ('SINK_DEFAULT_JITTER_FACTOR', ('sink_defaults',), 'jitter_factor', float),
+    ('SINK_DEFAULT_JITTER_MODE', ('sink_defaults',), 'jitter_mode', str),
+    ('SINK_DEFAULT_TIMEOUT_MS', ('sink_defaults',), 'timeout_ms', int),
+    ('SINK_DEFAULT_FAILURE_THRESHOLD', ('sink_defaults',), 'failure_threshold', int),
+    ('SINK_DEFAULT_OPEN_DURATION_SEC', ('sink_defaults',), 'open_duration_sec', int),
+    ('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT', ('sink_defaults',), 'half_open_max_inflight', int),
+    
+    # Idempotency configuration
+    ('IDEMPOTENCY_WINDOW_SEC', ('idempotency',), 'window_sec', int),
+    
+    # Reliability configuration: retry and circuit breaker
+    ('SINK_DEFAULT_MAX_RETRIES', ('reliability',), 'max_retries', int),
+    ('SINK_DEFAULT_INITIAL_BACKOFF_MS', ('reliability',), 'initial_backoff_ms', int),
+    ('SINK_DEFAULT_MAX_BACKOFF_MS', ('reliability',), 'max_backoff_ms', int),
+    ('SINK_DEFAULT_JITTER_FACTOR', ('reliability',), 'jitter_factor', float),
+    ('SINK_DEFAULT_JITTER_MODE', ('reliability',), 'jitter_mode', str),
+    ('SINK_DEFAULT_TIMEOUT_MS', ('reliability',), 'timeout_ms', int),
+    ('SINK_DEFAULT_FAILURE_THRESHOLD', ('reliability',), 'failure_threshold', int),
+    ('SINK_DEFAULT_OPEN_DURATION_SEC', ('reliability',), 'open_duration_sec', int),
+    ('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT', ('reliability',), 'half_open_max_inflight', int),
+    
+    # Reliability configuration: persistent queue
+    ('QUEUE_ENABLED', ('reliability',), 'queue_enabled', _parse_bool),
+    ('QUEUE_DIR', ('reliability',), 'queue_dir', str),
+    ('QUEUE_MAX_BYTES', ('reliability',), 'queue_max_bytes', int),
+    ('QUEUE_FLUSH_INTERVAL_MS', ('reliability',), 'queue_flush_interval_ms', int),
+    ('DLQ_DIR', ('reliability',), 'dlq_dir', str),
+    ('FLUSH_BANDWIDTH_BYTES_PER_SEC', ('reliability',), 'flush_bandwidth_bytes_per_sec', int),
+    ('IDEMPOTENCY_WINDOW_SEC', ('reliability',), 'idempotency_window_sec', int),
+    
+    # Logging
+    ('MOTHERSHIP_LOG_LEVEL', ('logging',), 'level', str),
+)
+
+
+# Built-in configuration used when no config file is present
+_DEFAULT_CONFIG_TEMPLATE: Dict[str, Any] = {
+    'server': {
+        'host': '0.0.0.0',
+        'port': 8443,
+        'max_body_bytes': 16 * 1024 * 1024,
+        'max_decompressed_bytes': 64 * 1024 * 1024
+    },
+    'database': {
+        'host': 'localhost',
+        'port': 5432,
+        'database': 'mothership',
+        'user': 'mothership',
+        'password': 'mothership'
+    },
+    'pipeline': {
+        'processors': {
+            'redaction': {
+                'enabled': True,
+                'drop_fields': ['password', 'secret', 'token', 'key', 'credential'],
+                'mask_patterns': [
+                    r'password=\S+',
+                    r'token=\S+',
+                    r'key=\S+',
+                    r'\b\d{3}-\d{2}-\d{4}\b'  # SSN pattern
+                ],
+                'hash_fields': ['user', 'username', 'email']
+            },
+            'enrichment': {
+                'enabled': True,
+                'add_tags': {
+                    'processed_by': 'mothership',
+                    'version': '1.5'
+                },
+                'severity_mapping': {
+                    'emergency': 0, 'alert': 1, 'critical': 2, 'error': 3,
+                    'warning': 4, 'notice': 5, 'informational': 6, 'debug': 7
+                }
+            }
+        }
+    },
+    'llm': {
+        'enabled': False,
+        'backend': 'openai',  # 'openai' or 'ollama'
+        'endpoint': 'https://api.openai.com/v1',
+        'model': 'gpt-3.5-turbo',
+        'confidence_threshold': 0.8,
+        'max_tokens': 150,
+        'temperature': 0.0,
+        # Ollama-specific settings
+        'ollama_base_url': 'http://localhost:11434',
+        'ollama_model': 'llama3.1:8b-instruct-q4_0',
+        'ollama_timeout_ms': 30000,
+        'ollama_max_tokens': 150
+    },
+    'sinks': {
+        'timescaledb': {
+            'enabled': True  # Default enabled
+        },
+        'loki': {
+            'enabled': False,  # Default disabled
+            'url': 'http://localhost:3100',
+            'tenant_id': None,
+            'username': None,
+            'password': None,
+            'batch_size': 100,
+            'batch_timeout_seconds': 5.0,
+            'max_retries': 3,
+            'retry_backoff_seconds': 1.0,
+            'timeout_seconds': 30.0
+        }
+    },
+    'sink_defaults': {
+        # CI-friendly defaults (fast fail for continuous integration)
+        'max_retries': 2,
+        'initial_backoff_ms': 100,
+        'max_backoff_ms': 2000,
+        'jitter_factor': 0.1,
+        'timeout_ms': 1000,  # 1 second instead of 5
+        'failure_threshold': 3,
+        'open_duration_sec': 30,
+        'half_open_max_inflight': 1
+    },
+    'idempotency': {
+        'window_sec': 3600  # 1 hour deduplication window
+    },
+    'logging': {
+        'level': 'INFO',
+        'structured': True
+    }
+}
+
+
+class LokiConfig(BaseSettings):
+    """Loki sink configuration, read from LOKI_* environment variables."""
+    model_config = SettingsConfigDict(env_prefix='LOKI_', defer_build=True)
+    
     enabled: bool = Field(default=False)
     url: str = Field(default="http://localhost:3100")
     tenant_id: Optional[str] = Field(default=None)
@@ -24,59 +254,17 @@ class LokiConfig(BaseModel):
     retry_backoff_seconds: float = Field(default=1.0)
     timeout_seconds: float = Field(default=30.0)
     
-    def __init__(self, **data):
-        """Initialize LokiConfig, reading from environment variables if not provided."""
-        # Set defaults from environment variables if not explicitly provided
-        if 'enabled' not in data:
-            data['enabled'] = os.getenv('LOKI_ENABLED', 'false').lower() in ('true', '1', 'yes', 'on')
-        if 'url' not in data:
-            data['url'] = os.getenv('LOKI_URL', 'http://localhost:3100')
-        if 'tenant_id' not in data:
-            data['tenant_id'] = os.getenv('LOKI_TENANT_ID')
-        if 'username' not in data:
-            data['username'] = os.getenv('LOKI_USERNAME')
-        if 'password' not in data:
-            data['password'] = os.getenv('LOKI_PASSWORD')
-        if 'batch_size' not in data:
-            data['batch_size'] = int(os.getenv('LOKI_BATCH_SIZE', '100'))
-        if 'batch_timeout_seconds' not in data:
-            data['batch_timeout_seconds'] = float(os.getenv('LOKI_BATCH_TIMEOUT_SECONDS', '5.0'))
-        if 'max_retries' not in data:
-            data['max_retries'] = int(os.getenv('LOKI_MAX_RETRIES', '3'))
-        if 'retry_backoff_seconds' not in data:
-            data['retry_backoff_seconds'] = float(os.getenv('LOKI_RETRY_BACKOFF_SECONDS', '1.0'))
-        if 'timeout_seconds' not in data:
-            data['timeout_seconds'] = float(os.getenv('LOKI_TIMEOUT_SECONDS', '30.0'))
-        super().__init__(**data)
-    
-    def get(self, key: str, default: Any = None) -> Any:
-        """Dictionary-style get method for backward compatibility."""
-        return getattr(self, key, default)
-    
-    def __getitem__(self, key: str) -> Any:
-        """Dictionary-style access for backward compatibility."""
-        return getattr(self, key)
-        
-    def __setitem__(self, key: str, value: Any) -> None:
-        """Dictionary-style assignment for backward compatibility.""" 
-        setattr(self, key, value)
-        
-    def keys(self):
-        """Return the field names."""
-        return self.model_fields.keys()
-        
-    def model_dump_dict(self) -> Dict[str, Any]:
-        """Return as dictionary for compatibility."""
-        return self.model_dump()
-    
+    @field_validator('enabled', mode='before')
     @classmethod
-    def from_env(cls) -> "LokiConfig":
-        """Create LokiConfig from environment variables."""
-        return cls()
+    def _lenient_enabled(cls, value: Any) -> Any:
+        """Read LOKI_ENABLED like the other env flags: unknown or empty means off."""
+        return _parse_bool(value) if isinstance(value, str) else value
 
 
-class TSDBConfig(BaseModel):
-    """TimescaleDB sink configuration.""" 
+class TSDBConfig(BaseSettings):
+    """TimescaleDB sink configuration, read from TSDB_* environment variables."""
+    model_config = SettingsConfigDict(env_prefix='TSDB_', defer_build=True)
+    
     enabled: bool = Field(default=True)
     host: str = Field(default="localhost")
     port: int = Field(default=5432)
@@ -84,73 +272,94 @@ class TSDBConfig(BaseModel):
     username: str = Field(default="edgebot")
     password: str = Field(default="edgebot")
     
-    def __init__(self, **data):
-        """Initialize TSDBConfig, reading from environment variables if not provided."""
-        # Set defaults from environment variables if not explicitly provided
-        if 'enabled' not in data:
-            data['enabled'] = os.getenv('TSDB_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
-        if 'host' not in data:
-            data['host'] = os.getenv('TSDB_HOST', 'localhost')
-        if 'port' not in data:
-            data['port'] = int(os.getenv('TSDB_PORT', '5432'))
-        if 'database' not in data:
-            data['database'] = os.getenv('TSDB_DATABASE', 'edgebot')
-        if 'username' not in data:
-            data['username'] = os.getenv('TSDB_USERNAME', 'edgebot')
-        if 'password' not in data:
-            data['password'] = os.getenv('TSDB_PASSWORD', 'edgebot')
-        super().__init__(**data)
-    
+    @field_validator('enabled', mode='before')
     @classmethod
-    def from_env(cls) -> "TSDBConfig":
-        """Create TSDBConfig from environment variables."""
-        return cls()
+    def _lenient_enabled(cls, value: Any) -> Any:
+        """Read TSDB_ENABLED like the other env flags: unknown or empty means off."""
+        return _parse_bool(value) if isinstance(value, str) else value
 
 
 class AppConfig(BaseModel):
     """Main application configuration."""
+    model_config = ConfigDict(defer_build=True)
+    
     loki: LokiConfig = Field(default_factory=LokiConfig)
     tsdb: TSDBConfig = Field(default_factory=TSDBConfig)
     
     @classmethod
     def from_env(cls) -> "AppConfig":
         """Create AppConfig from environment variables."""
-        return cls(
+        # The sink settings validate themselves; skip a second pass here
+        return cls.model_construct(
             loki=LokiConfig(),
             tsdb=TSDBConfig()
         )
     
-    def get_enabled_sinks(self) -> List[str]:
-        """Get list of enabled sink names."""
+    @functools.cached_property
+    def enabled_sinks(self) -> Tuple[str, ...]:
+        """Names of enabled sinks, computed once per instance."""
         enabled = []
         if self.tsdb.enabled:
             enabled.append('tsdb')
         if self.loki.enabled:
             enabled.append('loki')
-        return enabled
+        return tuple(enabled)
+    
+    def get_enabled_sinks(self) -> Tuple[str, ...]:
+        """Get enabled sink names."""
+        return self.enabled_sinks
 
 
+@functools.lru_cache(maxsize=1)
 def get_config() -> AppConfig:
-    """Get application configuration from environment."""
+    """Get application configuration from environment.
+    
+    The result is cached for the life of the process; SIGHUP clears it.
+    """
     return AppConfig.from_env()
 
 class ConfigManager:
     """Manages configuration loading and hot-reloading with dual-sink support."""
     
+    # Live managers reloaded on SIGHUP; the process-wide handler is installed once
+    _instances: "weakref.WeakSet[ConfigManager]" = weakref.WeakSet()
+    _sighup_installed = False
+    
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = Path(config_path)
         self._config = {}
+        self._config_view: Mapping[str, Any] = MappingProxyType(self._config)
         self._callbacks = []
+        self._last_mtime_ns: Optional[int] = None
+        self._enabled_sinks_cache: Optional[Tuple[str, ...]] = None
         
         # Set up signal handler for hot reload
-        signal.signal(signal.SIGHUP, self._handle_sighup)
+        self._register_for_sighup(self)
         
         # Load config on initialization
         self.load_config()
+    
+    @classmethod
+    def _register_for_sighup(cls, manager: "ConfigManager"):
+        """Track a manager for SIGHUP reloads, installing the handler on first use."""
+        cls._instances.add(manager)
+        if not cls._sighup_installed:
+            signal.signal(signal.SIGHUP, cls._dispatch_sighup)
+            cls._sighup_installed = True
+    
+    @classmethod
+    def _dispatch_sighup(cls, signum, frame):
+        """Fan SIGHUP out to every live ConfigManager."""
+        get_config.cache_clear()
+        for manager in list(cls._instances):
+            manager._handle_sighup(signum, frame)
         
     def _handle_sighup(self, signum, frame):
         """Handle SIGHUP for configuration hot-reload."""
         logger.info("Received SIGHUP, reloading configuration")
+        if self._is_unchanged(self._config_mtime_ns()):
+            logger.info("Configuration file unchanged, skipping reload")
+            return
         try:
             self.load_config()
             # Notify callbacks of config change
@@ -163,13 +372,33 @@ class ConfigManager:
         """Register a callback to be called when config is reloaded."""
         self._callbacks.append(callback)
     
+    def _config_mtime_ns(self) -> Optional[int]:
+        """Get the config file's modification time, or None if it is missing."""
+        try:
+            return self.config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _is_unchanged(self, mtime_ns: Optional[int]) -> bool:
+        """Check whether the config file is unchanged since the last load."""
+        return mtime_ns is not None and mtime_ns == self._last_mtime_ns and bool(self._config)
+    
     def load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file with environment overrides."""
+        """Load configuration from YAML file with environment overrides.
+        
+        Re-parsing is skipped when the file is unchanged since the last load.
+        """
+        mtime_ns = self._config_mtime_ns()
+        if self._is_unchanged(mtime_ns):
+            return self._config
+        
         try:
-            # Load YAML configuration
-            if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    self._config = yaml.safe_load(f)
+            # Load YAML configuration, falling back to a JSON sibling
+            json_path = self.config_path.with_suffix('.json')
+            if mtime_ns is not None:
+                self._config = _load_yaml(self.config_path.read_bytes())
+            elif json_path.exists():
+                self._config = json.loads(json_path.read_bytes())
             else:
                 logger.warning(f"Config file {self.config_path} not found, using defaults")
                 self._config = self._get_default_config()
@@ -179,10 +408,14 @@ class ConfigManager:
             
             # Validate configuration
             self._validate_config()
+            self._config_view = MappingProxyType(self._config)
+            self._enabled_sinks_cache = None
+            self._last_mtime_ns = mtime_ns
             
-            logger.info("Configuration loaded successfully", 
-                       config_file=str(self.config_path),
-                       enabled_sinks=self.get_enabled_sinks())
+            if _level_logger.isEnabledFor(logging.INFO):
+                logger.info("Configuration loaded successfully", 
+                           config_file=str(self.config_path),
+                           enabled_sinks=self.get_enabled_sinks())
             return self._config
             
         except Exception as e:
@@ -191,192 +424,23 @@ class ConfigManager:
     
     def _apply_env_overrides(self):
         """Apply environment variable overrides to configuration."""
-        # Server configuration
-        if os.getenv('MOTHERSHIP_HOST'):
-            self._config.setdefault('server', {})['host'] = os.getenv('MOTHERSHIP_HOST')
-        if os.getenv('MOTHERSHIP_PORT'):
-            self._config.setdefault('server', {})['port'] = int(os.getenv('MOTHERSHIP_PORT'))
-        
-        # Database configuration
-        if os.getenv('MOTHERSHIP_DB_DSN'):
-            self._config.setdefault('database', {})['dsn'] = os.getenv('MOTHERSHIP_DB_DSN')
-        if os.getenv('MOTHERSHIP_DB_HOST'):
-            self._config.setdefault('database', {})['host'] = os.getenv('MOTHERSHIP_DB_HOST')
-        if os.getenv('MOTHERSHIP_DB_PORT'):
-            self._config.setdefault('database', {})['port'] = int(os.getenv('MOTHERSHIP_DB_PORT'))
-        if os.getenv('MOTHERSHIP_DB_NAME'):
-            self._config.setdefault('database', {})['database'] = os.getenv('MOTHERSHIP_DB_NAME')
-        if os.getenv('MOTHERSHIP_DB_USER'):
-            self._config.setdefault('database', {})['user'] = os.getenv('MOTHERSHIP_DB_USER')
-        if os.getenv('MOTHERSHIP_DB_PASS'):
-            self._config.setdefault('database', {})['password'] = os.getenv('MOTHERSHIP_DB_PASS')
-        
-        # LLM configuration
-        if os.getenv('MOTHERSHIP_LLM_ENABLED'):
-            self._config.setdefault('llm', {})['enabled'] = os.getenv('MOTHERSHIP_LLM_ENABLED').lower() in ('true', '1', 'yes', 'on')
-        if os.getenv('MOTHERSHIP_LLM_ENDPOINT'):
-            self._config.setdefault('llm', {})['endpoint'] = os.getenv('MOTHERSHIP_LLM_ENDPOINT')
-        if os.getenv('MOTHERSHIP_LLM_API_KEY'):
-            self._config.setdefault('llm', {})['api_key'] = os.getenv('MOTHERSHIP_LLM_API_KEY')
-        if os.getenv('MOTHERSHIP_LLM_MODEL'):
-            self._config.setdefault('llm', {})['model'] = os.getenv('MOTHERSHIP_LLM_MODEL')
-        if os.getenv('MOTHERSHIP_LLM_CONFIDENCE_THRESHOLD'):
-            self._config.setdefault('llm', {})['confidence_threshold'] = float(os.getenv('MOTHERSHIP_LLM_CONFIDENCE_THRESHOLD'))
+        env = os.environ
         
-        # LLM Backend configuration
-        if os.getenv('LLM_BACKEND'):
-            self._config.setdefault('llm', {})['backend'] = os.getenv('LLM_BACKEND')
+        # The reliability section is always present, even without overrides
+        self._config.setdefault('reliability', {})
         
-        # Ollama-specific configuration
-        if os.getenv('OLLAMA_BASE_URL'):
-            self._config.setdefault('llm', {})['ollama_base_url'] = os.getenv('OLLAMA_BASE_URL')
-        if os.getenv('OLLAMA_MODEL'):
-            self._config.setdefault('llm', {})['ollama_model'] = os.getenv('OLLAMA_MODEL')
-        if os.getenv('OLLAMA_TIMEOUT_MS'):
-            self._config.setdefault('llm', {})['ollama_timeout_ms'] = int(os.getenv('OLLAMA_TIMEOUT_MS'))
-        if os.getenv('OLLAMA_MAX_TOKENS'):
-            self._config.setdefault('llm', {})['ollama_max_tokens'] = int(os.getenv('OLLAMA_MAX_TOKENS'))
-        
-        # Loki sink configuration - NEW
-        if os.getenv('LOKI_ENABLED'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['enabled'] = os.getenv('LOKI_ENABLED').lower() in ('true', '1', 'yes', 'on')
-        if os.getenv('LOKI_URL'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['url'] = os.getenv('LOKI_URL')
-        if os.getenv('LOKI_TENANT_ID'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['tenant_id'] = os.getenv('LOKI_TENANT_ID')
-        if os.getenv('LOKI_USERNAME'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['username'] = os.getenv('LOKI_USERNAME')
-        if os.getenv('LOKI_PASSWORD'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['password'] = os.getenv('LOKI_PASSWORD')
-        if os.getenv('LOKI_BATCH_SIZE'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['batch_size'] = int(os.getenv('LOKI_BATCH_SIZE'))
-        if os.getenv('LOKI_BATCH_TIMEOUT_SECONDS'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {})['batch_timeout_seconds'] = float(os.getenv('LOKI_BATCH_TIMEOUT_SECONDS'))
-
-        # Loki reliability configuration
-        if os.getenv('LOKI_MAX_RETRIES'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('retry', {})['max_retries'] = int(os.getenv('LOKI_MAX_RETRIES'))
-        if os.getenv('LOKI_INITIAL_BACKOFF_MS'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('retry', {})['initial_backoff_ms'] = int(os.getenv('LOKI_INITIAL_BACKOFF_MS'))
-        if os.getenv('LOKI_MAX_BACKOFF_MS'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('retry', {})['max_backoff_ms'] = int(os.getenv('LOKI_MAX_BACKOFF_MS'))
-        if os.getenv('LOKI_JITTER_FACTOR'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('retry', {})['jitter_factor'] = float(os.getenv('LOKI_JITTER_FACTOR'))
-        if os.getenv('LOKI_TIMEOUT_MS'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('retry', {})['timeout_ms'] = int(os.getenv('LOKI_TIMEOUT_MS'))
-        if os.getenv('LOKI_FAILURE_THRESHOLD'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('circuit_breaker', {})['failure_threshold'] = int(os.getenv('LOKI_FAILURE_THRESHOLD'))
-        if os.getenv('LOKI_OPEN_DURATION_SEC'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('circuit_breaker', {})['open_duration_sec'] = int(os.getenv('LOKI_OPEN_DURATION_SEC'))
-        if os.getenv('LOKI_HALF_OPEN_MAX_INFLIGHT'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('circuit_breaker', {})['half_open_max_inflight'] = int(os.getenv('LOKI_HALF_OPEN_MAX_INFLIGHT'))
-        if os.getenv('LOKI_QUEUE_ENABLED'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('queue', {})['enabled'] = os.getenv('LOKI_QUEUE_ENABLED').lower() in ('true', '1', 'yes', 'on')
-        if os.getenv('LOKI_QUEUE_DIR'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('queue', {})['queue_dir'] = os.getenv('LOKI_QUEUE_DIR')
-        if os.getenv('LOKI_QUEUE_MAX_BYTES'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('queue', {})['queue_max_bytes'] = int(os.getenv('LOKI_QUEUE_MAX_BYTES'))
-        if os.getenv('LOKI_QUEUE_FLUSH_INTERVAL_MS'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('queue', {})['queue_flush_interval_ms'] = int(os.getenv('LOKI_QUEUE_FLUSH_INTERVAL_MS'))
-        if os.getenv('LOKI_DLQ_DIR'):
-            self._config.setdefault('sinks', {}).setdefault('loki', {}).setdefault('queue', {})['dlq_dir'] = os.getenv('LOKI_DLQ_DIR')
-        
-        # TimescaleDB sink configuration - NEW
-        if os.getenv('TSDB_ENABLED'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {})['enabled'] = os.getenv('TSDB_ENABLED').lower() in ('true', '1', 'yes', 'on')
-
-        # TSDB reliability configuration
-        if os.getenv('TSDB_MAX_RETRIES'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('retry', {})['max_retries'] = int(os.getenv('TSDB_MAX_RETRIES'))
-        if os.getenv('TSDB_INITIAL_BACKOFF_MS'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('retry', {})['initial_backoff_ms'] = int(os.getenv('TSDB_INITIAL_BACKOFF_MS'))
-        if os.getenv('TSDB_MAX_BACKOFF_MS'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('retry', {})['max_backoff_ms'] = int(os.getenv('TSDB_MAX_BACKOFF_MS'))
-        if os.getenv('TSDB_JITTER_FACTOR'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('retry', {})['jitter_factor'] = float(os.getenv('TSDB_JITTER_FACTOR'))
-        if os.getenv('TSDB_TIMEOUT_MS'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('retry', {})['timeout_ms'] = int(os.getenv('TSDB_TIMEOUT_MS'))
-        if os.getenv('TSDB_FAILURE_THRESHOLD'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('circuit_breaker', {})['failure_threshold'] = int(os.getenv('TSDB_FAILURE_THRESHOLD'))
-        if os.getenv('TSDB_OPEN_DURATION_SEC'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('circuit_breaker', {})['open_duration_sec'] = int(os.getenv('TSDB_OPEN_DURATION_SEC'))
-        if os.getenv('TSDB_HALF_OPEN_MAX_INFLIGHT'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('circuit_breaker', {})['half_open_max_inflight'] = int(os.getenv('TSDB_HALF_OPEN_MAX_INFLIGHT'))
-        if os.getenv('TSDB_QUEUE_ENABLED'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('queue', {})['enabled'] = os.getenv('TSDB_QUEUE_ENABLED').lower() in ('true', '1', 'yes', 'on')
-        if os.getenv('TSDB_QUEUE_DIR'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('queue', {})['queue_dir'] = os.getenv('TSDB_QUEUE_DIR')
-        if os.getenv('TSDB_QUEUE_MAX_BYTES'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('queue', {})['queue_max_bytes'] = int(os.getenv('TSDB_QUEUE_MAX_BYTES'))
-        if os.getenv('TSDB_QUEUE_FLUSH_INTERVAL_MS'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('queue', {})['queue_flush_interval_ms'] = int(os.getenv('TSDB_QUEUE_FLUSH_INTERVAL_MS'))
-        if os.getenv('TSDB_DLQ_DIR'):
-            self._config.setdefault('sinks', {}).setdefault('timescaledb', {}).setdefault('queue', {})['dlq_dir'] = os.getenv('TSDB_DLQ_DIR')
-        
-        # Sink reliability configuration (new SATCOM-friendly defaults)
-        if os.getenv('SINK_DEFAULT_MAX_RETRIES'):
-            self._config.setdefault('sink_defaults', {})['max_retries'] = int(os.getenv('SINK_DEFAULT_MAX_RETRIES'))
-        if os.getenv('SINK_DEFAULT_INITIAL_BACKOFF_MS'):
-            self._config.setdefault('sink_defaults', {})['initial_backoff_ms'] = int(os.getenv('SINK_DEFAULT_INITIAL_BACKOFF_MS'))
-        if os.getenv('SINK_DEFAULT_MAX_BACKOFF_MS'):
-            self._config.setdefault('sink_defaults', {})['max_backoff_ms'] = int(os.getenv('SINK_DEFAULT_MAX_BACKOFF_MS'))
-        if os.getenv('SINK_DEFAULT_JITTER_FACTOR'):
-            self._config.setdefault('sink_defaults', {})['jitter_factor'] = float(os.getenv('SINK_DEFAULT_JITTER_FACTOR'))
-        if os.getenv('SINK_DEFAULT_TIMEOUT_MS'):
-            self._config.setdefault('sink_defaults', {})['timeout_ms'] = int(os.getenv('SINK_DEFAULT_TIMEOUT_MS'))
-        if os.getenv('SINK_DEFAULT_FAILURE_THRESHOLD'):
-            self._config.setdefault('sink_defaults', {})['failure_threshold'] = int(os.getenv('SINK_DEFAULT_FAILURE_THRESHOLD'))
-        if os.getenv('SINK_DEFAULT_OPEN_DURATION_SEC'):
-            self._config.setdefault('sink_defaults', {})['open_duration_sec'] = int(os.getenv('SINK_DEFAULT_OPEN_DURATION_SEC'))
-        if os.getenv('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT'):
-            self._config.setdefault('sink_defaults', {})['half_open_max_inflight'] = int(os.getenv('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT'))
-        
-        # Idempotency configuration
-        if os.getenv('IDEMPOTENCY_WINDOW_SEC'):
-            self._config.setdefault('idempotency', {})['window_sec'] = int(os.getenv('IDEMPOTENCY_WINDOW_SEC'))
-        
-        # Reliability configuration - NEW
-        reliability_config = self._config.setdefault('reliability', {})
-        
-        # Retry configuration
-        if os.getenv('SINK_DEFAULT_MAX_RETRIES'):
-            reliability_config['max_retries'] = int(os.getenv('SINK_DEFAULT_MAX_RETRIES'))
-        if os.getenv('SINK_DEFAULT_INITIAL_BACKOFF_MS'):
-            reliability_config['initial_backoff_ms'] = int(os.getenv('SINK_DEFAULT_INITIAL_BACKOFF_MS'))
-        if os.getenv('SINK_DEFAULT_MAX_BACKOFF_MS'):
-            reliability_config['max_backoff_ms'] = int(os.getenv('SINK_DEFAULT_MAX_BACKOFF_MS'))
-        if os.getenv('SINK_DEFAULT_JITTER_FACTOR'):
-            reliability_config['jitter_factor'] = float(os.getenv('SINK_DEFAULT_JITTER_FACTOR'))
-        if os.getenv('SINK_DEFAULT_TIMEOUT_MS'):
-            reliability_config['timeout_ms'] = int(os.getenv('SINK_DEFAULT_TIMEOUT_MS'))
-            
-        # Circuit breaker configuration
-        if os.getenv('SINK_DEFAULT_FAILURE_THRESHOLD'):
-            reliability_config['failure_threshold'] = int(os.getenv('SINK_DEFAULT_FAILURE_THRESHOLD'))
-        if os.getenv('SINK_DEFAULT_OPEN_DURATION_SEC'):
-            reliability_config['open_duration_sec'] = int(os.getenv('SINK_DEFAULT_OPEN_DURATION_SEC'))
-        if os.getenv('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT'):
-            reliability_config['half_open_max_inflight'] = int(os.getenv('SINK_DEFAULT_HALF_OPEN_MAX_INFLIGHT'))
-            
-        # Persistent queue configuration
-        if os.getenv('QUEUE_ENABLED'):
-            reliability_config['queue_enabled'] = os.getenv('QUEUE_ENABLED').lower() in ('true', '1', 'yes', 'on')
-        if os.getenv('QUEUE_DIR'):
-            reliability_config['queue_dir'] = os.getenv('QUEUE_DIR')
-        if os.getenv('QUEUE_MAX_BYTES'):
-            reliability_config['queue_max_bytes'] = int(os.getenv('QUEUE_MAX_BYTES'))
-        if os.getenv('QUEUE_FLUSH_INTERVAL_MS'):
-            reliability_config['queue_flush_interval_ms'] = int(os.getenv('QUEUE_FLUSH_INTERVAL_MS'))
-        if os.getenv('DLQ_DIR'):
-            reliability_config['dlq_dir'] = os.getenv('DLQ_DIR')
-        if os.getenv('FLUSH_BANDWIDTH_BYTES_PER_SEC'):
-            reliability_config['flush_bandwidth_bytes_per_sec'] = int(os.getenv('FLUSH_BANDWIDTH_BYTES_PER_SEC'))
-        if os.getenv('IDEMPOTENCY_WINDOW_SEC'):
-            reliability_config['idempotency_window_sec'] = int(os.getenv('IDEMPOTENCY_WINDOW_SEC'))
-        
-        # Logging
-        if os.getenv('MOTHERSHIP_LOG_LEVEL'):
-            self._config.setdefault('logging', {})['level'] = os.getenv('MOTHERSHIP_LOG_LEVEL')
+        # Resolve each section path once, however many keys it receives
+        sections: Dict[tuple, Dict[str, Any]] = {}
+        for env_name, path, key, parse in _ENV_OVERRIDES:
+            value = env.get(env_name)
+            if value:
+                section = sections.get(path)
+                if section is None:
+                    section = self._config
+                    for name in path:
+                        section = section.setdefault(name, {})
+                    sections[path] = section
+                section[key] = parse(value)
     
     def _validate_config(self):
         """Validate configuration values."""
@@ -405,107 +469,25 @@ class ConfigManager:
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration with dual-sink support."""
-        return {
-            'server': {
-                'host': '0.0.0.0',
-                'port': 8443
-            },
-            'database': {
-                'host': 'localhost',
-                'port': 5432,
-                'database': 'mothership',
-                'user': 'mothership',
-                'password': 'mothership'
-            },
-            'pipeline': {
-                'processors': {
-                    'redaction': {
-                        'enabled': True,
-                        'drop_fields': ['password', 'secret', 'token', 'key', 'credential'],
-                        'mask_patterns': [
-                            r'password=\S+',
-                            r'token=\S+',
-                            r'key=\S+',
-                            r'\b\d{3}-\d{2}-\d{4}\b'  # SSN pattern
-                        ],
-                        'hash_fields': ['user', 'username', 'email']
-                    },
-                    'enrichment': {
-                        'enabled': True,
-                        'add_tags': {
-                            'processed_by': 'mothership',
-                            'version': '1.5'
-                        },
-                        'severity_mapping': {
-                            'emergency': 0, 'alert': 1, 'critical': 2, 'error': 3,
-                            'warning': 4, 'notice': 5, 'informational': 6, 'debug': 7
-                        }
-                    }
-                }
-            },
-            'llm': {
-                'enabled': False,
-                'backend': 'openai',  # 'openai' or 'ollama'
-                'endpoint': 'https://api.openai.com/v1',
-                'model': 'gpt-3.5-turbo',
-                'confidence_threshold': 0.8,
-                'max_tokens': 150,
-                'temperature': 0.0,
-                # Ollama-specific settings
-                'ollama_base_url': 'http://localhost:11434',
-                'ollama_model': 'llama3.1:8b-instruct-q4_0',
-                'ollama_timeout_ms': 30000,
-                'ollama_max_tokens': 150
-            },
-            'sinks': {
-                'timescaledb': {
-                    'enabled': True  # Default enabled
-                },
-                'loki': {
-                    'enabled': False,  # Default disabled
-                    'url': 'http://localhost:3100',
-                    'tenant_id': None,
-                    'username': None,
-                    'password': None,
-                    'batch_size': 100,
-                    'batch_timeout_seconds': 5.0,
-                    'max_retries': 3,
-                    'retry_backoff_seconds': 1.0,
-                    'timeout_seconds': 30.0
-                }
-            },
-            'sink_defaults': {
-                # CI-friendly defaults (fast fail for continuous integration)
-                'max_retries': 2,
-                'initial_backoff_ms': 100,
-                'max_backoff_ms': 2000,
-                'jitter_factor': 0.1,
-                'timeout_ms': 1000,  # 1 second instead of 5
-                'failure_threshold': 3,
-                'open_duration_sec': 30,
-                'half_open_max_inflight': 1
-            },
-            'idempotency': {
-                'window_sec': 3600  # 1 hour deduplication window
-            },
-            'logging': {
-                'level': 'INFO',
-                'structured': True
-            }
-        }
+        return copy.deepcopy(_DEFAULT_CONFIG_TEMPLATE)
     
-    def get_config(self) -> Dict[str, Any]:
-        """Get current configuration."""
-        return self._config.copy()
-    
-    def get_enabled_sinks(self) -> list:
-        """Get list of enabled sink names."""
-        enabled = []
-        sinks = self._config.get('sinks', {})
+    def get_config(self) -> Mapping[str, Any]:
+        """Get a read-only view of the current configuration.
         
-        if sinks.get('timescaledb', {}).get('enabled', True):
-            enabled.append('timescaledb')
-        if sinks.get('loki', {}).get('enabled', False):
-            enabled.append('loki')
+        Use dict(...) on the result if a mutable copy is needed.
+        """
+        return self._config_view
+    
+    def get_enabled_sinks(self) -> Tuple[str, ...]:
+        """Get enabled sink names, cached until the next reload."""
+        if self._enabled_sinks_cache is None:
+            enabled = []
+            sinks = self._config.get('sinks', {})
+            
+            if sinks.get('timescaledb', {}).get('enabled', True):
+                enabled.append('timescaledb')
+            if sinks.get('loki', {}).get('enabled', False):
+                enabled.append('loki')
             
-        return enabled
+            self._enabled_sinks_cache = tuple(enabled)
+        return self._enabled_sinks_cache
@@ -4,6 +4,12 @@ This module provides a centralized metrics registry and all the counters,
 histograms, and gauges needed for observability as specified in the requirements.
 """
 
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
 
 # Use a custom registry to avoid conflicts with default registry
@@ -29,6 +35,12 @@ mship_written_events_total = Counter(
     registry=METRICS_REGISTRY
 )
 
+mship_event_errors_total = Counter(
+    'mship_event_errors_total',
+    'Total number of ingested events dropped after failing the pipeline',
+    registry=METRICS_REGISTRY
+)
+
 mship_sink_written_total = Counter(
     'mship_sink_written_total',
     'Total number of events written per sink',
@@ -137,8 +149,108 @@ mship_sink_dlq_total = Counter(
 )
 
 
+# Sink label values are clamped to an allowlist so unexpected sink names
+# (tenant IDs, hostnames) cannot grow the number of time series; extend it
+# with MOTHERSHIP_SINK_LABELS (comma-separated, read at import)
+_ALLOWED_SINKS = frozenset(
+    name.strip()
+    for name in os.getenv('MOTHERSHIP_SINK_LABELS', 'timescaledb,tsdb,loki').split(',')
+    if name.strip()
+)
+OTHER_SINK = 'other'
+
+
+def sink_label(name: str) -> str:
+    """Get the label value for a sink, mapping unknown names to 'other'."""
+    return name if name in _ALLOWED_SINKS else OTHER_SINK
+
+
+def _bind_sink_children(metric) -> Dict[str, Any]:
+    """Pre-bind a sink-labelled metric's child for every allowed label value."""
+    return {sink: metric.labels(sink=sink) for sink in _ALLOWED_SINKS | {OTHER_SINK}}
+
+
+# Per-sink children keyed by sink_label(); avoids labels() on each update
+SINK_WRITTEN = _bind_sink_children(mship_sink_written_total)
+SINK_WRITE_SECONDS = _bind_sink_children(mship_sink_write_seconds)
+SINK_RETRY = _bind_sink_children(mship_sink_retry_total)
+SINK_ERROR = _bind_sink_children(mship_sink_error_total)
+SINK_TIMEOUT = _bind_sink_children(mship_sink_timeout_total)
+SINK_CIRCUIT_STATE = _bind_sink_children(mship_sink_circuit_state)
+SINK_CIRCUIT_OPEN = _bind_sink_children(mship_sink_circuit_open_total)
+SINK_QUEUE_SIZE = _bind_sink_children(mship_sink_queue_size)
+SINK_QUEUE_BYTES = _bind_sink_children(mship_sink_queue_bytes)
+SINK_DLQ = _bind_sink_children(mship_sink_dlq_total)
+
+
+@dataclass(frozen=True)
+class SinkMetrics:
+    """Pre-bound metric children for a single sink."""
+    written: Any
+    write_seconds: Any
+    retry: Any
+    error: Any
+    timeout: Any
+    circuit_state: Any
+    circuit_open: Any
+    queue_size: Any
+    queue_bytes: Any
+    dlq: Any
+
+
+_SINK_METRICS = {
+    sink: SinkMetrics(
+        written=SINK_WRITTEN[sink],
+        write_seconds=SINK_WRITE_SECONDS[sink],
+        retry=SINK_RETRY[sink],
+        error=SINK_ERROR[sink],
+        timeout=SINK_TIMEOUT[sink],
+        circuit_state=SINK_CIRCUIT_STATE[sink],
+        circuit_open=SINK_CIRCUIT_OPEN[sink],
+        queue_size=SINK_QUEUE_SIZE[sink],
+        queue_bytes=SINK_QUEUE_BYTES[sink],
+        dlq=SINK_DLQ[sink],
+    )
+    for sink in SINK_WRITTEN
+}
+
+
+def get_sink_metrics(name: str) -> SinkMetrics:
+    """Get the metric bundle for a sink; keep it on the instance that writes to it."""
+    return _SINK_METRICS[sink_label(name)]
+
+
+# Rendered exposition reused across scrapes for up to _cache_ttl seconds
+# (MOTHERSHIP_METRICS_CACHE_TTL, read at import; 0 renders every scrape)
+_cache_ttl = float(os.getenv('MOTHERSHIP_METRICS_CACHE_TTL', '5'))
+_cache_lock = threading.Lock()
+_cached_payload: Optional[bytes] = None
+_cached_at = 0.0
+
+
+def get_metrics_bytes() -> bytes:
+    """Get encoded metrics for a scrape, re-rendering at most once per TTL window."""
+    global _cached_payload, _cached_at
+    with _cache_lock:
+        now = time.monotonic()
+        if _cached_payload is None or now - _cached_at >= _cache_ttl:
+            _cached_payload = generate_latest(METRICS_REGISTRY)
+            _cached_at = now
+        return _cached_payload
+
+
+def get_metrics_payload() -> Tuple[bytes, int]:
+    """Get encoded metrics together with their Content-Length."""
+    payload = get_metrics_bytes()
+    return payload, len(payload)
+
+
 def get_metrics_content() -> str:
-    """Generate Prometheus metrics content from custom registry."""
+    """Generate Prometheus metrics content as text.
+    
+    Kept for callers that want a str; HTTP handlers should use
+    get_metrics_payload() and skip the decode.
+    """
     return generate_latest(METRICS_REGISTRY).decode('utf-8')
 
 
@@ -1,7 +1,9 @@
 """LLM-assisted enrichment with guardrails and safety measures."""
 import asyncio
 import json
+import re
 import time
+import weakref
 from typing import Dict, Any, List, Optional, Union
 import httpx
 import structlog
@@ -9,6 +11,123 @@ from .processor import Processor
 
 logger = structlog.get_logger()
 
+
+# Outermost {...} span, used to pull JSON out of chatty model replies
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Compact encoder for prompt payloads; indentation only costs tokens
+_COMPACT_JSON = json.JSONEncoder(separators=(',', ':'))
+
+# Event fields that may be shown to the model, in prompt order
+_SAFE_FIELD_NAMES = (
+    'type', 'severity', 'facility', 'tag', 'service',
+    'hostname', 'message', 'category', 'tags'
+)
+_SAFE_FIELDS = frozenset(_SAFE_FIELD_NAMES)
+
+# Fixed prompt text; only the event JSON is filled in per call
+_PROMPT_TEMPLATE = """Analyze this log event and provide enrichment data:
+
+Event: {event_json}
+
+Respond with JSON containing:
+- confidence: float 0.0-1.0 (how confident you are in the analysis)
+- tags: object with key-value pairs for additional context
+- category: string describing the event category
+- priority: one of "low", "medium", "high", "critical"
+- summary: brief description (max 200 chars)
+
+Example response:
+{{
+    "confidence": 0.9,
+    "tags": {{"component": "database", "action": "connection"}},
+    "category": "system_event",
+    "priority": "medium",
+    "summary": "Database connection established successfully"
+}}"""
+
+# HTTP clients shared by every enricher that targets the same backend, so
+# connection pools and TLS sessions are reused across instances. Pools are
+# bound to the loop that opened them, so clients are kept per event loop;
+# a loop's entry goes away with the loop
+_CLIENT_CACHE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, httpx.AsyncClient]]"
+_CLIENT_CACHE = weakref.WeakKeyDictionary()
+
+
+async def close_shared_clients():
+    """Close the running loop's pooled LLM HTTP clients (call on application shutdown)."""
+    clients = _CLIENT_CACHE.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+class _JSONObjectScanner:
+    """Find where the first top-level JSON object ends in streamed text."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> int:
+        """Scan the next chunk; return the index just past the closing brace, or -1."""
+        for i, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.depth > 0
+            elif char == '{':
+                self.depth += 1
+            elif char == '}' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+def _openai_stream_delta(line: str) -> str:
+    """Extract the content delta from an OpenAI server-sent event line."""
+    if not line.startswith('data: ') or line == 'data: [DONE]':
+        return ''
+    choices = json.loads(line[6:]).get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content') or ''
+
+
+def _ollama_stream_delta(line: str) -> str:
+    """Extract the content delta from an Ollama NDJSON chat line."""
+    if not line:
+        return ''
+    return json.loads(line).get('message', {}).get('content') or ''
+
+
+class _Oversize(Exception):
+    """Raised by _approx_json_size once an object exceeds the size limit."""
+
+
+def _approx_json_size(obj: Any, limit: int, total: int = 0) -> int:
+    """Estimate the JSON-encoded size of obj without serializing it.
+    
+    Raises _Oversize as soon as the running estimate passes limit, so large
+    events are rejected after walking only part of them.
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            total = _approx_json_size(value, limit, total + len(str(key)) + 4)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            total = _approx_json_size(item, limit, total + 2)
+    else:
+        total += len(str(obj)) + 2
+    if total > limit:
+        raise _Oversize(total)
+    return total
+
+
 class LLMEnricher(Processor):
     """
     LLM-assisted enrichment with strict guardrails:
@@ -18,14 +137,48 @@ class LLMEnricher(Processor):
     - Fallback to deterministic-only on error/low confidence
     """
     
+    # LLM calls are network-bound, so batches overlap requests by default
+    DEFAULT_CONCURRENCY = 8
+    # Enrich the received event dict directly instead of copying it
+    MUTATE_IN_PLACE = True
+    # JSON schema for LLM responses (same for both backends and every instance)
+    RESPONSE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+            "tags": {
+                "type": "object",
+                "additionalProperties": {"type": "string"}
+            },
+            "category": {"type": "string"},
+            "priority": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+            "summary": {"type": "string", "maxLength": 200}
+        },
+        "required": ["confidence"],
+        "additionalProperties": False
+    }
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config, "LLMEnricher")
         
         self.enabled = config.get('enabled', False)
+        self._circuit_open = False
+        # True while events should pass straight through (disabled or circuit open)
+        self._fast_skip = not self.enabled
         if not self.enabled:
             logger.info("LLM enrichment is disabled")
             return
         
+        self._configure(config)
+        self._configure_http(config)
+        
+        logger.info(f"Initialized LLM enricher", 
+                   backend=self.backend,
+                   confidence_threshold=self.confidence_threshold,
+                   model=getattr(self, 'model', 'unknown'))
+    
+    def _configure(self, config: Dict[str, Any]):
+        """Set up backend, thresholds, model settings and circuit breaker state."""
         # Backend selection
         self.backend = config.get('backend', 'openai').lower()
         if self.backend not in ['openai', 'ollama']:
@@ -36,7 +189,6 @@ class LLMEnricher(Processor):
         
         # Safety limits
         self.max_event_size = config.get('max_event_size', 10000)  # chars
-        self.timeout_seconds = config.get('timeout', 30)
         
         # Backend-specific configuration
         if self.backend == 'openai':
@@ -53,85 +205,86 @@ class LLMEnricher(Processor):
         self.failure_count = 0
         self.last_failure_time = 0
         self.circuit_open = False
+    
+    def _configure_http(self, config: Dict[str, Any]):
+        """Set up endpoints, credentials and timeouts for talking to the backend."""
+        self.timeout_seconds = config.get('timeout', 30)
+        # Stream responses and stop reading once the JSON object is complete
+        self.stream = config.get('stream', False)
+        
+        if self.backend == 'openai':
+            self.endpoint = config.get('endpoint', 'https://api.openai.com/v1')
+            self.api_key = config.get('api_key')
+        elif self.backend == 'ollama':
+            self.base_url = config.get('ollama_base_url', 'http://localhost:11434')
+            # Convert timeout from milliseconds if provided
+            timeout_ms = config.get('ollama_timeout_ms')
+            if timeout_ms:
+                self.timeout_seconds = timeout_ms / 1000
         
         # HTTP client
         self.client = None
-        
-        # JSON schema for LLM responses (same for both backends)
-        self.response_schema = {
-            "type": "object",
-            "properties": {
-                "confidence": {"type": "number", "minimum": 0, "maximum": 1},
-                "tags": {
-                    "type": "object",
-                    "additionalProperties": {"type": "string"}
-                },
-                "category": {"type": "string"},
-                "priority": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
-                "summary": {"type": "string", "maxLength": 200}
-            },
-            "required": ["confidence"],
-            "additionalProperties": False
-        }
-        
-        logger.info(f"Initialized LLM enricher", 
-                   backend=self.backend,
-                   confidence_threshold=self.confidence_threshold,
-                   model=getattr(self, 'model', 'unknown'))
     
     def _init_openai_config(self, config: Dict[str, Any]):
         """Initialize OpenAI-specific configuration."""
-        self.endpoint = config.get('endpoint', 'https://api.openai.com/v1')
-        self.api_key = config.get('api_key')
         self.model = config.get('model', 'gpt-3.5-turbo')
         self.max_tokens = config.get('max_tokens', 150)
         self.temperature = config.get('temperature', 0.0)
     
     def _init_ollama_config(self, config: Dict[str, Any]):
         """Initialize Ollama-specific configuration."""
-        self.base_url = config.get('ollama_base_url', 'http://localhost:11434')
         self.model = config.get('ollama_model', 'llama3.1:8b-instruct-q4_0')
         self.max_tokens = config.get('ollama_max_tokens', 150)
         self.temperature = config.get('temperature', 0.0)
-        
-        # Convert timeout from milliseconds if provided
-        timeout_ms = config.get('ollama_timeout_ms')
-        if timeout_ms:
-            self.timeout_seconds = timeout_ms / 1000
+    
+    @property
+    def circuit_open(self) -> bool:
+        """Whether the circuit breaker is currently open."""
+        return self._circuit_open
+    
+    @circuit_open.setter
+    def circuit_open(self, value: bool):
+        self._circuit_open = value
+        self._fast_skip = value or not self.enabled
     
     def is_enabled(self) -> bool:
         """Override to check both config and circuit breaker state."""
         return self.enabled and not self.circuit_open
     
     async def _init_client(self):
-        """Initialize HTTP client."""
+        """Initialize HTTP client, reusing the shared one for this backend."""
         if not self.client:
-            self.client = httpx.AsyncClient(
-                timeout=httpx.Timeout(self.timeout_seconds),
-                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
-            )
+            # No await between lookup and insert, so this is race-free on one loop
+            url = getattr(self, 'endpoint', None) or getattr(self, 'base_url', None)
+            key = (self.backend, url, self.timeout_seconds)
+            clients = _CLIENT_CACHE.setdefault(asyncio.get_running_loop(), {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(self.timeout_seconds),
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                )
+                clients[key] = client
+            self.client = client
     
     async def _close_client(self):
-        """Close HTTP client."""
-        if self.client:
-            await self.client.aclose()
-            self.client = None
+        """Release the HTTP client; shared pools are closed by close_shared_clients."""
+        self.client = None
     
     async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Process event with LLM enrichment."""
-        if not self.is_enabled():
-            logger.debug("LLM enricher disabled or circuit open")
-            return event
-        
-        # Check circuit breaker
-        if self.circuit_breaker_enabled and self._should_trip_circuit():
-            return event
+        if self._fast_skip:
+            # An open circuit may have passed its reset timeout
+            if not self.enabled or self._should_trip_circuit():
+                logger.debug("LLM enricher disabled or circuit open")
+                return event
         
         try:
             # Validate event size
-            event_str = json.dumps(event)
-            if len(event_str) > self.max_event_size:
-                logger.warning("Event too large for LLM processing", size=len(event_str))
+            try:
+                _approx_json_size(event, self.max_event_size)
+            except _Oversize as e:
+                logger.warning("Event too large for LLM processing", size=e.args[0])
                 return event
             
             # Initialize client if needed
@@ -159,6 +312,13 @@ class LLMEnricher(Processor):
             logger.error("LLM enrichment failed", error=str(e))
             return event
     
+    async def process_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch with LLM calls overlapping, bounded by 'concurrency'."""
+        concurrency = self.config.get('concurrency', self.DEFAULT_CONCURRENCY)
+        if concurrency > 1 and len(events) > 1 and self.is_enabled():
+            return await self._process_batch_concurrent(events, concurrency)
+        return await super().process_batch(events)
+    
     async def _call_llm(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Call LLM API with bounded instructions."""
         
@@ -208,6 +368,14 @@ class LLMEnricher(Processor):
         headers = {k: v for k, v in headers.items() if v is not None}
         
         try:
+            if self.stream:
+                request_data["stream"] = True
+                content = await self._stream_json_content(
+                    f"{self.endpoint}/chat/completions", request_data, headers,
+                    _openai_stream_delta
+                )
+                return json.loads(content) if content else None
+            
             response = await self.client.post(
                 f"{self.endpoint}/chat/completions",
                 json=request_data,
@@ -269,24 +437,31 @@ class LLMEnricher(Processor):
         }
         
         try:
-            response = await self.client.post(
-                f"{self.base_url}/api/chat",
-                json=request_data,
-                headers=headers
-            )
-            response.raise_for_status()
-            
-            result = response.json()
+            if self.stream:
+                request_data["stream"] = True
+                content = await self._stream_json_content(
+                    f"{self.base_url}/api/chat", request_data, headers,
+                    _ollama_stream_delta
+                )
+            else:
+                response = await self.client.post(
+                    f"{self.base_url}/api/chat",
+                    json=request_data,
+                    headers=headers
+                )
+                response.raise_for_status()
+                
+                result = response.json()
+                
+                # Ollama chat response format
+                content = result.get('message', {}).get('content')
             
-            # Ollama chat response format
-            if 'message' in result and 'content' in result['message']:
-                content = result['message']['content']
+            if content is not None:
                 try:
                     return json.loads(content)
                 except json.JSONDecodeError:
                     # If content is not valid JSON, try to extract JSON from it
-                    import re
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                    json_match = _JSON_OBJECT_RE.search(content)
                     if json_match:
                         return json.loads(json_match.group())
                     else:
@@ -305,49 +480,42 @@ class LLMEnricher(Processor):
             logger.error("Ollama LLM API call failed", error=str(e))
             raise
     
+    async def _stream_json_content(self, url: str, request_data: Dict[str, Any],
+                                   headers: Dict[str, str], extract_delta) -> Optional[str]:
+        """Stream a chat response, returning as soon as a full JSON object has arrived.
+        
+        Leaving the stream context closes the response, so the rest of the
+        generation is never read.
+        """
+        scanner = _JSONObjectScanner()
+        parts = []
+        async with self.client.stream("POST", url, json=request_data, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                delta = extract_delta(line)
+                if not delta:
+                    continue
+                end = scanner.feed(delta)
+                if end >= 0:
+                    parts.append(delta[:end])
+                    break
+                parts.append(delta)
+        return ''.join(parts) or None
+    
     def _create_safe_prompt(self, event: Dict[str, Any]) -> str:
         """Create a safe prompt with bounded context."""
         
-        # Extract key fields for analysis (PII should already be redacted)
-        safe_fields = {}
-        
-        # Include only safe fields
-        safe_field_names = [
-            'type', 'severity', 'facility', 'tag', 'service', 
-            'hostname', 'message', 'category', 'tags'
-        ]
-        
-        for field in safe_field_names:
-            if field in event and event[field]:
-                safe_fields[field] = event[field]
+        # Extract key fields for analysis (PII should already be redacted);
+        # keys are emitted in _SAFE_FIELD_NAMES order so prompts stay stable
+        present = _SAFE_FIELDS & event.keys()
+        safe_fields = {field: event[field] for field in _SAFE_FIELD_NAMES
+                       if field in present and event[field]}
         
         # Truncate message if too long
         if 'message' in safe_fields and len(str(safe_fields['message'])) > 500:
             safe_fields['message'] = str(safe_fields['message'])[:500] + "..."
         
-        prompt = f"""
-Analyze this log event and provide enrichment data:
-
-Event: {json.dumps(safe_fields, indent=2)}
-
-Respond with JSON containing:
-- confidence: float 0.0-1.0 (how confident you are in the analysis)
-- tags: object with key-value pairs for additional context
-- category: string describing the event category
-- priority: one of "low", "medium", "high", "critical"
-- summary: brief description (max 200 chars)
-
-Example response:
-{{
-    "confidence": 0.9,
-    "tags": {{"component": "database", "action": "connection"}},
-    "category": "system_event",
-    "priority": "medium",
-    "summary": "Database connection established successfully"
-}}
-"""
-        
-        return prompt.strip()
+        return _PROMPT_TEMPLATE.format_map({'event_json': _COMPACT_JSON.encode(safe_fields)})
     
     def _validate_response(self, response: Dict[str, Any]) -> bool:
         """Validate LLM response against schema."""
@@ -388,8 +556,15 @@ Example response:
             return False
     
     def _apply_llm_enrichment(self, event: Dict[str, Any], llm_response: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply LLM enrichment to event."""
-        enriched_event = event.copy()
+        """Apply LLM enrichment to event.
+        
+        The pipeline hands each processor ownership of the event, so it is
+        updated in place unless 'mutate_in_place' is disabled in config.
+        """
+        if self.config.get('mutate_in_place', self.MUTATE_IN_PLACE):
+            enriched_event = event
+        else:
+            enriched_event = event.copy()
         
         # Add LLM metadata
         enriched_event['llm_enrichment'] = {
@@ -446,7 +621,7 @@ Example response:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get enhanced stats including circuit breaker state."""
-        stats = super().get_stats()
+        stats = dict(super().get_stats())
         stats.update({
             'enabled': self.enabled,
             'backend': getattr(self, 'backend', 'unknown'),
@@ -465,7 +640,7 @@ class MockLLMEnricher(LLMEnricher):
     """Mock LLM enricher for testing."""
     
     def __init__(self, config: Dict[str, Any]):
-        # Initialize parent but don't create HTTP client
+        # Parent setup skips HTTP configuration via _configure_http below
         super().__init__(config)
         self.mock_responses = config.get('mock_responses', [])
         self.response_index = 0
@@ -487,6 +662,10 @@ class MockLLMEnricher(LLMEnricher):
         self.response_index += 1
         return response
     
+    def _configure_http(self, config: Dict[str, Any]):
+        """No-op for mock; no endpoints or timeouts are needed."""
+        pass
+    
     async def _init_client(self):
         """No-op for mock."""
         pass
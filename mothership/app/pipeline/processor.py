@@ -1,101 +1,295 @@
 """Base processor classes and pipeline runner."""
 import asyncio
-from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union
+from collections import deque
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Union
 import structlog
 import time
 
 logger = structlog.get_logger()
 
-class Processor(ABC):
-    """Base class for all data processors."""
+# Shared placeholder for audit entries recorded without details
+_NO_DETAILS = MappingProxyType({})
+
+
+@dataclass(slots=True)
+class ProcessorStats:
+    """Per-processor counters."""
+    processed: int = 0
+    errors: int = 0
+    total_ns: int = 0
+
+
+class Processor:
+    """Base class for all data processors; subclasses implement process()."""
+    
+    # Pure-CPU processors set this and implement process_sync() so batches
+    # run in a plain loop instead of awaiting a coroutine per event
+    SYNC_PROCESS = False
+    # How many events a synchronous batch handles between event loop yields
+    SYNC_YIELD_EVERY = 1024
     
     def __init__(self, config: Dict[str, Any], name: str = None):
         self.config = config
         self.name = name or self.__class__.__name__
-        self.stats = {
-            'processed': 0,
-            'errors': 0,
-            'total_time': 0.0
-        }
+        self.stats = ProcessorStats()
+        # Derived stats view, rebuilt after counters change
+        self._stats_cache: Optional[MappingProxyType] = None
     
-    @abstractmethod
     async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a single event and return the modified event."""
-        pass
+        """Process a single event and return the modified event.
+        
+        The pipeline owns the event for the duration of the run, so
+        implementations may modify it in place and return it.
+        """
+        raise NotImplementedError(f"{self.name} must implement process()")
     
     async def process_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process a batch of events. Default implementation processes one by one."""
+        """Process a batch of events.
+        
+        Events are processed one by one unless the processor config sets
+        'concurrency' above 1, in which case up to that many run at once.
+        """
+        if self.SYNC_PROCESS:
+            return await self._process_batch_sync(events)
+        
+        concurrency = self.config.get('concurrency', 1)
+        if concurrency > 1 and len(events) > 1:
+            return await self._process_batch_concurrent(events, concurrency)
+        
         results = []
-        for event in events:
-            try:
-                start_time = time.time()
-                result = await self.process(event)
-                self.stats['processed'] += 1
-                self.stats['total_time'] += time.time() - start_time
-                results.append(result)
-            except Exception as e:
-                self.stats['errors'] += 1
-                logger.error(f"Error in processor {self.name}", 
-                           error=str(e), event_id=event.get('id'))
-                # Return original event on error (fail-safe)
-                results.append(event)
+        processed = errors = total_ns = 0
+        perf = time.perf_counter_ns
+        try:
+            for event in events:
+                try:
+                    start = perf()
+                    result = await self.process(event)
+                    processed += 1
+                    total_ns += perf() - start
+                    results.append(result)
+                except Exception as e:
+                    errors += 1
+                    logger.error(f"Error in processor {self.name}", 
+                               error=str(e), event_id=event.get('id'))
+                    # Return original event on error (fail-safe)
+                    results.append(event)
+        finally:
+            self._record_batch(processed, errors, total_ns)
         return results
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get processor statistics."""
-        stats = self.stats.copy()
-        if stats['processed'] > 0:
-            stats['avg_processing_time'] = stats['total_time'] / stats['processed']
-        else:
-            stats['avg_processing_time'] = 0.0
-        return stats
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a single event synchronously (SYNC_PROCESS processors only)."""
+        raise NotImplementedError(f"{self.name} does not support synchronous processing")
+    
+    async def _process_batch_sync(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch through process_sync, yielding to the loop periodically."""
+        results = []
+        processed = errors = total_ns = 0
+        process_sync = self.process_sync
+        yield_every = self.SYNC_YIELD_EVERY
+        perf = time.perf_counter_ns
+        try:
+            for i, event in enumerate(events, 1):
+                try:
+                    start = perf()
+                    result = process_sync(event)
+                    processed += 1
+                    total_ns += perf() - start
+                    results.append(result)
+                except Exception as e:
+                    errors += 1
+                    logger.error(f"Error in processor {self.name}", 
+                               error=str(e), event_id=event.get('id'))
+                    # Return original event on error (fail-safe)
+                    results.append(event)
+                if i % yield_every == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._record_batch(processed, errors, total_ns)
+        return results
+    
+    async def _process_batch_concurrent(self, events: List[Dict[str, Any]],
+                                        concurrency: int) -> List[Dict[str, Any]]:
+        """Process a batch with at most `concurrency` events in flight, keeping order."""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def process_one(event: Dict[str, Any]):
+            async with semaphore:
+                start = time.perf_counter_ns()
+                try:
+                    result = await self.process(event)
+                except Exception as e:
+                    logger.error(f"Error in processor {self.name}", 
+                               error=str(e), event_id=event.get('id'))
+                    # Return original event on error (fail-safe)
+                    return event, False, 0
+                return result, True, time.perf_counter_ns() - start
+        
+        outcomes = await asyncio.gather(*(process_one(event) for event in events))
+        
+        results = []
+        processed = 0
+        elapsed = 0
+        for result, ok, duration in outcomes:
+            results.append(result)
+            if ok:
+                processed += 1
+                elapsed += duration
+        self._record_batch(processed, len(events) - processed, elapsed)
+        return results
+    
+    def _record_batch(self, processed: int, errors: int, total_ns: int):
+        """Fold a batch's counters into stats in one update rather than per event."""
+        stats = self.stats
+        stats.processed += processed
+        stats.errors += errors
+        stats.total_ns += total_ns
+        self._stats_cache = None
+    
+    def get_stats(self) -> Mapping[str, Any]:
+        """Get processor statistics as a read-only view.
+        
+        The view is cached until the next batch updates the counters.
+        """
+        if self._stats_cache is None:
+            stats = asdict(self.stats)
+            stats['total_time'] = stats['total_ns'] / 1e9
+            if stats['processed'] > 0:
+                stats['avg_processing_time'] = stats['total_ns'] / stats['processed'] / 1e9
+            else:
+                stats['avg_processing_time'] = 0.0
+            self._stats_cache = MappingProxyType(stats)
+        return self._stats_cache
     
     def is_enabled(self) -> bool:
         """Check if processor is enabled in config."""
         return self.config.get('enabled', True)
 
 
+class SyncProcessor(Processor):
+    """Base class for processors whose per-event work is synchronous."""
+    
+    SYNC_PROCESS = True
+    
+    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a single event; delegates to process_sync."""
+        return self.process_sync(event)
+
+
+async def run_fused_batch(processors: Sequence[Processor], events: List[Dict[str, Any]],
+                          parent: Optional[Processor] = None) -> List[Dict[str, Any]]:
+    """Run each event through every sync processor in turn before the next event.
+    
+    Saves a pass and a result list per processor; a failing step leaves
+    the event as it was and the remaining steps still run, as they would
+    have with one batch per processor. Each processor is charged the time
+    of its own steps; a composite `parent` is charged the whole pass.
+    Stats are recorded even if the batch is cancelled part way.
+    """
+    steps = [p.process_sync for p in processors]
+    step_errors = [0] * len(steps)
+    step_ns = [0] * len(steps)
+    yield_every = min(p.SYNC_YIELD_EVERY for p in processors)
+    perf = time.perf_counter_ns
+    start = perf()
+    results = []
+    try:
+        for i, event in enumerate(events, 1):
+            mark = perf()
+            for j, step in enumerate(steps):
+                try:
+                    event = step(event)
+                except Exception as e:
+                    step_errors[j] += 1
+                    logger.error(f"Error in processor {processors[j].name}", 
+                               error=str(e), event_id=event.get('id'))
+                now = perf()
+                step_ns[j] += now - mark
+                mark = now
+            results.append(event)
+            if i % yield_every == 0:
+                await asyncio.sleep(0)
+    finally:
+        done = len(results)
+        for processor, errors, total_ns in zip(processors, step_errors, step_ns):
+            processor._record_batch(done - errors, errors, total_ns)
+        if parent is not None:
+            parent._record_batch(done, 0, perf() - start)
+    return results
+
+
 class Pipeline:
     """Pipeline runner that orchestrates multiple processors."""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.processors: List[Processor] = []
+        # Run plan: single processors, or tuples of adjacent fusable ones
+        self._stages: List[Union[Processor, tuple]] = []
         self.stats = {
             'total_events': 0,
             'successful_events': 0,
             'failed_events': 0,
-            'total_time': 0.0
+            'total_ns': 0
         }
     
     def add_processor(self, processor: Processor):
         """Add a processor to the pipeline."""
         if processor.is_enabled():
             self.processors.append(processor)
+            self._stages = self._build_stages(self.processors)
             logger.info(f"Added processor to pipeline", processor=processor.name)
         else:
             logger.info(f"Processor disabled, skipping", processor=processor.name)
     
+    @staticmethod
+    def _is_fusable(processor: Processor) -> bool:
+        """Sync processors using the stock batch loop can share one pass over a batch."""
+        return (processor.SYNC_PROCESS
+                and type(processor).process_batch is Processor.process_batch)
+    
+    @classmethod
+    def _build_stages(cls, processors: List[Processor]) -> List[Union[Processor, tuple]]:
+        """Group runs of two or more adjacent fusable processors into tuples."""
+        stages = []
+        run = []
+        for processor in processors + [None]:
+            if processor is not None and cls._is_fusable(processor):
+                run.append(processor)
+                continue
+            if len(run) > 1:
+                stages.append(tuple(run))
+            else:
+                stages.extend(run)
+            run = []
+            if processor is not None:
+                stages.append(processor)
+        return stages
+    
     async def process_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process a batch of events through the pipeline."""
         if not events:
             return []
         
-        start_time = time.time()
+        start = time.perf_counter_ns()
         current_events = events.copy()
         
         try:
-            # Process through each processor in order
-            for processor in self.processors:
-                logger.debug(f"Processing batch through {processor.name}", 
+            # Process through each stage in order
+            for stage in self._stages:
+                if isinstance(stage, tuple):
+                    current_events = await run_fused_batch(stage, current_events)
+                    continue
+                logger.debug(f"Processing batch through {stage.name}", 
                            events=len(current_events))
-                current_events = await processor.process_batch(current_events)
+                current_events = await stage.process_batch(current_events)
             
             # Update statistics
             self.stats['total_events'] += len(events)
             self.stats['successful_events'] += len(current_events)
-            self.stats['total_time'] += time.time() - start_time
+            self.stats['total_ns'] += time.perf_counter_ns() - start
             
             logger.info("Pipeline processing completed", 
                        input_events=len(events), 
@@ -116,13 +310,14 @@ class Pipeline:
     def get_stats(self) -> Dict[str, Any]:
         """Get pipeline statistics including processor stats."""
         stats = self.stats.copy()
+        stats['total_time'] = stats['total_ns'] / 1e9
         stats['processors'] = {}
         
         for processor in self.processors:
-            stats['processors'][processor.name] = processor.get_stats()
+            stats['processors'][processor.name] = dict(processor.get_stats())
         
         if stats['total_events'] > 0:
-            stats['avg_processing_time'] = stats['total_time'] / stats['total_events']
+            stats['avg_processing_time'] = stats['total_ns'] / stats['total_events'] / 1e9
             stats['success_rate'] = stats['successful_events'] / stats['total_events']
         else:
             stats['avg_processing_time'] = 0.0
@@ -138,32 +333,36 @@ class Pipeline:
 class ProcessingContext:
     """Context object passed through the pipeline for sharing state."""
     
-    def __init__(self, pipeline_id: str = None):
+    def __init__(self, pipeline_id: str = None, audit_max: int = 1024):
         self.pipeline_id = pipeline_id or f"pipeline_{int(time.time() * 1000)}"
         self.metadata = {}
-        self.audit_log = []
+        # Bounded log of (processor, action, timestamp, details) tuples
+        self.audit_log = deque(maxlen=audit_max)
         self.start_time = time.time()
+        self._start_ns = time.perf_counter_ns()
     
     def add_audit_entry(self, processor_name: str, action: str, details: Dict[str, Any] = None):
-        """Add an entry to the audit log."""
-        entry = {
-            'processor': processor_name,
-            'action': action,
-            'timestamp': time.time(),
-            'details': details or {}
-        }
-        self.audit_log.append(entry)
+        """Add an entry to the audit log, dropping the oldest once full."""
+        self.audit_log.append((processor_name, action, time.time(), details or _NO_DETAILS))
     
     def get_processing_time(self) -> float:
         """Get total processing time so far."""
-        return time.time() - self.start_time
+        return (time.perf_counter_ns() - self._start_ns) / 1e9
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert context to dictionary for logging/storage."""
         return {
             'pipeline_id': self.pipeline_id,
             'metadata': self.metadata,
-            'audit_log': self.audit_log,
+            'audit_log': [
+                {
+                    'processor': processor_name,
+                    'action': action,
+                    'timestamp': timestamp,
+                    'details': dict(details)
+                }
+                for processor_name, action, timestamp, details in self.audit_log
+            ],
             'processing_time': self.get_processing_time(),
             'start_time': self.start_time
         }
\ No newline at end of file
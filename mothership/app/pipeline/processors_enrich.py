@@ -1,37 +1,127 @@
 """Deterministic enrichment processors."""
+import functools
+import logging
 import re
+import socket
+import struct
+import sys
 import time
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Union
 from urllib.parse import urlparse
 import structlog
-from .processor import Processor
+from .processor import SyncProcessor
 
 logger = structlog.get_logger()
+# stdlib logger structlog routes through; checked before building debug-only data
+_level_logger = logging.getLogger(__name__)
 
-class AddTagsProcessor(Processor):
+# Network-order unsigned 32-bit int, for packed IPv4 addresses
+_IPV4_STRUCT = struct.Struct('!I')
+
+# Event fields consulted, in order, for paths, hostnames and source IPs
+_PATH_FIELDS = ('path', 'file', 'source', 'log_file', 'filename')
+_HOSTNAME_FIELDS = ('hostname', 'host', 'source_host')
+_IP_FIELDS = ('source_ip', 'client_ip', 'remote_addr', 'ip', 'src_ip')
+
+# Distinct keys remembered by the path/IP/hostname lookup caches
+_LOOKUP_CACHE_SIZE = 4096
+
+# Distinct raw severity strings memoized before the memo is reset
+_SEVERITY_MEMO_SIZE = 4096
+
+
+def _parse_iso_utc(ts: str) -> Optional[datetime]:
+    """Parse 'YYYY-MM-DDTHH:MM:SS[.ffffff]Z' or 'YYYY-MM-DD HH:MM:SS' as UTC.
+    
+    Mirrors the strptime formats TimestampNormalizer accepts for these
+    shapes using datetime.fromisoformat; returns None for anything else.
+    """
+    if len(ts) < 19 or ts[4] != '-':
+        return None
+    sep = ts[10]
+    if sep == 'T' and ts[-1] == 'Z':
+        body = ts[:-1]
+        if len(body) != 19 and not (21 <= len(body) <= 26 and body[19] == '.'):
+            return None
+    elif sep == ' ' and len(ts) == 19:
+        body = ts
+    else:
+        return None
+    try:
+        dt = datetime.fromisoformat(body)
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc)
+
+
+class _ColumnarProcessor(SyncProcessor):
+    """Base for enrichers whose result depends only on a small lookup key.
+    
+    Batches are handled column-wise: every event's key is extracted once,
+    each distinct key is resolved once, and results are applied back.
+    """
+    
+    def _lookup_key(self, event: Dict[str, Any]) -> Any:
+        """Extract the hashable key this processor resolves from an event."""
+        raise NotImplementedError
+    
+    def _resolve(self, key: Any) -> Any:
+        """Resolve a key to its enrichment result."""
+        raise NotImplementedError
+    
+    def _apply(self, event: Dict[str, Any], key: Any, resolved: Any) -> Dict[str, Any]:
+        """Write a resolved result into the event (copy on write)."""
+        raise NotImplementedError
+    
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Enrich a single event."""
+        key = self._lookup_key(event)
+        return self._apply(event, key, self._resolve(key))
+    
+    async def process_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enrich a batch column-wise, falling back to per-event processing on error."""
+        start = time.perf_counter_ns()
+        try:
+            keys = [self._lookup_key(event) for event in events]
+            resolve = self._resolve
+            resolved = {key: resolve(key) for key in set(keys)}
+            apply = self._apply
+            results = [apply(event, key, resolved[key]) for event, key in zip(events, keys)]
+        except Exception as e:
+            logger.warning(f"Columnar batch failed in {self.name}, processing per event",
+                         error=str(e))
+            return await super().process_batch(events)
+        
+        self._record_batch(len(events), 0, time.perf_counter_ns() - start)
+        return results
+
+
+class AddTagsProcessor(SyncProcessor):
     """Processor that adds static tags to events."""
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config, "AddTags")
-        self.add_tags = config.get('add_tags', {})
+        # Interned so every event shares the same key/value objects
+        self.add_tags = {
+            sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+            for key, value in config.get('add_tags', {}).items()
+        }
         logger.info(f"Initialized AddTags processor", tags=self.add_tags)
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
-        """Add configured tags to the event."""
-        processed_event = event.copy()
-        
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Add configured tags to the event (in place)."""
         # Add tags, preserving existing ones
-        if 'tags' not in processed_event:
-            processed_event['tags'] = {}
-        
-        for key, value in self.add_tags.items():
-            processed_event['tags'][key] = value
+        tags = event.get('tags')
+        if tags is None:
+            event['tags'] = dict(self.add_tags)
+        else:
+            tags.update(self.add_tags)
         
-        return processed_event
+        return event
 
 
-class SeverityMapProcessor(Processor):
+class SeverityMapProcessor(SyncProcessor):
     """Processor that maps string severities to numeric values."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -46,29 +136,54 @@ class SeverityMapProcessor(Processor):
             'informational': 6, 'info': 6,
             'debug': 7
         })
+        # Memo of raw severity string -> numeric value (None when unmapped),
+        # seeded with the already-canonical keys so they skip lower()/strip()
+        self._fast: Dict[str, Optional[int]] = {
+            key: value for key, value in self.severity_mapping.items()
+            if isinstance(key, str) and key == key.lower().strip()
+        }
         logger.info(f"Initialized SeverityMap processor", 
                    mappings=len(self.severity_mapping))
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Map severity strings to numeric values."""
+        if 'severity' not in event:
+            return event
+        
+        raw = event['severity']
+        if type(raw) is str and raw in self._fast:
+            severity_num = self._fast[raw]
+        else:
+            severity_num = self._map_severity(raw)
+            if type(raw) is str:
+                if len(self._fast) >= _SEVERITY_MEMO_SIZE:
+                    self._fast.clear()
+                self._fast[raw] = severity_num
+        
+        if severity_num is None:
+            return event
+        
         processed_event = event.copy()
+        processed_event['severity_num'] = severity_num
+        return processed_event
+    
+    def _map_severity(self, raw: Any) -> Optional[int]:
+        """Resolve a severity value to its numeric level, or None."""
+        severity = str(raw).lower().strip()
         
-        if 'severity' in processed_event:
-            severity = str(processed_event['severity']).lower().strip()
-            
-            if severity in self.severity_mapping:
-                processed_event['severity_num'] = self.severity_mapping[severity]
+        if severity in self.severity_mapping:
+            if _level_logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Mapped severity", 
-                           original=processed_event['severity'],
-                           numeric=processed_event['severity_num'])
-            elif severity.isdigit():
-                # Already numeric, just copy
-                processed_event['severity_num'] = int(severity)
-        
-        return processed_event
+                           original=raw,
+                           numeric=self.severity_mapping[severity])
+            return self.severity_mapping[severity]
+        elif severity.isdigit():
+            # Already numeric, just copy
+            return int(severity)
+        return None
 
 
-class ServiceFromPathProcessor(Processor):
+class ServiceFromPathProcessor(_ColumnarProcessor):
     """Processor that extracts service names from log paths or hostnames."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -88,54 +203,72 @@ class ServiceFromPathProcessor(Processor):
         
         # Compile regex patterns
         self.compiled_patterns = []
+        # Same order as compiled_patterns; plain literal patterns (most of
+        # them) carry their lowercased text so they match by substring test,
+        # and each entry records whether its service is a group template
+        self._matchers = []
         for pattern, service in self.path_patterns:
             try:
                 compiled = re.compile(pattern, re.IGNORECASE)
                 self.compiled_patterns.append((compiled, service))
+                literal = pattern.lower() if re.escape(pattern) == pattern else None
+                self._matchers.append((literal, compiled, service, '\\' in service))
             except re.error as e:
                 logger.warning(f"Invalid service pattern: {pattern}", error=str(e))
         
+        # Per-instance memo of path -> service; paths repeat heavily
+        self._service_for_path = functools.lru_cache(maxsize=_LOOKUP_CACHE_SIZE)(
+            self._extract_service_from_path)
+        
         logger.info(f"Initialized ServiceFromPath processor", 
                    patterns=len(self.compiled_patterns))
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _lookup_key(self, event: Dict[str, Any]) -> tuple:
+        """Non-empty path values and hostname values, in field order."""
+        return (tuple(str(event[field]) for field in _PATH_FIELDS if event.get(field)),
+                tuple(str(event[field]) for field in _HOSTNAME_FIELDS if event.get(field)))
+    
+    def _resolve(self, key: tuple) -> Optional[str]:
         """Extract service name from paths or hostnames."""
-        processed_event = event.copy()
-        service_name = None
+        paths, hostnames = key
         
         # Try to extract from various fields
-        path_fields = ['path', 'file', 'source', 'log_file', 'filename']
-        for field in path_fields:
-            if field in processed_event and processed_event[field]:
-                service_name = self._extract_service_from_path(str(processed_event[field]))
-                if service_name:
-                    break
+        for path in paths:
+            service_name = self._service_for_path(path)
+            if service_name:
+                return service_name
         
         # Try hostname if no service found
+        for hostname in hostnames:
+            service_name = self._extract_service_from_hostname(hostname)
+            if service_name:
+                return service_name
+        
+        return None
+    
+    def _apply(self, event: Dict[str, Any], key: tuple, service_name: Optional[str]) -> Dict[str, Any]:
+        """Set the extracted service name on the event."""
         if not service_name:
-            hostname_fields = ['hostname', 'host', 'source_host']
-            for field in hostname_fields:
-                if field in processed_event and processed_event[field]:
-                    service_name = self._extract_service_from_hostname(str(processed_event[field]))
-                    if service_name:
-                        break
-        
-        if service_name:
-            processed_event['service'] = service_name
-            logger.debug("Extracted service", service=service_name)
+            return event
         
+        processed_event = event.copy()
+        processed_event['service'] = service_name
+        if _level_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Extracted service", service=service_name)
         return processed_event
     
     def _extract_service_from_path(self, path: str) -> Optional[str]:
         """Extract service name from file path."""
-        for pattern, service_template in self.compiled_patterns:
+        lowered = path.lower()
+        for literal, pattern, service_template, is_template in self._matchers:
+            if literal is not None:
+                if literal in lowered:
+                    return service_template
+                continue
             match = pattern.search(path)
             if match:
-                if '\\' in service_template:  # Regex substitution
-                    # Use the match directly for group substitution
-                    return match.expand(service_template)
-                else:
-                    return service_template
+                # Templates like r'\1' take their value from the match groups
+                return match.expand(service_template) if is_template else service_template
         return None
     
     def _extract_service_from_hostname(self, hostname: str) -> Optional[str]:
@@ -147,7 +280,7 @@ class ServiceFromPathProcessor(Processor):
         return hostname
 
 
-class GeoHintProcessor(Processor):
+class GeoHintProcessor(_ColumnarProcessor):
     """Processor that adds geographical hints based on source IP."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -158,30 +291,39 @@ class GeoHintProcessor(Processor):
         
         # Subnet to location mapping
         self.subnet_location_map = config.get('subnet_location_map', {})
+        self._subnet_tables = self._build_subnet_tables()
+        
+        # Per-instance memo of IP -> location hint
+        self._location_for_ip = functools.lru_cache(maxsize=_LOOKUP_CACHE_SIZE)(
+            self._get_location_hint)
         
         logger.info(f"Initialized GeoHint processor", 
                    ip_mappings=len(self.ip_location_map),
                    subnet_mappings=len(self.subnet_location_map))
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _lookup_key(self, event: Dict[str, Any]) -> Optional[str]:
+        """Get the source IP address from the first populated IP field."""
+        for field in _IP_FIELDS:
+            if field in event and event[field]:
+                return str(event[field])
+        return None
+    
+    def _resolve(self, source_ip: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get the location hint for a source IP, if any."""
+        if not source_ip:
+            return None
+        return self._location_for_ip(source_ip)
+    
+    def _apply(self, event: Dict[str, Any], source_ip: Optional[str],
+               location: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Add geographical hints to the event."""
-        processed_event = event.copy()
-        
-        # Try to get IP address from various fields
-        ip_fields = ['source_ip', 'client_ip', 'remote_addr', 'ip', 'src_ip']
-        source_ip = None
-        
-        for field in ip_fields:
-            if field in processed_event and processed_event[field]:
-                source_ip = str(processed_event[field])
-                break
-        
-        if source_ip:
-            location = self._get_location_hint(source_ip)
-            if location:
-                processed_event['geo_hint'] = location
-                logger.debug("Added geo hint", ip=source_ip, location=location)
+        if not location:
+            return event
         
+        processed_event = event.copy()
+        processed_event['geo_hint'] = location
+        if _level_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Added geo hint", ip=source_ip, location=location)
         return processed_event
     
     def _get_location_hint(self, ip: str) -> Optional[Dict[str, Any]]:
@@ -190,42 +332,73 @@ class GeoHintProcessor(Processor):
         if ip in self.ip_location_map:
             return self.ip_location_map[ip]
         
-        # Subnet lookup
-        for subnet, location in self.subnet_location_map.items():
-            if self._ip_in_subnet(ip, subnet):
-                return location
+        # Subnet lookup, most specific prefix first
+        if self._subnet_tables:
+            try:
+                ip_int = self._ip_to_int(ip)
+            except (OSError, ValueError):
+                return None
+            for mask, table in self._subnet_tables:
+                location = table.get(ip_int & mask)
+                if location is not None:
+                    return location
         
         return None
     
+    def _build_subnet_tables(self) -> List[tuple]:
+        """Index subnet_location_map as (mask, {network: location}) per prefix length."""
+        by_prefix: Dict[int, Dict[int, Any]] = {}
+        for subnet, location in self.subnet_location_map.items():
+            try:
+                network, _, prefix = subnet.partition('/')
+                prefix_len = int(prefix) if prefix else 32
+                if not 0 <= prefix_len <= 32:
+                    raise ValueError(f"prefix length out of range: {prefix_len}")
+                mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
+                network_int = self._ip_to_int(network) & mask
+            except (OSError, ValueError) as e:
+                logger.warning(f"Invalid subnet: {subnet}", error=str(e))
+                continue
+            # Keep the first configured location for duplicate networks
+            by_prefix.setdefault(prefix_len, {}).setdefault(network_int, location)
+        
+        return [((0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF, by_prefix[prefix_len])
+                for prefix_len in sorted(by_prefix, reverse=True)]
+    
     def _ip_in_subnet(self, ip: str, subnet: str) -> bool:
-        """Simple subnet check (basic implementation)."""
+        """Check whether an IPv4 address falls inside a subnet."""
         try:
-            # This is a simplified implementation
-            # In production, use ipaddress module
             if '/' not in subnet:
                 return ip == subnet
             
             network, prefix_len = subnet.split('/')
-            prefix_len = int(prefix_len)
-            
-            # Convert IPs to integers for comparison
-            ip_int = self._ip_to_int(ip)
-            network_int = self._ip_to_int(network)
-            
-            # Create subnet mask
-            mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
-            
-            return (ip_int & mask) == (network_int & mask)
-        except:
+            mask = (0xFFFFFFFF << (32 - int(prefix_len))) & 0xFFFFFFFF
+            return (self._ip_to_int(ip) & mask) == (self._ip_to_int(network) & mask)
+        except (OSError, ValueError):
             return False
     
     def _ip_to_int(self, ip: str) -> int:
-        """Convert IP string to integer."""
+        """Convert a dotted-quad IPv4 string to an integer."""
+        try:
+            # Strict: exactly four decimal octets, no trailing text
+            return _IPV4_STRUCT.unpack(socket.inet_pton(socket.AF_INET, ip))[0]
+        except OSError:
+            pass
+        # inet_pton rejects zero-padded octets ('10.0.0.010'); those have
+        # always been read as decimal
         parts = ip.split('.')
-        return (int(parts[0]) << 24) + (int(parts[1]) << 16) + (int(parts[2]) << 8) + int(parts[3])
+        if len(parts) != 4 or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValueError(f"not a dotted-quad IPv4 address: {ip}")
+        value = 0
+        for part in parts:
+            octet = int(part)
+            if octet > 255:
+                raise ValueError(f"octet out of range in IPv4 address: {ip}")
+            value = (value << 8) | octet
+        return value
 
 
-class SiteEnvTagsProcessor(Processor):
+class SiteEnvTagsProcessor(_ColumnarProcessor):
     """Processor that adds site and environment tags based on hostname patterns."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -245,41 +418,65 @@ class SiteEnvTagsProcessor(Processor):
         
         # Compile patterns
         self.compiled_patterns = []
+        # (pattern, site, site_is_template, env, env_is_template) per pattern,
+        # so matching needs no dict lookups or template scans
+        self._rules = []
         for pattern, tags in self.site_patterns:
             try:
                 compiled = re.compile(pattern, re.IGNORECASE)
                 self.compiled_patterns.append((compiled, tags))
+                site = tags.get('site')
+                env = tags.get('env')
+                self._rules.append((
+                    compiled,
+                    site, site is not None and '\\' in site,
+                    env, env is not None and '\\' in env
+                ))
             except re.error as e:
                 logger.warning(f"Invalid site pattern: {pattern}", error=str(e))
         
+        # Per-instance memo of hostname -> (site, env)
+        self._site_env_for_host = functools.lru_cache(maxsize=_LOOKUP_CACHE_SIZE)(
+            self._extract_site_env)
+        
         logger.info(f"Initialized SiteEnvTags processor", 
                    patterns=len(self.compiled_patterns))
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _lookup_key(self, event: Dict[str, Any]) -> Optional[str]:
+        """Get the hostname from the first populated hostname field."""
+        for field in _HOSTNAME_FIELDS:
+            if field in event and event[field]:
+                return str(event[field])
+        return None
+    
+    def _resolve(self, hostname: Optional[str]) -> tuple:
+        """Get (site, env) for a hostname."""
+        if not hostname:
+            return None, None
+        return self._site_env_for_host(hostname)
+    
+    def _apply(self, event: Dict[str, Any], hostname: Optional[str],
+               site_env: tuple) -> Dict[str, Any]:
         """Add site and environment tags based on hostname."""
-        processed_event = event.copy()
+        site, env = site_env
         
-        # Get hostname
-        hostname_fields = ['hostname', 'host', 'source_host']
-        hostname = None
+        # Nothing to write: no match and no defaults that could apply
+        if not (site or env) and not (
+                'tags' in event and (self.default_site or self.default_env)):
+            return event
         
-        for field in hostname_fields:
-            if field in processed_event and processed_event[field]:
-                hostname = str(processed_event[field])
-                break
+        processed_event = event.copy()
         
-        if hostname:
-            site, env = self._extract_site_env(hostname)
+        if site or env:
+            if 'tags' not in processed_event:
+                processed_event['tags'] = {}
             
-            if site or env:
-                if 'tags' not in processed_event:
-                    processed_event['tags'] = {}
-                
-                if site:
-                    processed_event['tags']['site'] = site
-                if env:
-                    processed_event['tags']['environment'] = env
-                
+            if site:
+                processed_event['tags']['site'] = site
+            if env:
+                processed_event['tags']['environment'] = env
+            
+            if _level_logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Added site/env tags", 
                            hostname=hostname, site=site, env=env)
         
@@ -294,63 +491,73 @@ class SiteEnvTagsProcessor(Processor):
     
     def _extract_site_env(self, hostname: str) -> tuple:
         """Extract site and environment from hostname."""
-        for pattern, tags in self.compiled_patterns:
+        for pattern, site, site_is_template, env, env_is_template in self._rules:
             match = pattern.search(hostname)
             if match:
-                site = None
-                env = None
-                
-                if 'site' in tags:
-                    site_template = tags['site']
-                    if '\\' in site_template:  # Regex substitution
-                        site = match.expand(site_template)
-                    else:
-                        site = site_template
-                
-                if 'env' in tags:
-                    env_template = tags['env']
-                    if '\\' in env_template:  # Regex substitution
-                        env = match.expand(env_template)
-                    else:
-                        env = env_template
-                
+                # Regex substitution for templates like r'\1'
+                if site_is_template:
+                    site = match.expand(site)
+                if env_is_template:
+                    env = match.expand(env)
                 return site, env
         
         return None, None
 
 
-class TimestampNormalizer(Processor):
+class TimestampNormalizer(SyncProcessor):
     """Processor that normalizes timestamps to ISO format."""
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config, "TimestampNormalizer")
         self.timestamp_fields = config.get('timestamp_fields', ['timestamp', 'time', '@timestamp'])
         self.default_timezone = config.get('default_timezone', 'UTC')
+        # Fill-in timestamp shared by every event of the batch in progress
+        self._now_iso: Optional[str] = None
         
         logger.info(f"Initialized TimestampNormalizer processor",
                    fields=self.timestamp_fields)
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    async def process_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize a batch, formatting the default timestamp only once."""
+        self._now_iso = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        try:
+            return await super().process_batch(events)
+        finally:
+            self._now_iso = None
+    
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize timestamp to ISO format."""
-        processed_event = event.copy()
-        
+        present = False
         for field in self.timestamp_fields:
-            if field in processed_event:
-                normalized_ts = self._normalize_timestamp(processed_event[field])
+            if field in event:
+                present = True
+                value = event[field]
+                normalized_ts = self._normalize_timestamp(value)
                 if normalized_ts:
+                    if normalized_ts == value:
+                        return event
+                    processed_event = event.copy()
                     processed_event[field] = normalized_ts
-                    break
+                    return processed_event
         
-        # Ensure there's always a timestamp
-        if not any(field in processed_event for field in self.timestamp_fields):
-            processed_event['timestamp'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        if present:
+            return event
         
+        # Ensure there's always a timestamp
+        processed_event = event.copy()
+        processed_event['timestamp'] = (
+            self._now_iso or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
         return processed_event
     
     def _normalize_timestamp(self, ts: Any) -> Optional[str]:
         """Normalize various timestamp formats to ISO string."""
         try:
             if isinstance(ts, str):
+                # Common ISO shapes go through the C parser first
+                dt = _parse_iso_utc(ts)
+                if dt is not None:
+                    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+                
                 # Try parsing various formats
                 for fmt in ['%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ', 
                            '%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S']:
@@ -1,41 +1,53 @@
 """Deterministic redaction processors - applied BEFORE any LLM processing for PII safety."""
+import logging
 import re
 import hashlib
 from typing import Dict, Any, List, Optional, Union
 import structlog
-from .processor import Processor, ProcessingContext
+from .processor import Processor, SyncProcessor, ProcessingContext, run_fused_batch
 
 logger = structlog.get_logger()
+# stdlib logger structlog routes through; checked before building debug-only data
+_level_logger = logging.getLogger(__name__)
 
-class DropFieldsProcessor(Processor):
+# Salted-prefix hash algorithms accepted by HashFieldsProcessor ('blake2b'
+# is handled separately as a keyed hash)
+_HASH_CONSTRUCTORS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+}
+
+# Numbered or named backreferences in a user-supplied pattern
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class DropFieldsProcessor(SyncProcessor):
     """Processor that drops specified fields from events."""
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config, "DropFields")
         self.drop_fields = config.get('drop_fields', [])
+        self._drop = frozenset(self.drop_fields)
         logger.info(f"Initialized DropFields processor", 
                    fields_to_drop=self.drop_fields)
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Drop specified fields from the event."""
-        if not self.drop_fields:
+        if self._drop.isdisjoint(event):
             return event
         
         processed_event = event.copy()
-        dropped_fields = []
+        for field in self._drop:
+            processed_event.pop(field, None)
         
-        for field in self.drop_fields:
-            if field in processed_event:
-                del processed_event[field]
-                dropped_fields.append(field)
-        
-        if dropped_fields:
-            logger.debug("Dropped fields", dropped_fields=dropped_fields)
+        if _level_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Dropped fields", dropped_fields=sorted(self._drop.intersection(event)))
         
         return processed_event
 
 
-class MaskPatternsProcessor(Processor):
+class MaskPatternsProcessor(SyncProcessor):
     """Processor that masks sensitive patterns in string values."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -52,45 +64,75 @@ class MaskPatternsProcessor(Processor):
         
         self.mask_char = config.get('mask_char', '*')
         self.mask_length = config.get('mask_length', 8)
+        # Replacement strings indexed by masked length, built once
+        self._masks = [self.mask_char * i for i in range(self.mask_length + 1)]
+        self._full_mask = self._masks[self.mask_length]
+        
+        # One alternation of every pattern, used only to skip strings no
+        # pattern matches; masking itself stays one sub() per pattern, since
+        # an earlier pattern can rewrite text a later one would have matched.
+        # Backreferences or named groups would be renumbered or clash, so
+        # those configurations skip the prefilter
+        self._union = None
+        if self.compiled_patterns and not any(
+                compiled.groupindex or _BACKREF_RE.search(pattern)
+                for pattern, compiled in self.compiled_patterns):
+            try:
+                self._union = re.compile(
+                    '|'.join(f'(?:{pattern})' for pattern, _ in self.compiled_patterns),
+                    re.IGNORECASE
+                )
+            except re.error as e:
+                logger.warning("Could not combine mask patterns", error=str(e))
         
         logger.info(f"Initialized MaskPatterns processor", 
                    patterns=len(self.compiled_patterns))
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
-        """Mask sensitive patterns in the event."""
-        processed_event = self._mask_recursive(event)
-        return processed_event
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Mask sensitive patterns in the event (in place)."""
+        self._mask_inplace(event)
+        return event
     
-    def _mask_recursive(self, obj: Any) -> Any:
-        """Recursively mask patterns in nested objects."""
-        if isinstance(obj, dict):
-            return {k: self._mask_recursive(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._mask_recursive(item) for item in obj]
-        elif isinstance(obj, str):
-            return self._mask_string(obj)
-        else:
-            return obj
+    def _mask_inplace(self, root: Any):
+        """Mask strings in nested dicts/lists with an explicit stack.
+        
+        Containers are updated in place and only slots whose string
+        actually changed are reassigned.
+        """
+        mask_string = self._mask_string
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            items = node.items() if isinstance(node, dict) else enumerate(node)
+            for key, value in items:
+                if isinstance(value, str):
+                    masked = mask_string(value)
+                    if masked is not value:
+                        node[key] = masked
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
     
     def _mask_string(self, text: str) -> str:
         """Mask sensitive patterns in a string."""
-        masked_text = text
+        if self._union is not None and not self._union.search(text):
+            return text
         
+        masked_text = text
         for pattern_str, compiled_pattern in self.compiled_patterns:
-            def replace_match(match):
-                # Replace with mask characters, preserving length if reasonable
-                original_length = len(match.group(0))
-                if original_length <= self.mask_length * 2:
-                    return self.mask_char * min(original_length, self.mask_length)
-                else:
-                    return self.mask_char * self.mask_length
-            
-            masked_text = compiled_pattern.sub(replace_match, masked_text)
+            masked_text = compiled_pattern.sub(self._replace_match, masked_text)
         
         return masked_text
+    
+    def _replace_match(self, match: re.Match) -> str:
+        """Replace with mask characters, preserving length if reasonable."""
+        original_length = match.end() - match.start()
+        if original_length <= self.mask_length * 2:
+            return self._masks[min(original_length, self.mask_length)]
+        else:
+            return self._full_mask
 
 
-class HashFieldsProcessor(Processor):
+class HashFieldsProcessor(SyncProcessor):
     """Processor that hashes specified fields for pseudonymization."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -100,49 +142,65 @@ class HashFieldsProcessor(Processor):
         self.hash_algorithm = config.get('algorithm', 'sha256')
         self.preserve_original = config.get('preserve_original', False)
         
+        # Resolve the hash function once; the salt is encoded up front so
+        # each field only needs a single encode
+        self._salt_bytes = self.salt.encode()
+        if self.hash_algorithm == 'blake2b':
+            # BLAKE2b keys are capped at 64 bytes; longer salts are digested
+            key = self._salt_bytes
+            self._blake2b_key = key if len(key) <= 64 else hashlib.blake2b(key).digest()
+            self._hash_bytes = self._hash_blake2b
+        else:
+            constructor = _HASH_CONSTRUCTORS.get(self.hash_algorithm)
+            if constructor is None:
+                logger.warning(f"Unknown hash algorithm: {self.hash_algorithm}, using sha256")
+                constructor = hashlib.sha256
+            self._hash_constructor = constructor
+            self._hash_bytes = self._hash_salted
+        
         logger.info(f"Initialized HashFields processor", 
                    fields_to_hash=self.hash_fields,
                    algorithm=self.hash_algorithm,
                    preserve_original=self.preserve_original)
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Hash specified fields in the event."""
         if not self.hash_fields:
             return event
         
-        processed_event = event.copy()
-        hashed_fields = []
+        processed_event = event
         
         for field in self.hash_fields:
             if field in processed_event:
                 original_value = processed_event[field]
                 if original_value is not None:
+                    if processed_event is event:
+                        # Copy on first write; events without these fields pass through
+                        processed_event = event.copy()
                     hashed_value = self._hash_value(str(original_value))
                     
                     if self.preserve_original:
                         processed_event[f"{field}_original"] = original_value
                     
                     processed_event[field] = hashed_value
-                    hashed_fields.append(field)
         
-        if hashed_fields:
-            logger.debug("Hashed fields", hashed_fields=hashed_fields)
+        if processed_event is not event and _level_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Hashed fields",
+                         hashed_fields=[f for f in self.hash_fields if processed_event.get(f) != event.get(f)])
         
         return processed_event
     
     def _hash_value(self, value: str) -> str:
         """Hash a string value with salt."""
-        salted_value = f"{self.salt}{value}"
-        
-        if self.hash_algorithm == 'md5':
-            return hashlib.md5(salted_value.encode()).hexdigest()
-        elif self.hash_algorithm == 'sha1':
-            return hashlib.sha1(salted_value.encode()).hexdigest()
-        elif self.hash_algorithm == 'sha256':
-            return hashlib.sha256(salted_value.encode()).hexdigest()
-        else:
-            logger.warning(f"Unknown hash algorithm: {self.hash_algorithm}, using sha256")
-            return hashlib.sha256(salted_value.encode()).hexdigest()
+        return self._hash_bytes(value.encode())
+    
+    def _hash_salted(self, data: bytes) -> str:
+        """Hash salt + data with the configured hashlib constructor."""
+        return self._hash_constructor(self._salt_bytes + data).hexdigest()
+    
+    def _hash_blake2b(self, data: bytes) -> str:
+        """Keyed BLAKE2b, using the salt as the key instead of a prefix."""
+        return hashlib.blake2b(data, key=self._blake2b_key, digest_size=16).hexdigest()
 
 
 class RedactionPipeline(Processor):
@@ -191,13 +249,16 @@ class RedactionPipeline(Processor):
             current_event = await processor.process(current_event)
             # Update stats from sub-processors
             sub_stats = processor.get_stats()
-            self.stats['processed'] += sub_stats.get('processed', 0)
-            self.stats['errors'] += sub_stats.get('errors', 0)
+            self._record_batch(sub_stats.get('processed', 0), sub_stats.get('errors', 0), 0)
         
         return current_event
     
     async def process_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process batch through all redaction processors."""
+        if self.processors and all(p.SYNC_PROCESS for p in self.processors):
+            # One pass per event through every step instead of one per step
+            return await run_fused_batch(self.processors, events, parent=self)
+        
         current_events = events
         
         for processor in self.processors:
@@ -206,7 +267,7 @@ class RedactionPipeline(Processor):
         return current_events
 
 
-class PIISafetyValidator(Processor):
+class PIISafetyValidator(SyncProcessor):
     """Validator that checks if PII has been properly redacted before LLM processing."""
     
     def __init__(self, config: Dict[str, Any]):
@@ -230,12 +291,19 @@ class PIISafetyValidator(Processor):
             except re.error as e:
                 logger.warning(f"Invalid PII pattern: {pattern}", error=str(e))
         
+        # All PII patterns in one alternation: clean strings (the common case)
+        # are rejected in a single scan before any per-pattern search runs
+        self._pii_union = re.compile(
+            '|'.join(f'(?:{compiled.pattern})' for compiled, _ in self.compiled_patterns),
+            re.IGNORECASE
+        ) if self.compiled_patterns else None
+        
         self.strict_mode = config.get('strict_mode', True)
         logger.info(f"Initialized PIISafetyValidator", 
                    patterns=len(self.compiled_patterns),
                    strict_mode=self.strict_mode)
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def process_sync(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Validate that PII has been properly redacted."""
         pii_found = self._detect_pii(event)
         
@@ -253,18 +321,43 @@ class PIISafetyValidator(Processor):
         return event
     
     def _detect_pii(self, obj: Any, path: str = "") -> List[tuple]:
-        """Recursively detect PII in nested objects."""
-        found_pii = []
+        """Detect PII in nested objects.
         
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                found_pii.extend(self._detect_pii(v, f"{path}.{k}" if path else k))
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                found_pii.extend(self._detect_pii(item, f"{path}[{i}]"))
-        elif isinstance(obj, str):
-            for pattern, name in self.compiled_patterns:
-                if pattern.search(obj):
-                    found_pii.append((path, name, obj))
-        
-        return found_pii
\ No newline at end of file
+        Walks the tree with an explicit stack (children pushed in reverse so
+        results keep document order) and only formats a node's path when it
+        is a container or a string that actually matched.
+        """
+        found_pii = []
+        union = self._pii_union
+        if union is None:
+            return found_pii
+        
+        # Entries are (node, parent_path, key, indexed); the root carries its
+        # own path as the key with parent_path None
+        stack = [(obj, None, path, False)]
+        while stack:
+            node, parent_path, key, indexed = stack.pop()
+            if isinstance(node, str):
+                if not union.search(node):
+                    continue
+                node_path = _child_path(parent_path, key, indexed)
+                for pattern, name in self.compiled_patterns:
+                    if pattern.search(node):
+                        found_pii.append((node_path, name, node))
+            elif isinstance(node, dict):
+                node_path = _child_path(parent_path, key, indexed)
+                stack.extend((v, node_path, k, False) for k, v in reversed(node.items()))
+            elif isinstance(node, list):
+                node_path = _child_path(parent_path, key, indexed)
+                stack.extend((node[i], node_path, i, True) for i in range(len(node) - 1, -1, -1))
+        
+        return found_pii
+
+
+def _child_path(parent_path: Optional[str], key: Any, indexed: bool) -> Any:
+    """Format a PII finding path the way the recursive walker used to."""
+    if parent_path is None:
+        return key
+    if indexed:
+        return f"{parent_path}[{key}]"
+    return f"{parent_path}.{key}" if parent_path else key
@@ -3,23 +3,33 @@ import asyncio
 import time
 import random
 import hashlib
-from typing import Dict, Any, Optional, Set, Tuple
-from enum import Enum
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Mapping, Optional, Set, Tuple
+from enum import IntEnum
 import structlog
 
-from .metrics import (
-    mship_sink_retry_total, 
-    mship_sink_error_total,
-    mship_sink_timeout_total,
-    mship_sink_circuit_state,
-    mship_sink_circuit_open_total
-)
+from .metrics import get_sink_metrics
 
 logger = structlog.get_logger(__name__)
 
+# Backoff jitter strategies accepted by RetryManager's jitter_mode
+_JITTER_MODES = ('symmetric', 'full', 'decorrelated')
 
-class CircuitState(Enum):
-    """Circuit breaker states."""
+
+def _monotonic_to_wall(reading: float) -> float:
+    """Convert a time.monotonic() reading to epoch seconds; 0 stays 0 (never set)."""
+    if not reading:
+        return 0
+    return time.time() - (time.monotonic() - reading)
+
+
+class CircuitState(IntEnum):
+    """Circuit breaker states.
+    
+    An IntEnum so members hash, compare and export as plain ints.
+    """
     CLOSED = 0
     OPEN = 1 
     HALF_OPEN = 2
@@ -30,76 +40,121 @@ class CircuitBreaker:
     
     def __init__(self, sink_name: str, config: Dict[str, Any]):
         self.sink_name = sink_name
+        self.metrics = get_sink_metrics(sink_name)
         self.failure_threshold = config.get('failure_threshold', 5)
         self.open_duration_sec = config.get('open_duration_sec', 60)
         self.half_open_max_inflight = config.get('half_open_max_inflight', 1)
         
-        # State
-        self.state = CircuitState.CLOSED
+        # State; times are time.monotonic() readings so clock steps cannot
+        # hold the breaker open
         self.failure_count = 0
         self.last_failure_time = 0
         self.opened_time = 0
         self.half_open_requests = 0
+        # When the current batch of half-open trial slots was handed out
+        self.half_open_time = 0
         
-        # Update initial metric
-        mship_sink_circuit_state.labels(sink=sink_name).set(self.state.value)
+        # Per-state (can_execute, on_success, on_failure) handlers; the
+        # current state's handlers are bound on every transition so calls
+        # dispatch directly instead of testing the state each time
+        self._state_handlers = {
+            CircuitState.CLOSED: (
+                self._can_execute_closed, self._reset_failures, self._failure_closed
+            ),
+            CircuitState.OPEN: (
+                self._can_execute_open, self._ignore, self._ignore
+            ),
+            CircuitState.HALF_OPEN: (
+                self._can_execute_half_open, self._transition_to_closed, self._transition_to_open
+            ),
+        }
+        self._set_state(CircuitState.CLOSED)
+    
+    def _set_state(self, state: CircuitState):
+        """Enter a state: bind its handlers and update the state metric."""
+        self.state = state
+        self._can_execute, self._on_success, self._on_failure = self._state_handlers[state]
+        self.metrics.circuit_state.set(state)
         
     def can_execute(self) -> bool:
-        """Check if request can be executed based on circuit state."""
-        current_time = time.time()
+        """Check if request can be executed based on circuit state.
         
-        if self.state == CircuitState.CLOSED:
+        In half-open state a True result reserves one of the trial slots;
+        the following record_success or record_failure settles the trial.
+        Slots whose trial never reports back (cancelled or abandoned callers)
+        expire after open_duration_sec, so the breaker cannot stay
+        half-open with every slot taken.
+        """
+        return self._can_execute()
+    
+    def _can_execute_closed(self) -> bool:
+        return True
+    
+    def _can_execute_open(self) -> bool:
+        # Check if we can transition to half-open; this caller takes the
+        # first trial slot
+        if time.monotonic() - self.opened_time >= self.open_duration_sec:
+            self._transition_to_half_open()
+            self.half_open_requests = 1
+            return True
+        return False
+    
+    def _can_execute_half_open(self) -> bool:
+        # Allow limited requests in half-open state. The check and the slot
+        # reservation happen with no await in between, so concurrent
+        # coroutines cannot both claim the last slot
+        if self.half_open_requests < self.half_open_max_inflight:
+            self.half_open_requests += 1
+            return True
+        # All slots taken: if none has settled within open_duration_sec the
+        # trials were abandoned, so hand out a fresh set
+        now = time.monotonic()
+        if now - self.half_open_time >= self.open_duration_sec:
+            self.half_open_time = now
+            self.half_open_requests = 1
             return True
-            
-        elif self.state == CircuitState.OPEN:
-            # Check if we can transition to half-open
-            if current_time - self.opened_time >= self.open_duration_sec:
-                self._transition_to_half_open()
-                return True
-            return False
-            
-        elif self.state == CircuitState.HALF_OPEN:
-            # Allow limited requests in half-open state
-            return self.half_open_requests < self.half_open_max_inflight
-            
         return False
     
     def record_success(self):
         """Record a successful operation."""
-        if self.state == CircuitState.HALF_OPEN:
-            # Successful request in half-open, reset to closed
-            self._transition_to_closed()
-        elif self.state == CircuitState.CLOSED:
-            # Reset failure count on success
-            self.failure_count = 0
-            
+        # Closed: reset failure count; half-open: close; open: nothing
+        self._on_success()
+    
     def record_failure(self):
         """Record a failed operation."""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
         
-        mship_sink_error_total.labels(sink=self.sink_name).inc()
+        self.metrics.error.inc()
         
-        if self.state == CircuitState.CLOSED:
-            if self.failure_count >= self.failure_threshold:
-                self._transition_to_open()
-        elif self.state == CircuitState.HALF_OPEN:
-            # Failure in half-open, go back to open
+        # Closed: open at the threshold; half-open: reopen; open: nothing
+        self._on_failure()
+    
+    def _reset_failures(self):
+        # Healthy sinks hit this on every success; skip the redundant write
+        if self.failure_count:
+            self.failure_count = 0
+    
+    def _failure_closed(self):
+        if self.failure_count >= self.failure_threshold:
             self._transition_to_open()
+    
+    def _ignore(self):
+        pass
             
     def record_timeout(self):
         """Record a timeout (treated as failure)."""
-        mship_sink_timeout_total.labels(sink=self.sink_name).inc()
+        self.metrics.timeout.inc()
         self.record_failure()
     
     def _transition_to_open(self):
         """Transition to open state."""
-        self.state = CircuitState.OPEN
-        self.opened_time = time.time()
+        self._set_state(CircuitState.OPEN)
+        # Only ever entered from record_failure, which just read the clock
+        self.opened_time = self.last_failure_time
         self.half_open_requests = 0
         
-        mship_sink_circuit_open_total.labels(sink=self.sink_name).inc()
-        mship_sink_circuit_state.labels(sink=self.sink_name).set(self.state.value)
+        self.metrics.circuit_open.inc()
         
         logger.warning("Circuit breaker opened", 
                        sink=self.sink_name,
@@ -108,31 +163,34 @@ class CircuitBreaker:
     
     def _transition_to_half_open(self):
         """Transition to half-open state."""
-        self.state = CircuitState.HALF_OPEN
+        self._set_state(CircuitState.HALF_OPEN)
         self.half_open_requests = 0
-        
-        mship_sink_circuit_state.labels(sink=self.sink_name).set(self.state.value)
+        self.half_open_time = time.monotonic()
         
         logger.info("Circuit breaker half-open", sink=self.sink_name)
     
     def _transition_to_closed(self):
         """Transition to closed state."""
-        self.state = CircuitState.CLOSED
+        self._set_state(CircuitState.CLOSED)
         self.failure_count = 0
         self.half_open_requests = 0
         
-        mship_sink_circuit_state.labels(sink=self.sink_name).set(self.state.value)
-        
         logger.info("Circuit breaker closed", sink=self.sink_name)
     
     def get_state_info(self) -> Dict[str, Any]:
-        """Get current state information."""
+        """Get current state information.
+        
+        last_failure_time and opened_time are reported as epoch seconds
+        (converted from the internal monotonic readings); last_failure_time
+        is 0 until the first failure.
+        """
         return {
             'state': self.state.name,
             'failure_count': self.failure_count,
             'failure_threshold': self.failure_threshold,
-            'last_failure_time': self.last_failure_time,
-            'opened_time': self.opened_time if self.state == CircuitState.OPEN else None,
+            'last_failure_time': _monotonic_to_wall(self.last_failure_time),
+            'opened_time': (_monotonic_to_wall(self.opened_time)
+                            if self.state == CircuitState.OPEN else None),
             'half_open_requests': self.half_open_requests if self.state == CircuitState.HALF_OPEN else None
         }
 
@@ -142,10 +200,16 @@ class RetryManager:
     
     def __init__(self, sink_name: str, config: Dict[str, Any]):
         self.sink_name = sink_name
+        self.metrics = get_sink_metrics(sink_name)
         self.max_retries = config.get('max_retries', 5)
         self.initial_backoff_ms = config.get('initial_backoff_ms', 500)
         self.max_backoff_ms = config.get('max_backoff_ms', 30000)
         self.jitter_factor = config.get('jitter_factor', 0.2)
+        self.jitter_mode = config.get('jitter_mode', 'symmetric')
+        if self.jitter_mode not in _JITTER_MODES:
+            logger.warning("Unknown jitter mode, using symmetric",
+                           sink=sink_name, jitter_mode=self.jitter_mode)
+            self.jitter_mode = 'symmetric'
         self.timeout_ms = config.get('timeout_ms', 5000)
     
     def should_retry(self, attempt: int, exception: Exception) -> bool:
@@ -153,27 +217,37 @@ class RetryManager:
         if attempt >= self.max_retries:
             return False
             
-        # Don't retry on client errors (4xx) except 429
-        if hasattr(exception, 'response'):
-            status_code = getattr(exception.response, 'status_code', None)
-            if status_code:
-                if 400 <= status_code < 500:
-                    # Only retry on 429 (rate limiting)
-                    return status_code == 429
-                # Retry on 5xx server errors
-                return status_code >= 500
-        
-        # Retry on timeouts and connection errors
-        return True
+        # Retry on timeouts and connection errors (no status), rate limiting
+        # (429) and 5xx server errors; other statuses are final
+        status_code = getattr(getattr(exception, 'response', None), 'status_code', None)
+        return not status_code or status_code >= 500 or status_code == 429
     
-    def calculate_backoff(self, attempt: int) -> float:
-        """Calculate backoff time with jittered exponential backoff."""
+    def calculate_backoff(self, attempt: int, prev_backoff_ms: Optional[float] = None) -> float:
+        """Calculate backoff time with jittered exponential backoff.
+        
+        jitter_mode selects the strategy:
+        - symmetric: initial * 2^attempt, capped, then +/- jitter_factor
+        - full: uniform between 0 and the capped exponential delay
+        - decorrelated: uniform between initial and 3x prev_backoff_ms (the
+          caller's previous delay), capped, so delays stay spread out even
+          once the cap is reached
+        """
+        if self.jitter_mode == 'decorrelated':
+            prev_ms = prev_backoff_ms if attempt and prev_backoff_ms else self.initial_backoff_ms
+            return min(
+                self.max_backoff_ms,
+                random.uniform(self.initial_backoff_ms, prev_ms * 3)
+            ) / 1000.0
+        
         # Exponential backoff: initial * (2 ^ attempt)
         backoff_ms = min(
             self.initial_backoff_ms * (2 ** attempt),
             self.max_backoff_ms
         )
         
+        if self.jitter_mode == 'full':
+            return random.uniform(0, backoff_ms) / 1000.0
+        
         # Add jitter to avoid thundering herd
         if self.jitter_factor > 0:
             jitter_range = backoff_ms * self.jitter_factor
@@ -182,8 +256,12 @@ class RetryManager:
         
         return backoff_ms / 1000.0  # Convert to seconds
     
-    def get_retry_after_delay(self, response_headers: Dict[str, str]) -> Optional[float]:
-        """Extract retry-after delay from response headers."""
+    def get_retry_after_delay(self, response_headers: Mapping[str, str]) -> Optional[float]:
+        """Extract retry-after delay from response headers.
+        
+        Accepts any mapping, including case-insensitive ones such as
+        httpx.Headers, so callers need not copy headers into a dict.
+        """
         retry_after = response_headers.get('retry-after') or response_headers.get('Retry-After')
         if not retry_after:
             return None
@@ -192,19 +270,26 @@ class RetryManager:
             # Try parsing as seconds
             return float(retry_after)
         except ValueError:
-            try:
-                # Try parsing as HTTP date (not implemented for simplicity)
-                # In a full implementation, you'd parse HTTP date format
-                return None
-            except:
-                return None
+            pass
+        
+        # Otherwise an HTTP date such as 'Sat, 20 Oct 2007 10:00:00 GMT'
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            # HTTP dates are always GMT
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, retry_at.timestamp() - time.time())
     
     async def execute_with_retry(self, operation, *args, **kwargs):
         """Execute operation with retry logic."""
+        # Previous computed delay, per call so concurrent retries do not share it
+        prev_backoff_ms = None
         for attempt in range(self.max_retries + 1):
             try:
                 if attempt > 0:
-                    mship_sink_retry_total.labels(sink=self.sink_name).inc()
+                    self.metrics.retry.inc()
                     
                 return await operation(*args, **kwargs)
                 
@@ -216,10 +301,11 @@ class RetryManager:
                     # Check for Retry-After header if available
                     retry_delay = None
                     if hasattr(e, 'response') and hasattr(e.response, 'headers'):
-                        retry_delay = self.get_retry_after_delay(dict(e.response.headers))
+                        retry_delay = self.get_retry_after_delay(e.response.headers)
                     
                     if retry_delay is None:
-                        retry_delay = self.calculate_backoff(attempt)
+                        retry_delay = self.calculate_backoff(attempt, prev_backoff_ms)
+                        prev_backoff_ms = retry_delay * 1000.0
                     
                     logger.info("Retrying operation",
                                sink=self.sink_name,
@@ -237,16 +323,28 @@ class IdempotencyManager:
     
     def __init__(self, config: Dict[str, Any]):
         self.window_sec = config.get('window_sec', 3600)  # 1 hour default
-        self._seen_keys: Dict[str, float] = {}  # key -> timestamp
+        # key -> timestamp, in insertion (and therefore timestamp) order
+        self._seen_keys: OrderedDict[str, float] = OrderedDict()
     
     def generate_batch_key(self, batch: list) -> str:
-        """Generate idempotency key for a batch."""
-        # Create a deterministic hash of the batch content
-        batch_str = str(sorted([
-            str(item.get('message', '')) + str(item.get('timestamp', ''))
+        """Generate idempotency key for a batch.
+        
+        Items are sorted by their encoded fields so the key does not depend
+        on item order, then fed length-prefixed into a single hash so field
+        boundaries cannot shift.
+        """
+        items = sorted(
+            (str(item.get('message', '')).encode(), str(item.get('timestamp', '')).encode())
             for item in batch
-        ]))
-        return hashlib.md5(batch_str.encode()).hexdigest()
+        )
+        h = hashlib.blake2b(digest_size=16)
+        update = h.update
+        for message, timestamp in items:
+            update(len(message).to_bytes(4, 'little'))
+            update(message)
+            update(len(timestamp).to_bytes(4, 'little'))
+            update(timestamp)
+        return h.hexdigest()
     
     def is_duplicate(self, key: str) -> bool:
         """Check if this key was seen recently."""
@@ -264,14 +362,13 @@ class IdempotencyManager:
         return False
     
     def _clean_expired_keys(self, current_time: float):
-        """Remove expired keys from the cache."""
+        """Remove expired keys from the cache, oldest first."""
         cutoff_time = current_time - self.window_sec
-        expired_keys = [
-            key for key, timestamp in self._seen_keys.items()
-            if timestamp < cutoff_time
-        ]
-        for key in expired_keys:
-            del self._seen_keys[key]
+        seen_keys = self._seen_keys
+        while seen_keys:
+            if seen_keys[next(iter(seen_keys))] >= cutoff_time:
+                break
+            seen_keys.popitem(last=False)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get idempotency manager statistics."""
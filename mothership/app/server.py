@@ -1,12 +1,16 @@
 """FastAPI-based ingestion service for mothership with dual-sink support."""
 
 import asyncio
+import json
 import time
-from datetime import datetime
+import zlib
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse, PlainTextResponse
-from pydantic import BaseModel, Field, ValidationError
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, with_config
+from typing_extensions import Required, TypedDict
 import structlog
 from prometheus_client import CONTENT_TYPE_LATEST
 
@@ -21,7 +25,7 @@ from .pipeline.processors_enrich import (
     SiteEnvTagsProcessor,
     TimestampNormalizer,
 )
-from .pipeline.llm_enricher import LLMEnricher
+from .pipeline.llm_enricher import LLMEnricher, close_shared_clients
 from .storage.tsdb import TimescaleDBWriter
 
 # Import dual-sink components
@@ -30,11 +34,13 @@ from .storage.loki import LokiClient  # NEW: Loki support
 
 # Import new metrics module
 from .metrics import (
-    get_metrics_content,
+    get_metrics_payload,
     mship_ingest_batches_total,
     mship_ingest_events_total,
     mship_written_events_total,
-    mship_sink_written_total,
+    mship_event_errors_total,
+    SINK_WRITTEN,
+    sink_label,
     mship_ingest_seconds,
     mship_pipeline_seconds,
     mship_sink_write_seconds,
@@ -53,7 +59,8 @@ structlog.configure(
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.JSONRenderer(),
+        # Compact separators: same JSON, fewer bytes per log line
+        structlog.processors.JSONRenderer(separators=(",", ":")),
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -86,6 +93,42 @@ class IngestRequest(BaseModel):
     batch_metadata: Optional[Dict[str, Any]] = None
 
 
+# Plain-dict twins of Event / IngestRequest used to validate /ingest bodies:
+# events come out as dicts ready for the pipeline, with no model instances
+# built and dumped again. Keep the fields in step with the models above.
+@with_config(ConfigDict(extra="allow"))
+class _EventDict(TypedDict, total=False):
+    timestamp: Optional[str]
+    type: Required[str]
+    source: Optional[str]
+    message: Optional[str]
+    data: Optional[Dict[str, Any]]
+
+
+@with_config(ConfigDict(extra="allow"))
+class _IngestPayload(TypedDict, total=False):
+    messages: Required[List[_EventDict]]
+    batch_metadata: Optional[Dict[str, Any]]
+
+
+_INGEST_ADAPTER = TypeAdapter(_IngestPayload)
+
+# /ingest request counters bound once per status instead of labels() per request
+_INGEST_REQ_200 = mship_requests_total.labels(
+    method="POST", endpoint="/ingest", status="200"
+)
+_INGEST_REQ_400 = mship_requests_total.labels(
+    method="POST", endpoint="/ingest", status="400"
+)
+_INGEST_REQ_500 = mship_requests_total.labels(
+    method="POST", endpoint="/ingest", status="500"
+)
+
+# Optional Event fields that are absent from a message default to None, as
+# Event.model_dump() would produce; in declaration order so keys line up
+_EVENT_DEFAULTS = {name: None for name in Event.model_fields}
+
+
 class IngestResponse(BaseModel):
     """Ingest response with dual-sink support."""
 
@@ -108,6 +151,38 @@ class HealthResponse(BaseModel):
     pipeline_processors: List[str]
 
 
+# Static body served by GET /, encoded once
+_ROOT_PAYLOAD = json.dumps(
+    {
+        "service": "Mothership Data Processor",
+        "version": "1.5.0",
+        "description": "Centralized data processing and ingestion service with dual-sink support",
+        "endpoints": {
+            "ingest": "/ingest",
+            "health": "/healthz",
+            "metrics": "/metrics",
+            "stats": "/stats",
+            "docs": "/docs",
+        },
+    },
+    separators=(",", ":"),
+).encode()
+
+# /ingest size limits used unless the server config overrides them
+_DEFAULT_MAX_BODY_BYTES = 16 * 1024 * 1024
+_DEFAULT_MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+# /ingest bodies larger than this are parsed in a worker thread; smaller ones
+# parse faster inline than the thread hand-off costs
+_THREADED_PARSE_MIN_BYTES = 256 * 1024
+
+# Per-event pipeline failures logged per batch before the rest are only counted
+_EVENT_ERROR_LOG_LIMIT = 5
+
+# Last whole second formatted by _utcnow_iso(), and its ISO-8601 string
+_iso_cached_second = -1
+_iso_cached_value = ""
+
 # Global state
 app_state = {
     "config_manager": None,
@@ -115,6 +190,13 @@ app_state = {
     "tsdb_writer": None,
     "sinks_manager": None,  # NEW: dual-sink manager
     "startup_time": time.time(),
+    # (name, sink, enabled) per configured sink, and the enabled names
+    "sinks": (),
+    "enabled_sinks": [],
+    # Class names of the pipeline's processors, in order
+    "processor_names": [],
+    # (max_body_bytes, max_decompressed_bytes) for /ingest, set from config
+    "ingest_limits": (_DEFAULT_MAX_BODY_BYTES, _DEFAULT_MAX_DECOMPRESSED_BYTES),
 }
 
 # FastAPI app
@@ -137,6 +219,11 @@ async def startup_event():
         config_manager = ConfigManager()
         config = config_manager.load_config()
         app_state["config_manager"] = config_manager
+        server_config = config.get("server", {})
+        app_state["ingest_limits"] = (
+            server_config.get("max_body_bytes", _DEFAULT_MAX_BODY_BYTES),
+            server_config.get("max_decompressed_bytes", _DEFAULT_MAX_DECOMPRESSED_BYTES),
+        )
 
         # Configure logging level
         log_level = config.get("logging", {}).get("level", "INFO")
@@ -198,6 +285,16 @@ async def startup_event():
                 app_state["sinks_manager"] = sinks_manager
                 logger.warning("Using empty sinks manager as last resort")
 
+        # Sink membership and enablement are fixed once started, so resolve
+        # them here rather than on every /healthz
+        sinks = tuple(
+            (sink_name, sink, sink.is_enabled())
+            for sink_name in sinks_manager.get_sink_names()
+            if (sink := sinks_manager.get_sink(sink_name))
+        )
+        app_state["sinks"] = sinks
+        app_state["enabled_sinks"] = [name for name, _, enabled in sinks if enabled]
+
         # Initialize processing pipeline
         pipeline = Pipeline(config["pipeline"])
 
@@ -248,11 +345,12 @@ async def startup_event():
             pipeline.add_processor(llm_processor)
 
         app_state["pipeline"] = pipeline
+        app_state["processor_names"] = [p.__class__.__name__ for p in pipeline.processors]
 
         logger.info(
             "Mothership service started successfully",
             enabled_sinks=config_manager.get_enabled_sinks(),
-            pipeline_processors=[p.__class__.__name__ for p in pipeline.processors],
+            pipeline_processors=app_state["processor_names"],
         )
 
     except Exception as e:
@@ -273,15 +371,104 @@ async def shutdown_event():
     if app_state["tsdb_writer"]:
         await app_state["tsdb_writer"].close()
 
+    # Close pooled LLM HTTP clients
+    await close_shared_clients()
+
     logger.info("Mothership service shut down complete")
 
 
-@app.post("/ingest", response_model=IngestResponse)
-async def ingest_events(request: IngestRequest) -> IngestResponse:
-    """Ingest events for processing with dual-sink support."""
+async def _read_ingest_body(request: Request) -> bytes:
+    """Read the /ingest body, inflating gzip-encoded payloads as they stream in.
+
+    Edge nodes ship batches with Content-Encoding: gzip. Decompressing chunk
+    by chunk keeps only the inflated payload in memory rather than both the
+    compressed body and its decompressed copy. Bodies over max_body_bytes on
+    the wire, or max_decompressed_bytes once inflated, are rejected with 413
+    before they are buffered in full.
+    """
+    max_body_bytes, max_decompressed_bytes = app_state["ingest_limits"]
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    body = bytearray()
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body_bytes:
+                raise HTTPException(status_code=413, detail="Payload too large")
+            if inflater is None:
+                body += chunk
+                continue
+            # Never inflate more than one byte past the cap, however well
+            # the chunk compresses
+            body += inflater.decompress(chunk, max_decompressed_bytes - len(body) + 1)
+            if len(body) > max_decompressed_bytes:
+                raise HTTPException(status_code=413, detail="Decompressed payload too large")
+        if inflater is not None:
+            body += inflater.flush()
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+    if inflater is not None:
+        if len(body) > max_decompressed_bytes:
+            raise HTTPException(status_code=413, detail="Decompressed payload too large")
+        if not inflater.eof:
+            raise HTTPException(status_code=400, detail="Invalid gzip body: truncated")
+    return body
+
+
+def _parse_ingest_body(body: bytes) -> List[Dict[str, Any]]:
+    """Parse and validate a raw /ingest body in a single pass.
+
+    pydantic-core reads the JSON bytes directly and validates into plain
+    dicts, so no intermediate str, model instance or model_dump() copy is
+    built. Returns the events with Event's optional fields filled in. Errors
+    are raised the same way FastAPI reports request validation failures (422).
+    """
+    try:
+        payload = _INGEST_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        errors = [
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=body)
+    defaults = _EVENT_DEFAULTS
+    return [{**defaults, **event} for event in payload["messages"]]
+
+
+@app.post(
+    "/ingest",
+    response_model=IngestResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": IngestRequest.model_json_schema()}
+            },
+            "required": True,
+        }
+    },
+)
+async def ingest_events(request: Request) -> Response:
+    """Ingest events for processing with dual-sink support.
+
+    The response is serialized by pydantic-core directly, rather than being
+    re-validated against response_model and passed through json.dumps.
+    """
+    body = await _read_ingest_body(request)
+    if len(body) > _THREADED_PARSE_MIN_BYTES:
+        # Keep the event loop serving other requests while a large batch parses
+        events = await asyncio.to_thread(_parse_ingest_body, body)
+    else:
+        events = _parse_ingest_body(body)
+
     # Safety wrapper to catch any exception that happens before the main try block
     try:
-        return await _ingest_events_internal(request)
+        response = await _ingest_events_internal(events)
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -291,25 +478,55 @@ async def ingest_events(request: IngestRequest) -> IngestResponse:
             error=str(e),
             exc_info=True,
         )
-        mship_requests_total.labels(
-            method="POST", endpoint="/ingest", status="500"
-        ).inc()
+        _INGEST_REQ_500.inc()
         raise HTTPException(
             status_code=500, detail=f"Critical ingestion error: {str(e)}"
         )
+    return Response(response.model_dump_json(), media_type="application/json")
+
+
+async def _process_events_individually(
+    pipeline: Pipeline, events: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Run events through the pipeline one at a time, skipping any that fail.
+
+    Only the first few failures per batch are logged; all are counted in
+    mship_event_errors_total so a bad-input storm cannot flood the logs.
+    """
+    processed_events = []
+    failures = 0
+    for event in events:
+        try:
+            processed_events.append(await pipeline.process_single_event(event))
+        except Exception as e:
+            # Continue processing other events instead of failing completely
+            failures += 1
+            if failures <= _EVENT_ERROR_LOG_LIMIT:
+                logger.error(
+                    "Event processing failed",
+                    error=str(e),
+                    event_type=event.get("type"),
+                    exc_info=True,
+                )
+    if failures:
+        mship_event_errors_total.inc(failures)
+        if failures > _EVENT_ERROR_LOG_LIMIT:
+            logger.warning(
+                "Further event processing failures not logged",
+                suppressed=failures - _EVENT_ERROR_LOG_LIMIT,
+                failures=failures,
+            )
+    return processed_events
 
 
 @mship_ingest_seconds.time()
-async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
+async def _ingest_events_internal(events: List[Dict[str, Any]]) -> IngestResponse:
     """Internal ingest processing with full error handling."""
     start_time = time.time()
 
     try:
-        events = request.messages
         if not events:
-            mship_requests_total.labels(
-                method="POST", endpoint="/ingest", status="400"
-            ).inc()
+            _INGEST_REQ_400.inc()
             return IngestResponse(
                 status="success",
                 processed_events=0,
@@ -327,25 +544,19 @@ async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
             logger.error("Pipeline not initialized in app_state")
             raise HTTPException(status_code=500, detail="Pipeline not initialized")
 
-        processed_events = []
-
         with mship_pipeline_seconds.time():
-            for event in events:
-                try:
-                    # Convert to dict for pipeline processing
-                    event_dict = event.model_dump()
-                    logger.debug(f"Processing event: {event_dict}")
-                    processed_event = await pipeline.process_single_event(event_dict)
-                    processed_events.append(processed_event)
-                    logger.debug(f"Event processed successfully: {processed_event}")
-                except Exception as e:
-                    logger.error(
-                        f"Error processing event: {e}",
-                        event=event.model_dump(),
-                        exc_info=True,
-                    )
-                    # Continue processing other events instead of failing completely
-                    continue
+            try:
+                # One pass per processor over the whole batch; processors
+                # handle per-event failures themselves and bound their own
+                # concurrency via their 'concurrency' setting
+                processed_events = await pipeline.process_events(events)
+            except Exception as e:
+                logger.error(
+                    "Batch pipeline run failed, retrying event by event",
+                    error=str(e),
+                    exc_info=True,
+                )
+                processed_events = await _process_events_individually(pipeline, events)
 
         logger.info(
             f"Successfully processed {len(processed_events)} events through pipeline"
@@ -374,7 +585,7 @@ async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
         total_written = 0
         for sink_name, result in sink_results.items():
             written_count = result.get("written", 0)
-            mship_sink_written_total.labels(sink=sink_name).inc(written_count)
+            SINK_WRITTEN[sink_label(sink_name)].inc(written_count)
             total_written += written_count
 
         mship_written_events_total.inc(total_written)
@@ -384,9 +595,7 @@ async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
             mship_loki_queue_size.set(sink_results["loki"].get("queued", 0))
 
         processing_time = time.time() - start_time
-        mship_requests_total.labels(
-            method="POST", endpoint="/ingest", status="200"
-        ).inc()
+        _INGEST_REQ_200.inc()
 
         logger.info(
             f"Successfully processed {len(processed_events)} events",
@@ -405,9 +614,7 @@ async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        mship_requests_total.labels(
-            method="POST", endpoint="/ingest", status="500"
-        ).inc()
+        _INGEST_REQ_500.inc()
         error_msg = f"Ingestion failed: {str(e)}"
         logger.error(
             "Unhandled error during ingestion",
@@ -418,55 +625,62 @@ async def _ingest_events_internal(request: IngestRequest) -> IngestResponse:
         raise HTTPException(status_code=500, detail=error_msg)
 
 
+def _utcnow_iso() -> str:
+    """Current UTC time as 'YYYY-MM-DDTHH:MM:SSZ', formatted at most once a second."""
+    global _iso_cached_second, _iso_cached_value
+    now = int(time.time())
+    if now != _iso_cached_second:
+        _iso_cached_value = datetime.fromtimestamp(now, tz=timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        _iso_cached_second = now
+    return _iso_cached_value
+
+
 @app.get("/healthz", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     """Health check endpoint with dual-sink status."""
     try:
-        # Check database connectivity
+        # Check sinks and database connectivity concurrently, so the probe
+        # takes as long as the slowest check rather than their sum
         tsdb_writer = app_state.get("tsdb_writer")
-        database_healthy = tsdb_writer is not None and await tsdb_writer.health_check()
+        sinks = app_state["sinks"]
+        checks = [sink.health_check() for _, sink, _ in sinks]
+        if tsdb_writer is not None:
+            checks.append(tsdb_writer.health_check())
+        results = await asyncio.gather(*checks, return_exceptions=True)
+
+        database_healthy = False
+        if tsdb_writer is not None:
+            database_healthy = results.pop()
+            if isinstance(database_healthy, BaseException):
+                raise database_healthy
 
-        # Check sink health
-        sinks_manager = app_state["sinks_manager"]
         sink_health = {}
-        enabled_sinks = []
-
-        if sinks_manager:
-            # Check each sink
-            for sink_name in sinks_manager.get_sink_names():
-                sink = sinks_manager.get_sink(sink_name)
-                if sink:
-                    is_healthy = await sink.health_check()
-                    sink_health[sink_name] = {
-                        "healthy": is_healthy,
-                        "enabled": sink.is_enabled(),
-                    }
-                    if sink.is_enabled():
-                        enabled_sinks.append(sink_name)
-
-        # Get pipeline processors
-        pipeline = app_state.get("pipeline")
-        processors = (
-            [p.__class__.__name__ for p in pipeline.processors] if pipeline else []
-        )
+        for (sink_name, _, enabled), is_healthy in zip(sinks, results):
+            if isinstance(is_healthy, BaseException):
+                logger.warning("Sink health check failed", sink=sink_name, error=str(is_healthy))
+                is_healthy = False
+            sink_health[sink_name] = {"healthy": is_healthy, "enabled": enabled}
+        enabled_sinks = app_state["enabled_sinks"]
 
         overall_status = "healthy" if database_healthy else "degraded"
 
         return HealthResponse(
             status=overall_status,
-            timestamp=datetime.utcnow().isoformat() + "Z",
+            timestamp=_utcnow_iso(),
             version="1.5.0",
             database=database_healthy,
             sinks=sink_health,
             enabled_sinks=enabled_sinks,
-            pipeline_processors=processors,
+            pipeline_processors=app_state["processor_names"],
         )
 
     except Exception as e:
         logger.error("Health check error", error=str(e))
         return HealthResponse(
             status="unhealthy",
-            timestamp=datetime.utcnow().isoformat() + "Z",
+            timestamp=_utcnow_iso(),
             version="1.5.0",
             database=False,
             sinks={},
@@ -486,7 +700,14 @@ async def metrics():
         except Exception:
             mship_active_connections.set(0)
 
-    return PlainTextResponse(get_metrics_content(), media_type=CONTENT_TYPE_LATEST)
+    # Rendering walks every sample; keep it off the event loop so a scrape
+    # does not stall concurrent ingests
+    payload, length = await asyncio.to_thread(get_metrics_payload)
+    return Response(
+        payload,
+        media_type=CONTENT_TYPE_LATEST,
+        headers={"Content-Length": str(length)},
+    )
 
 
 @app.get("/stats")
@@ -498,21 +719,20 @@ async def get_stats() -> Dict[str, Any]:
     pipeline = app_state.get("pipeline")
     pipeline_stats = {}
     if pipeline:
-        for processor in pipeline.processors:
-            processor_name = processor.__class__.__name__
+        for processor_name, processor in zip(
+            app_state["processor_names"], pipeline.processors
+        ):
             if hasattr(processor, "get_stats"):
-                pipeline_stats[processor_name] = processor.get_stats()
+                # get_stats() is a read-only view; the encoder needs a dict
+                pipeline_stats[processor_name] = dict(processor.get_stats())
             else:
                 pipeline_stats[processor_name] = {"processed": "N/A"}
 
     # Get sink stats
     sink_stats = {}
-    sinks_manager = app_state.get("sinks_manager")
-    if sinks_manager:
-        for sink_name in sinks_manager.get_sink_names():
-            sink = sinks_manager.get_sink(sink_name)
-            if sink and hasattr(sink, "get_stats"):
-                sink_stats[sink_name] = sink.get_stats()
+    for sink_name, sink, _ in app_state["sinks"]:
+        if hasattr(sink, "get_stats"):
+            sink_stats[sink_name] = sink.get_stats()
 
     # Safe active connections read
     active_conns = 0
@@ -534,18 +754,7 @@ async def get_stats() -> Dict[str, Any]:
 @app.get("/")
 async def root():
     """Root endpoint with service information."""
-    return {
-        "service": "Mothership Data Processor",
-        "version": "1.5.0",
-        "description": "Centralized data processing and ingestion service with dual-sink support",
-        "endpoints": {
-            "ingest": "/ingest",
-            "health": "/healthz",
-            "metrics": "/metrics",
-            "stats": "/stats",
-            "docs": "/docs",
-        },
-    }
+    return Response(_ROOT_PAYLOAD, media_type="application/json")
 
 
 # Development server runner
@@ -563,7 +772,7 @@ if __name__ == "__main__":
             (
                 structlog.dev.ConsoleRenderer()
                 if os.getenv("LOG_FORMAT") != "json"
-                else structlog.processors.JSONRenderer()
+                else structlog.processors.JSONRenderer(separators=(",", ":"))
             ),
         ],
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -4,10 +4,11 @@ import asyncio
 import json
 import os
 import time
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Union
 from datetime import datetime, timezone
 import httpx
 import structlog
+from pydantic import BaseModel
 
 logger = structlog.get_logger(__name__)
 
@@ -43,8 +44,10 @@ class LokiClient:
         "thread_id",
     }
 
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
+    def __init__(self, config: Union[Dict[str, Any], BaseModel]):
+        # Settings models (e.g. LokiConfig) are flattened once so lookups on
+        # the flush path are plain dict reads
+        self.config = config.model_dump() if isinstance(config, BaseModel) else config
         self.client: Optional[httpx.AsyncClient] = None
         self._batch_queue: List[Dict[str, Any]] = []
         self._batch_lock = asyncio.Lock()
@@ -11,14 +11,14 @@ from typing import Dict, Any, List, Optional, Callable, Awaitable
 import structlog
 import httpx
 
-from ..metrics import (
-    mship_sink_retry_total, mship_sink_error_total, mship_sink_timeout_total,
-    mship_sink_circuit_state, mship_sink_circuit_open_total,
-    mship_sink_queue_size, mship_sink_queue_bytes, mship_sink_dlq_total
-)
+from ..metrics import get_sink_metrics
 
 logger = structlog.get_logger(__name__)
 
+# Backoff jitter strategies accepted in a sink's retry config; 'symmetric'
+# is the default jitter_factor spread
+_JITTER_MODES = ('symmetric', 'full', 'decorrelated')
+
 
 class CircuitBreakerState(Enum):
     """Circuit breaker states."""
@@ -75,19 +75,38 @@ class SinkRetryManager:
     
     def __init__(self, sink_name: str, config: Dict[str, Any]):
         self.sink_name = sink_name
+        self.metrics = get_sink_metrics(sink_name)
         self.max_retries = config.get('max_retries', 3)
         self.initial_backoff_ms = config.get('initial_backoff_ms', 1000)  
         self.max_backoff_ms = config.get('max_backoff_ms', 60000)
         self.jitter_factor = config.get('jitter_factor', 0.1)
+        self.jitter_mode = config.get('jitter_mode', 'symmetric')
+        if self.jitter_mode not in _JITTER_MODES:
+            logger.warning("Unknown jitter mode, using symmetric",
+                           sink=sink_name, jitter_mode=self.jitter_mode)
+            self.jitter_mode = 'symmetric'
         # Reduce default timeout from 30s to 10s for better responsiveness
         # This prevents long waits during database connectivity issues
         self.timeout_ms = config.get('timeout_ms', 10000)
         
-    def calculate_backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
-        """Calculate backoff time in seconds for given attempt."""
+    def calculate_backoff(self, attempt: int, retry_after: Optional[float] = None,
+                          prev_backoff_ms: Optional[float] = None) -> float:
+        """Calculate backoff time in seconds for given attempt.
+        
+        jitter_mode 'full' draws between 0 and the capped exponential delay;
+        'decorrelated' draws between the initial delay and 3x prev_backoff_ms
+        (the caller's previous delay), capped.
+        """
         if retry_after:
             # Respect server's Retry-After header
             return retry_after
+        
+        if self.jitter_mode == 'decorrelated':
+            prev_ms = prev_backoff_ms if attempt and prev_backoff_ms else self.initial_backoff_ms
+            return min(
+                self.max_backoff_ms,
+                random.uniform(self.initial_backoff_ms, prev_ms * 3)
+            ) / 1000.0
             
         # Exponential backoff: initial * (2 ^ attempt) 
         backoff_ms = min(
@@ -95,6 +114,9 @@ class SinkRetryManager:
             self.max_backoff_ms
         )
         
+        if self.jitter_mode == 'full':
+            return random.uniform(0, backoff_ms) / 1000.0
+        
         # Add jitter to avoid thundering herd
         jitter = backoff_ms * self.jitter_factor * random.random()
         total_backoff_ms = backoff_ms + jitter
@@ -108,6 +130,8 @@ class SinkRetryManager:
     ) -> Any:
         """Execute operation with retry logic."""
         last_exception = None
+        # Previous computed delay, per call so concurrent writes do not share it
+        prev_backoff_ms = None
         
         for attempt in range(self.max_retries + 1):  # 0-indexed, so +1
             try:
@@ -119,13 +143,13 @@ class SinkRetryManager:
                 
             except asyncio.TimeoutError as e:
                 last_exception = e
-                mship_sink_timeout_total.labels(sink=self.sink_name).inc()
+                self.metrics.timeout.inc()
                 logger.warning("Sink operation timed out", 
                              sink=self.sink_name, attempt=attempt + 1)
                 
             except httpx.HTTPStatusError as e:
                 last_exception = e
-                mship_sink_error_total.labels(sink=self.sink_name).inc()
+                self.metrics.error.inc()
                 
                 if not should_retry_response(e.response):
                     # Non-retryable error  
@@ -140,13 +164,13 @@ class SinkRetryManager:
                 
             except (httpx.ConnectError, httpx.TimeoutException, httpx.NetworkError) as e:
                 last_exception = e
-                mship_sink_error_total.labels(sink=self.sink_name).inc()
+                self.metrics.error.inc()
                 logger.warning("Network error", 
                              sink=self.sink_name, error=str(e), attempt=attempt + 1)
                 
             except Exception as e:
                 last_exception = e
-                mship_sink_error_total.labels(sink=self.sink_name).inc()
+                self.metrics.error.inc()
                 logger.error("Unexpected error", 
                            sink=self.sink_name, error=str(e), attempt=attempt + 1)
                 # Don't retry unexpected errors
@@ -154,11 +178,13 @@ class SinkRetryManager:
             
             # If we get here, we need to retry (unless max attempts reached)
             if attempt < self.max_retries:
-                mship_sink_retry_total.labels(sink=self.sink_name).inc()
+                self.metrics.retry.inc()
                 
                 # Calculate backoff with jitter  
                 retry_after = getattr(last_exception, 'retry_after', None) if hasattr(last_exception, 'response') else None
-                backoff_seconds = self.calculate_backoff(attempt, retry_after)
+                backoff_seconds = self.calculate_backoff(attempt, retry_after, prev_backoff_ms)
+                if not retry_after:
+                    prev_backoff_ms = backoff_seconds * 1000.0
                 
                 logger.info("Retrying operation",
                           sink=self.sink_name, attempt=attempt + 1, 
@@ -180,6 +206,7 @@ class SinkCircuitBreaker:
     
     def __init__(self, sink_name: str, config: Dict[str, Any]):
         self.sink_name = sink_name
+        self.metrics = get_sink_metrics(sink_name)
         self.failure_threshold = config.get('failure_threshold', 5)
         self.open_duration_sec = config.get('open_duration_sec', 60)
         self.half_open_max_inflight = config.get('half_open_max_inflight', 2)
@@ -192,7 +219,7 @@ class SinkCircuitBreaker:
         self._lock = asyncio.Lock()
         
         # Update metric 
-        mship_sink_circuit_state.labels(sink=self.sink_name).set(self._state.value)
+        self.metrics.circuit_state.set(self._state.value)
         
     @property 
     def state(self) -> CircuitBreakerState:
@@ -209,7 +236,7 @@ class SinkCircuitBreaker:
                 # Check if we should transition to half-open
                 if current_time - self._last_failure_time >= self.open_duration_sec:
                     self._state = CircuitBreakerState.HALF_OPEN
-                    mship_sink_circuit_state.labels(sink=self.sink_name).set(self._state.value)
+                    self.metrics.circuit_state.set(self._state.value)
                     logger.info("Circuit breaker transitioning to half-open", 
                               sink=self.sink_name)
                     return self._inflight_requests < self.half_open_max_inflight
@@ -230,7 +257,7 @@ class SinkCircuitBreaker:
                 # Transition back to closed
                 self._state = CircuitBreakerState.CLOSED
                 self._failure_count = 0
-                mship_sink_circuit_state.labels(sink=self.sink_name).set(self._state.value)
+                self.metrics.circuit_state.set(self._state.value)
                 logger.info("Circuit breaker reset to closed", sink=self.sink_name)
                 
     async def record_failure(self):
@@ -244,15 +271,15 @@ class SinkCircuitBreaker:
             
             if self._state == CircuitBreakerState.CLOSED and self._failure_count >= self.failure_threshold:
                 self._state = CircuitBreakerState.OPEN
-                mship_sink_circuit_open_total.labels(sink=self.sink_name).inc()
-                mship_sink_circuit_state.labels(sink=self.sink_name).set(self._state.value)
+                self.metrics.circuit_open.inc()
+                self.metrics.circuit_state.set(self._state.value)
                 logger.warning("Circuit breaker opened", 
                              sink=self.sink_name, failure_count=self._failure_count)
             elif self._state == CircuitBreakerState.HALF_OPEN:
                 # Go back to open
                 self._state = CircuitBreakerState.OPEN
-                mship_sink_circuit_open_total.labels(sink=self.sink_name).inc()
-                mship_sink_circuit_state.labels(sink=self.sink_name).set(self._state.value)
+                self.metrics.circuit_open.inc()
+                self.metrics.circuit_state.set(self._state.value)
                 logger.warning("Circuit breaker re-opened from half-open", sink=self.sink_name)
                 
     async def execute_call(self):
@@ -279,6 +306,7 @@ class SinkPersistentQueue:
     
     def __init__(self, sink_name: str, config: Dict[str, Any]):
         self.sink_name = sink_name
+        self.metrics = get_sink_metrics(sink_name)
         self.queue_dir = Path(config.get('queue_dir', './queues'))
         self.max_bytes = config.get('queue_max_bytes', 100 * 1024 * 1024)  # 100MB default
         self.flush_interval_ms = config.get('queue_flush_interval_ms', 5000)
@@ -351,8 +379,8 @@ class SinkPersistentQueue:
                 
             # Update metrics
             count, bytes_size = await self._get_queue_metrics()
-            mship_sink_queue_size.labels(sink=self.sink_name).set(count)
-            mship_sink_queue_bytes.labels(sink=self.sink_name).set(bytes_size)
+            self.metrics.queue_size.set(count)
+            self.metrics.queue_bytes.set(bytes_size)
             
             logger.debug("Events enqueued", sink=self.sink_name, count=len(events))
             return True
@@ -405,8 +433,8 @@ class SinkPersistentQueue:
                 
             # Update metrics
             count, bytes_size = await self._get_queue_metrics()
-            mship_sink_queue_size.labels(sink=self.sink_name).set(count)
-            mship_sink_queue_bytes.labels(sink=self.sink_name).set(bytes_size)
+            self.metrics.queue_size.set(count)
+            self.metrics.queue_bytes.set(bytes_size)
             
             logger.debug("Events acknowledged and removed from queue",
                        sink=self.sink_name, count=len(event_ids))
@@ -462,7 +490,7 @@ class SinkPersistentQueue:
                 conn.execute('DELETE FROM queue WHERE id = ?', (queue_id,))
                 conn.commit()
                 
-            mship_sink_dlq_total.labels(sink=self.sink_name).inc()
+            self.metrics.dlq.inc()
             logger.warning("Event moved to DLQ", 
                          sink=self.sink_name, queue_id=queue_id, reason=error_reason)
                          
@@ -8,7 +8,7 @@ import structlog
 from .protocols import StorageSink
 from .loki import LokiClient
 from .resilient_sink import ResilientSink
-from ..metrics import mship_sink_write_seconds
+from ..metrics import SINK_WRITE_SECONDS, sink_label
 from .tsdb import TimescaleDBWriter
 
 logger = structlog.get_logger(__name__)
@@ -152,6 +152,7 @@ class SinksManager:
         merged["retry"].setdefault("initial_backoff_ms", defaults.get("initial_backoff_ms", 100))
         merged["retry"].setdefault("max_backoff_ms", defaults.get("max_backoff_ms", 2000))
         merged["retry"].setdefault("jitter_factor", defaults.get("jitter_factor", 0.1))
+        merged["retry"].setdefault("jitter_mode", defaults.get("jitter_mode", "symmetric"))
         
         # Use longer timeout for CI environments to handle Loki startup delays
         import os
@@ -276,7 +277,7 @@ class SinksManager:
         self, name: str, sink: ResilientSink, events: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Safely write to a sink with error handling and metrics observation."""
-        with mship_sink_write_seconds.labels(sink=name).time():
+        with SINK_WRITE_SECONDS[sink_label(name)].time():
             try:
                 result = await sink.write_events(events)
                 return result
@@ -8,7 +8,7 @@ import structlog
 from .protocols import StorageSink
 from .loki import LokiClient
 from .resilient_sink import ResilientSink
-from ..metrics import mship_sink_write_seconds
+from ..metrics import SINK_WRITE_SECONDS, sink_label
 
 logger = structlog.get_logger(__name__)
 
@@ -187,7 +187,7 @@ class SinksManager:
         """Safely write to a sink with error handling and metrics observation."""
         try:
             # Observe per-sink write latency as required
-            with mship_sink_write_seconds.labels(sink=name).time():
+            with SINK_WRITE_SECONDS[sink_label(name)].time():
                 return await sink.write_events(events)
         except Exception as e:
             logger.error("Sink write exception", sink=name, error=str(e))
@@ -1,10 +1,14 @@
 """Tests for configuration management."""
 
 import os
+import json
+import signal
+import weakref
 import pytest
+import yaml
 from unittest.mock import patch
 
-from mothership.app.config import LokiConfig, TSDBConfig, AppConfig, get_config
+from mothership.app.config import LokiConfig, TSDBConfig, AppConfig, ConfigManager, get_config
 
 
 class TestLokiConfig:
@@ -43,6 +47,18 @@ class TestLokiConfig:
         assert config.username == "user"
         assert config.password == "pass"
         assert config.batch_size == 50
+    
+    @pytest.mark.parametrize('value', ['', 'enabled', 'TRUE ', 'off'])
+    def test_enabled_lenient_values(self, value):
+        """Test that empty or unrecognised LOKI_ENABLED values mean disabled."""
+        with patch.dict(os.environ, {'LOKI_ENABLED': value}):
+            assert LokiConfig().enabled is False
+    
+    @patch.dict(os.environ, {'LOKI_ENABLED': 'Yes'})
+    def test_enabled_truthy_spellings(self):
+        """Test that the shared truthy spellings enable Loki."""
+        assert LokiConfig().enabled is True
+        assert LokiConfig(enabled=False).enabled is False
 
 
 class TestTSDBConfig:
@@ -77,6 +93,14 @@ class TestTSDBConfig:
         assert config.database == "mydb"
         assert config.username == "myuser"
         assert config.password == "mypass"
+    
+    @pytest.mark.parametrize('value', ['', 'enabled'])
+    def test_enabled_lenient_values(self, value):
+        """Test that empty or unrecognised TSDB_ENABLED values mean disabled."""
+        with patch.dict(os.environ, {'TSDB_ENABLED': value}):
+            config = TSDBConfig()
+            assert config.enabled is False
+            assert AppConfig.from_env().get_enabled_sinks() == ()
 
 
 class TestAppConfig:
@@ -126,11 +150,20 @@ class TestAppConfig:
         
         enabled_sinks = config.get_enabled_sinks()
         assert len(enabled_sinks) == 0
+    
+    def test_enabled_sinks_computed_once(self):
+        """Test that enabled sinks are cached on the instance."""
+        config = AppConfig.from_env()
+        
+        assert config.get_enabled_sinks() is config.get_enabled_sinks()
 
 
 class TestGetConfig:
     """Test the get_config function."""
     
+    def setup_method(self):
+        get_config.cache_clear()
+    
     def test_get_config_default(self):
         """Test getting default configuration."""
         config = get_config()
@@ -141,4 +174,129 @@ class TestGetConfig:
         
         # Should have TSDB enabled by default
         assert config.tsdb.enabled is True
-        assert config.loki.enabled is False
\ No newline at end of file
+        assert config.loki.enabled is False
+    
+    def test_get_config_cached_until_cleared(self):
+        """Test that get_config is memoized and cache_clear refreshes it."""
+        config = get_config()
+        assert get_config() is config
+        
+        with patch.dict(os.environ, {'LOKI_ENABLED': 'true'}):
+            assert get_config().loki.enabled is False
+            get_config.cache_clear()
+            assert get_config().loki.enabled is True
+        get_config.cache_clear()
+
+
+class TestConfigManagerEnvOverrides:
+    """Test ConfigManager environment variable overrides."""
+    
+    @patch.dict(os.environ, {
+        'LOKI_MAX_RETRIES': '7',
+        'LOKI_QUEUE_ENABLED': 'true',
+        'TSDB_FAILURE_THRESHOLD': '9',
+        'TSDB_DLQ_DIR': '/tmp/dlq'
+    })
+    def test_sink_reliability_overrides(self, tmp_path):
+        """Test per-sink retry/circuit breaker/queue overrides."""
+        config = ConfigManager(str(tmp_path / "missing.yaml")).get_config()
+        
+        loki = config['sinks']['loki']
+        tsdb = config['sinks']['timescaledb']
+        assert loki['retry']['max_retries'] == 7
+        assert loki['queue']['enabled'] is True
+        assert tsdb['circuit_breaker']['failure_threshold'] == 9
+        assert tsdb['queue']['dlq_dir'] == '/tmp/dlq'
+        assert 'retry' not in tsdb
+    
+    @patch.dict(os.environ, {
+        'MOTHERSHIP_PORT': '9000',
+        'MOTHERSHIP_LLM_ENABLED': 'yes',
+        'SINK_DEFAULT_MAX_RETRIES': '4',
+        'MOTHERSHIP_LOG_LEVEL': ''
+    })
+    def test_general_overrides(self, tmp_path):
+        """Test server/LLM/defaults overrides and that empty values are ignored."""
+        config = ConfigManager(str(tmp_path / "missing.yaml")).get_config()
+        
+        assert config['server']['port'] == 9000
+        assert config['llm']['enabled'] is True
+        assert config['sink_defaults']['max_retries'] == 4
+        assert config['reliability']['max_retries'] == 4
+        assert config['logging']['level'] == 'INFO'
+    
+    def test_sighup_handler_installed_once(self, tmp_path):
+        """Test that SIGHUP is registered once and reloads every manager."""
+        with patch('mothership.app.config.signal.signal') as mock_signal, \
+                patch.object(ConfigManager, '_sighup_installed', False), \
+                patch.object(ConfigManager, '_instances', weakref.WeakSet()):
+            first = ConfigManager(str(tmp_path / "missing.yaml"))
+            second = ConfigManager(str(tmp_path / "missing.yaml"))
+            assert mock_signal.call_count == 1
+            
+            with patch.object(ConfigManager, 'load_config') as mock_load:
+                ConfigManager._dispatch_sighup(signal.SIGHUP, None)
+                assert mock_load.call_count == 2
+    
+    def test_enabled_sinks_refreshed_on_reload(self, tmp_path):
+        """Test that cached enabled sinks are rebuilt after a reload."""
+        config_file = tmp_path / "config.yaml"
+        manager = ConfigManager(str(config_file))
+        data = manager._get_default_config()
+        
+        sinks = manager.get_enabled_sinks()
+        assert sinks == ('timescaledb',)
+        assert manager.get_enabled_sinks() is sinks
+        
+        data['sinks']['loki']['enabled'] = True
+        config_file.write_text(yaml.safe_dump(data))
+        manager.load_config()
+        assert manager.get_enabled_sinks() == ('timescaledb', 'loki')
+    
+    def test_get_config_is_read_only(self, tmp_path):
+        """Test that get_config returns a read-only view of the config."""
+        manager = ConfigManager(str(tmp_path / "missing.yaml"))
+        config = manager.get_config()
+        
+        assert config is manager.get_config()
+        assert config['server']['port'] == 8443
+        with pytest.raises(TypeError):
+            config['server'] = {}
+    
+    def test_default_config_not_shared(self, tmp_path):
+        """Test that overrides on one manager don't leak into the defaults."""
+        with patch.dict(os.environ, {"MOTHERSHIP_PORT": "9000"}):
+            first = ConfigManager(str(tmp_path / "missing.yaml"))
+        second = ConfigManager(str(tmp_path / "other.yaml"))
+    
+        assert first.get_config()['server']['port'] == 9000
+        assert second.get_config()['server']['port'] == 8443
+    
+    def test_json_config_used_when_yaml_missing(self, tmp_path):
+        """Test that config.json is loaded when config.yaml is absent."""
+        data = ConfigManager(str(tmp_path / "other.yaml"))._get_default_config()
+        data['server']['port'] = 9443
+        (tmp_path / "config.json").write_text(json.dumps(data))
+        
+        manager = ConfigManager(str(tmp_path / "config.yaml"))
+        assert manager.get_config()['server']['port'] == 9443
+    
+    def test_reload_skipped_when_file_unchanged(self, tmp_path):
+        """Test that an unchanged config file is not re-parsed."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(
+            "server: {host: 0.0.0.0, port: 8443}\n"
+            "database: {dsn: postgresql://localhost/db}\n"
+            "pipeline: {}\n"
+        )
+        manager = ConfigManager(str(config_path))
+        
+        with patch('mothership.app.config._load_yaml') as mock_load:
+            manager.load_config()
+            manager._handle_sighup(signal.SIGHUP, None)
+            assert mock_load.call_count == 0
+        
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert manager.load_config()['server']['port'] == 8443
+        assert manager._last_mtime_ns == config_path.stat().st_mtime_ns
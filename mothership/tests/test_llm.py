@@ -4,6 +4,7 @@ import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 import json
 import sys
+import time
 import os
 from pathlib import Path
 
@@ -87,6 +88,48 @@ class TestMockLLMEnricher(unittest.TestCase):
         self.assertNotIn('llm_enrichment', result2)
         self.assertNotIn('llm_category', result2)
     
+    def test_mock_llm_batch_overlaps_calls(self):
+        """Test that batches overlap LLM calls and keep event order."""
+        config = {'enabled': True, 'concurrency': 3}
+        enricher = MockLLMEnricher(config)
+        in_flight = []
+        peak = []
+        
+        async def slow_call(event):
+            in_flight.append(event)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(event)
+            return {'confidence': 0.9, 'category': event['message']}
+        
+        enricher._call_llm = slow_call
+        events = [{'message': f'event {i}'} for i in range(6)]
+        results = asyncio.run(enricher.process_batch(events))
+        
+        self.assertEqual([r['llm_category'] for r in results], [e['message'] for e in events])
+        self.assertEqual(max(peak), 3)
+    
+    def test_mock_llm_enrichment_in_place(self):
+        """Test that enrichment updates the event in place unless disabled."""
+        event = {'message': 'Test event'}
+        result = asyncio.run(MockLLMEnricher({'enabled': True}).process(event))
+        self.assertIs(result, event)
+        self.assertIn('llm_enrichment', event)
+        
+        event = {'message': 'Test event'}
+        enricher = MockLLMEnricher({'enabled': True, 'mutate_in_place': False})
+        result = asyncio.run(enricher.process(event))
+        self.assertIsNot(result, event)
+        self.assertNotIn('llm_enrichment', event)
+    
+    def test_mock_llm_skips_http_config(self):
+        """Test that the mock skips HTTP setup and shares the response schema."""
+        enricher = MockLLMEnricher({'enabled': True})
+        self.assertFalse(hasattr(enricher, 'endpoint'))
+        self.assertFalse(hasattr(enricher, 'timeout_seconds'))
+        self.assertEqual(enricher.model, 'gpt-3.5-turbo')
+        self.assertIs(enricher.RESPONSE_SCHEMA, LLMEnricher.RESPONSE_SCHEMA)
+    
     def test_mock_llm_response_validation(self):
         """Test response validation."""
         # Invalid response (missing confidence)
@@ -222,6 +265,67 @@ class TestLLMEnricher(unittest.TestCase):
         # Should return unchanged due to size limit
         self.assertEqual(result, large_event)
     
+    def test_event_size_estimate_stops_early(self):
+        """Test that the size estimate tracks JSON length and stops past the limit."""
+        from pipeline.llm_enricher import _approx_json_size, _Oversize
+        
+        event = {'message': 'hello world', 'type': 'log', 'tags': {'a': 'b'}}
+        estimate = _approx_json_size(event, 10000)
+        self.assertLess(abs(estimate - len(json.dumps(event))), len(json.dumps(event)) // 2)
+        
+        seen = []
+        class Probe:
+            def __init__(self, i):
+                self.i = i
+            def __str__(self):
+                seen.append(self.i)
+                return 'x' * 50
+        
+        with self.assertRaises(_Oversize):
+            _approx_json_size([Probe(i) for i in range(100)], 100)
+        self.assertLess(len(seen), 5)
+    
+    def test_http_client_shared_between_enrichers(self):
+        """Test that enrichers for the same backend share one HTTP client."""
+        from pipeline.llm_enricher import close_shared_clients
+        
+        async def run():
+            first = LLMEnricher({'enabled': True})
+            second = LLMEnricher({'enabled': True})
+            other = LLMEnricher({'enabled': True, 'endpoint': 'http://other/v1'})
+            for enricher in (first, second, other):
+                await enricher._init_client()
+            try:
+                self.assertIs(first.client, second.client)
+                self.assertIsNot(first.client, other.client)
+            finally:
+                await close_shared_clients()
+            self.assertTrue(first.client.is_closed)
+        
+        asyncio.run(run())
+    
+    def test_http_client_not_shared_across_event_loops(self):
+        """Test that each event loop gets its own pooled HTTP client."""
+        from pipeline.llm_enricher import close_shared_clients
+        
+        async def get_client():
+            enricher = LLMEnricher({'enabled': True})
+            await enricher._init_client()
+            return enricher.client
+        
+        first = asyncio.run(get_client())
+        
+        async def run():
+            client = await get_client()
+            try:
+                self.assertIsNot(client, first)
+                self.assertIs(await get_client(), client)
+            finally:
+                await close_shared_clients()
+            self.assertTrue(client.is_closed)
+        
+        asyncio.run(run())
+    
     def test_circuit_breaker(self):
         """Test circuit breaker functionality."""
         config = {
@@ -245,6 +349,22 @@ class TestLLMEnricher(unittest.TestCase):
         # Should return unchanged due to open circuit
         self.assertEqual(result, event)
     
+    def test_open_circuit_skips_until_reset_timeout(self):
+        """Test that an open circuit passes events through, then resets."""
+        enricher = MockLLMEnricher({
+            'enabled': True,
+            'circuit_breaker': {'enabled': True, 'reset_timeout': 60}
+        })
+        enricher.circuit_open = True
+        enricher.last_failure_time = time.time()
+        
+        event = {'message': 'Test event'}
+        self.assertNotIn('llm_enrichment', asyncio.run(enricher.process(dict(event))))
+        
+        enricher.last_failure_time = time.time() - 61
+        self.assertIn('llm_enrichment', asyncio.run(enricher.process(dict(event))))
+        self.assertFalse(enricher.circuit_open)
+    
     def test_response_validation(self):
         """Test LLM response validation."""
         config = {'enabled': True}
@@ -299,6 +419,25 @@ class TestLLMEnricher(unittest.TestCase):
         self.assertNotIn('password', prompt)
         self.assertNotIn('should_not_appear', prompt)
     
+    def test_safe_prompt_event_is_compact_json(self):
+        """Test that the event is embedded as compact JSON."""
+        enricher = LLMEnricher({'enabled': True})
+        
+        prompt = enricher._create_safe_prompt({'message': 'disk full', 'severity': 'error'})
+        
+        self.assertIn('Event: {"severity":"error","message":"disk full"}', prompt)
+    
+    def test_safe_prompt_excludes_unsafe_and_empty_fields(self):
+        """Test that only non-empty safe fields reach the prompt template."""
+        enricher = LLMEnricher({'enabled': True})
+        
+        prompt = enricher._create_safe_prompt({'message': 'ok', 'user': 'bob', 'tag': ''})
+        
+        self.assertIn('Event: {"message":"ok"}', prompt)
+        self.assertNotIn('bob', prompt)
+        self.assertIn('"tags": {"component": "database"', prompt)
+        self.assertTrue(prompt.startswith('Analyze this log event'))
+    
     def test_get_enhanced_stats(self):
         """Test enhanced statistics."""
         config = {
@@ -454,6 +593,62 @@ class TestOllamaLLMEnricher(unittest.TestCase):
         # Should return original event due to invalid response
         self.assertEqual(result, event)
     
+    def test_ollama_json_extracted_from_text(self):
+        """Test that JSON embedded in chatty Ollama output is extracted."""
+        enricher = LLMEnricher({'enabled': True, 'backend': 'ollama'})
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            'message': {'content': 'Sure! {"confidence": 0.9, "category": "boot"} Done.'}
+        }
+        enricher.client = MagicMock()
+        enricher.client.post = AsyncMock(return_value=mock_response)
+        
+        result = asyncio.run(enricher._call_ollama_llm('prompt'))
+        
+        self.assertEqual(result, {'confidence': 0.9, 'category': 'boot'})
+    
+    def test_json_object_scanner_handles_split_chunks(self):
+        """Test that the scanner tracks strings and nesting across chunks."""
+        from pipeline.llm_enricher import _JSONObjectScanner
+        
+        scanner = _JSONObjectScanner()
+        self.assertEqual(scanner.feed('Sure: {"a": "x}\\"{", "b"'), -1)
+        self.assertEqual(scanner.feed(': {"c": 1}} more'), 11)
+    
+    def test_ollama_streaming_stops_at_object_end(self):
+        """Test that streamed Ollama output is cut off once the JSON closes."""
+        enricher = LLMEnricher({'enabled': True, 'backend': 'ollama', 'stream': True})
+        lines = [
+            json.dumps({'message': {'content': '{"confidence": 0.9, '}}),
+            json.dumps({'message': {'content': '"category": "boot"}'}}),
+            json.dumps({'message': {'content': ' and more text'}}),
+        ]
+        read = []
+        
+        class FakeStream:
+            async def __aenter__(self):
+                return self
+            
+            async def __aexit__(self, *exc):
+                return False
+            
+            def raise_for_status(self):
+                pass
+            
+            async def aiter_lines(self):
+                for line in lines:
+                    read.append(line)
+                    yield line
+        
+        enricher.client = MagicMock()
+        enricher.client.stream = MagicMock(return_value=FakeStream())
+        
+        result = asyncio.run(enricher._call_ollama_llm('prompt'))
+        
+        self.assertEqual(result, {'confidence': 0.9, 'category': 'boot'})
+        self.assertEqual(len(read), 2)
+        self.assertTrue(enricher.client.stream.call_args.kwargs['json']['stream'])
+    
     def test_ollama_backend_configuration(self):
         """Test Ollama backend configuration options."""
         config = {
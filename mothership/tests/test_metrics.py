@@ -4,7 +4,7 @@ import pytest
 from mothership.app.metrics import (
     get_metrics_content,
     mship_ingest_batches_total, mship_ingest_events_total, mship_written_events_total,
-    mship_sink_written_total, mship_ingest_seconds, mship_pipeline_seconds,
+    mship_sink_written_total, mship_sink_error_total, mship_ingest_seconds, mship_pipeline_seconds,
     mship_sink_write_seconds, mship_requests_total, mship_active_connections,
     mship_loki_queue_size, METRICS_REGISTRY
 )
@@ -129,6 +129,27 @@ class TestMetrics:
         our_content = get_metrics_content()
         assert 'mship_ingest_events_total' in our_content
         assert 'test_default_counter' not in our_content
+    
+    def test_metrics_bytes_cached_within_ttl(self, monkeypatch):
+        """Test that scrape output is reused until the cache TTL expires."""
+        from mothership.app import metrics
+        
+        monkeypatch.setattr(metrics, '_cache_ttl', 60.0)
+        monkeypatch.setattr(metrics, '_cached_payload', None)
+        first = metrics.get_metrics_bytes()
+        mship_ingest_batches_total.inc()
+        assert metrics.get_metrics_bytes() is first
+        
+        monkeypatch.setattr(metrics, '_cache_ttl', 0.0)
+        assert metrics.get_metrics_bytes() != first
+    
+    def test_metrics_payload_length(self):
+        """Test that the payload length matches the encoded bytes."""
+        from mothership.app.metrics import get_metrics_payload
+        
+        payload, length = get_metrics_payload()
+        assert isinstance(payload, bytes)
+        assert length == len(payload)
 
 
 class TestMetricsRequirements:
@@ -181,6 +202,23 @@ class TestMetricsRequirements:
         assert 'mship_sink_written_total{sink="timescaledb"}' in content
         assert 'mship_sink_write_seconds_count{sink="loki"}' in content
         assert 'mship_sink_write_seconds_count{sink="timescaledb"}' in content
+    
+    def test_unknown_sink_labels_clamped(self):
+        """Test that sink names outside the allowlist map to 'other'."""
+        from mothership.app.metrics import SINK_ERROR, sink_label
+        
+        assert sink_label('loki') == 'loki'
+        assert sink_label('tenant-42.example.com') == 'other'
+        assert SINK_ERROR[sink_label('loki')] is mship_sink_error_total.labels(sink='loki')
+    
+    def test_sink_metrics_bundle(self):
+        """Test that sink metric bundles share the pre-bound children."""
+        from mothership.app.metrics import get_sink_metrics
+        
+        bundle = get_sink_metrics('loki')
+        assert bundle is get_sink_metrics('loki')
+        assert bundle.written is mship_sink_written_total.labels(sink='loki')
+        assert get_sink_metrics('unknown-sink') is get_sink_metrics('other')
 
 
 class TestReliabilityMetrics:
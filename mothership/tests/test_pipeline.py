@@ -1,22 +1,25 @@
 """Tests for pipeline processors."""
 import unittest
 import asyncio
+import hashlib
+from collections import OrderedDict, defaultdict
 from unittest.mock import MagicMock, patch
 import sys
 import os
+from datetime import datetime
 from pathlib import Path
 
 # Add the app directory to the path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'app'))
 
-from pipeline.processor import Pipeline, Processor
+from pipeline.processor import Pipeline, Processor, SyncProcessor, ProcessingContext, run_fused_batch
 from pipeline.processors_redaction import (
     DropFieldsProcessor, MaskPatternsProcessor, HashFieldsProcessor, 
     RedactionPipeline, PIISafetyValidator
 )
 from pipeline.processors_enrich import (
     AddTagsProcessor, SeverityMapProcessor, ServiceFromPathProcessor,
-    TimestampNormalizer
+    GeoHintProcessor, SiteEnvTagsProcessor, TimestampNormalizer
 )
 
 class TestRedactionProcessors(unittest.TestCase):
@@ -43,6 +46,14 @@ class TestRedactionProcessors(unittest.TestCase):
         self.assertIn('username', result)
         self.assertIn('timestamp', result)
     
+    def test_drop_fields_none_values(self):
+        """Test that fields holding None are dropped too."""
+        processor = DropFieldsProcessor({'drop_fields': ['secret', 'token']})
+        
+        result = processor.process_sync({'secret': None, 'message': 'ok'})
+        
+        self.assertEqual(result, {'message': 'ok'})
+    
     def test_mask_patterns_processor(self):
         """Test masking sensitive patterns."""
         config = {
@@ -68,6 +79,56 @@ class TestRedactionProcessors(unittest.TestCase):
         self.assertIn('********', result['message'])  # Password should be masked
         self.assertIn('********', result['data']['config'])  # Config password should be masked
     
+    def test_mask_patterns_combined_prefilter(self):
+        """Test that patterns share one prefilter regex unless they use backreferences."""
+        processor = MaskPatternsProcessor({'mask_patterns': [r'\d{3}-\d{4}', r'key=\w+'], 'mask_length': 4})
+        self.assertIsNotNone(processor._union)
+        self.assertEqual(processor._mask_string('call 555-1234 key=abcdef'), 'call **** ****')
+        
+        processor = MaskPatternsProcessor({'mask_patterns': [r'(\w)\1', r'key=\w+']})
+        self.assertIsNone(processor._union)
+        self.assertEqual(processor._mask_string('aa key=1'), '** *****')
+    
+    def test_mask_patterns_overlapping_applied_in_order(self):
+        """Test that overlapping patterns mask the same text as one sub per pattern."""
+        processor = MaskPatternsProcessor({'mask_patterns': [r'\b\d{3}-\d{2}-\d{4}\b', r'ssn:\s*\d']})
+        self.assertIsNotNone(processor._union)
+        self.assertEqual(processor._mask_string('ssn: 123-45-6789'), 'ssn: ********')
+        
+        clean = 'nothing to mask'
+        self.assertIs(processor._mask_string(clean), clean)
+    
+    def test_mask_patterns_in_place_nested(self):
+        """Test that masking walks nested lists/dicts and updates them in place."""
+        processor = MaskPatternsProcessor({'mask_patterns': [r'token=\S+']})
+        clean = {'note': 'nothing here'}
+        event = {
+            'message': 'ok',
+            'items': ['token=abc123', {'deep': ['token=xyz789']}],
+            'clean': clean,
+            'count': 3
+        }
+        
+        result = processor.process_sync(event)
+        
+        self.assertIs(result, event)
+        self.assertIs(result['clean'], clean)
+        self.assertEqual(result['items'][0], '********')
+        self.assertEqual(result['items'][1]['deep'][0], '********')
+        self.assertEqual(result['message'], 'ok')
+        self.assertEqual(result['count'], 3)
+    
+    def test_mask_patterns_container_subclasses(self):
+        """Test that masking recurses into dict and list subclasses."""
+        processor = MaskPatternsProcessor({'mask_patterns': [r'token=\S+']})
+        nested = defaultdict(list, {'tokens': ['token=abc123']})
+        event = OrderedDict(message='token=xyz789', nested=nested)
+        
+        result = processor.process_sync(event)
+        
+        self.assertEqual(result['message'], '********')
+        self.assertEqual(result['nested']['tokens'][0], '********')
+    
     def test_hash_fields_processor(self):
         """Test hashing sensitive fields."""
         config = {
@@ -97,6 +158,52 @@ class TestRedactionProcessors(unittest.TestCase):
         # Message should remain unchanged
         self.assertEqual(result['message'], 'User activity')
     
+    def test_hash_fields_algorithms(self):
+        """Test salted-prefix digests and the keyed blake2b option."""
+        event = {'user': 'alice'}
+        
+        sha = HashFieldsProcessor({'hash_fields': ['user'], 'salt': 's', 'algorithm': 'sha256'})
+        self.assertEqual(sha.process_sync(dict(event))['user'],
+                         hashlib.sha256(b'salice').hexdigest())
+        
+        blake = HashFieldsProcessor({'hash_fields': ['user'], 'salt': 's', 'algorithm': 'blake2b'})
+        self.assertEqual(blake.process_sync(dict(event))['user'],
+                         hashlib.blake2b(b'alice', key=b's', digest_size=16).hexdigest())
+        
+        unknown = HashFieldsProcessor({'hash_fields': ['user'], 'salt': 's', 'algorithm': 'nope'})
+        self.assertEqual(unknown.process_sync(dict(event))['user'], sha.process_sync(dict(event))['user'])
+    
+    def test_redaction_pipeline_fused_batch(self):
+        """Test that a sync-only redaction pipeline runs all steps per event in one pass."""
+        pipeline = RedactionPipeline({'redaction': {
+            'drop_fields': ['password'],
+            'mask_patterns': [r'token=\S+'],
+            'hash_fields': ['user']
+        }})
+        mask = pipeline.processors[1]
+        original = mask.process_sync
+        
+        def flaky(event):
+            if event.get('id') == 2:
+                raise RuntimeError('boom')
+            return original(event)
+        
+        events = [
+            {'id': 1, 'user': 'a', 'password': 'x', 'message': 'token=abc'},
+            {'id': 2, 'user': 'b', 'message': 'token=def'}
+        ]
+        with patch.object(mask, 'process_sync', side_effect=flaky):
+            results = asyncio.run(pipeline.process_batch(events))
+        
+        self.assertNotIn('password', results[0])
+        self.assertEqual(results[0]['message'], '********')
+        self.assertEqual(results[1]['message'], 'token=def')
+        self.assertNotEqual(results[1]['user'], 'b')
+        self.assertEqual(mask.get_stats()['errors'], 1)
+        self.assertEqual(pipeline.get_stats()['processed'], 2)
+        for processor in pipeline.processors:
+            self.assertGreater(processor.get_stats()['total_ns'], 0, processor.name)
+    
     def test_pii_safety_validator(self):
         """Test PII safety validation."""
         config = {'strict_mode': False}
@@ -121,6 +228,47 @@ class TestRedactionProcessors(unittest.TestCase):
         # Should not raise exception in non-strict mode
         result = asyncio.run(validator.process(pii_event))
         self.assertEqual(result, pii_event)
+    
+    def test_pii_detection_reports_every_matching_type(self):
+        """Test that the combined prefilter still reports each PII type found."""
+        validator = PIISafetyValidator({'strict_mode': False})
+        
+        found = validator._detect_pii({
+            'message': 'mail bob@example.com or call 555-123-4567',
+            'nested': [{'note': 'all clear'}]
+        })
+        
+        self.assertEqual(sorted(name for _, name, _ in found), ['Email', 'Phone'])
+        self.assertEqual(validator._detect_pii({'message': 'nothing to see'}), [])
+    
+    def test_pii_detection_paths_in_document_order(self):
+        """Test that findings keep nested paths and document order."""
+        validator = PIISafetyValidator({'strict_mode': False})
+        
+        found = validator._detect_pii({
+            'a': 'x@y.com',
+            'b': {'c': ['ok', '123-45-6789', {'d': 'token=1'}]},
+            'e': 'z@y.com'
+        })
+        
+        self.assertEqual([(p, n) for p, n, _ in found],
+                         [('a', 'Email'), ('b.c[1]', 'SSN'), ('b.c[2].d', 'Token'), ('e', 'Email')])
+    
+    def test_pii_union_prefilter(self):
+        """Test that the combined regex alone decides which strings get per-pattern checks."""
+        validator = PIISafetyValidator({'strict_mode': False})
+        
+        spy = MagicMock()
+        with patch.object(validator, 'compiled_patterns', [(spy, 'Spy')]):
+            validator._detect_pii({'message': 'service restarted cleanly'})
+        spy.search.assert_not_called()
+        
+        found = validator._detect_pii({'message': 'PASSWORD: hunter'})
+        self.assertEqual([name for _, name, _ in found], ['Password'])
+        
+        # \d is Unicode-aware, so non-ASCII digits must reach the patterns too
+        found = validator._detect_pii({'message': 'ssn \u0661\u0662\u0663-\u0664\u0665-\u0666\u0667\u0668\u0669'})
+        self.assertEqual([name for _, name, _ in found], ['SSN'])
 
 
 class TestEnrichmentProcessors(unittest.TestCase):
@@ -146,6 +294,39 @@ class TestEnrichmentProcessors(unittest.TestCase):
         self.assertEqual(result['tags']['version'], '1.5')
         self.assertEqual(result['tags']['environment'], 'test')
     
+    def test_add_tags_in_place(self):
+        """Test that tags are merged into the event itself without sharing the config dict."""
+        processor = AddTagsProcessor({'add_tags': {'env': 'test'}})
+        
+        event = {'message': 'a', 'tags': {'site': 'x'}}
+        self.assertIs(processor.process_sync(event), event)
+        self.assertEqual(event['tags'], {'site': 'x', 'env': 'test'})
+        
+        fresh = processor.process_sync({'message': 'b'})
+        fresh['tags']['extra'] = '1'
+        self.assertEqual(processor.add_tags, {'env': 'test'})
+    
+    def test_unchanged_events_pass_through_uncopied(self):
+        """Test that processors only copy an event when they actually write to it."""
+        event = {'message': 'plain', 'severity': 'bogus', 'timestamp': '2022-01-01T00:00:00Z'}
+        processors = [
+            DropFieldsProcessor({'drop_fields': ['password']}),
+            HashFieldsProcessor({'hash_fields': ['user']}),
+            SeverityMapProcessor({}),
+            ServiceFromPathProcessor({}),
+            GeoHintProcessor({}),
+            SiteEnvTagsProcessor({}),
+            TimestampNormalizer({})
+        ]
+        for processor in processors:
+            self.assertIs(processor.process_sync(event), event, processor.name)
+        
+        changed = SeverityMapProcessor({}).process_sync({'severity': 'info'})
+        self.assertEqual(changed['severity_num'], 6)
+        original = {'user': 'bob'}
+        self.assertIsNot(HashFieldsProcessor({'hash_fields': ['user']}).process_sync(original), original)
+        self.assertEqual(original, {'user': 'bob'})
+    
     def test_severity_map_processor(self):
         """Test severity mapping."""
         config = {
@@ -169,6 +350,20 @@ class TestEnrichmentProcessors(unittest.TestCase):
             result = asyncio.run(processor.process(event))
             self.assertEqual(result['severity_num'], expected_num)
     
+    def test_severity_memo(self):
+        """Test that raw severities are memoized, including unmapped ones."""
+        processor = SeverityMapProcessor({})
+        self.assertIn('error', processor._fast)
+        
+        with patch.object(processor, '_map_severity', wraps=processor._map_severity) as mock_map:
+            for raw in ['error', 'ERROR ', 'ERROR ', 'bogus', 'bogus', '5']:
+                processor.process_sync({'severity': raw})
+            self.assertEqual(mock_map.call_count, 3)
+        
+        self.assertEqual(processor.process_sync({'severity': 'ERROR '})['severity_num'], 3)
+        self.assertNotIn('severity_num', processor.process_sync({'severity': 'bogus'}))
+        self.assertEqual(processor.process_sync({'severity': 5})['severity_num'], 5)
+    
     def test_service_from_path_processor(self):
         """Test service extraction from paths."""
         config = {
@@ -192,6 +387,136 @@ class TestEnrichmentProcessors(unittest.TestCase):
             if expected_service:
                 self.assertEqual(result['service'], expected_service)
     
+    def test_service_from_path_literal_patterns(self):
+        """Test that literal path patterns match case-insensitively and keep config order."""
+        processor = ServiceFromPathProcessor({'path_patterns': [
+            (r'/opt/([^/]+)/', r'\1'),
+            (r'/opt/legacy/', 'legacy'),
+            (r'/srv/web/', 'web'),
+        ]})
+        
+        self.assertEqual(processor._matchers[0][0], None)
+        self.assertEqual(processor._matchers[2][0], '/srv/web/')
+        self.assertEqual(processor._extract_service_from_path('/SRV/Web/app.log'), 'web')
+        self.assertEqual(processor._extract_service_from_path('/opt/legacy/app.log'), 'legacy')
+        self.assertIsNone(processor._extract_service_from_path('/tmp/app.log'))
+    
+    def test_templates_expanded_only_when_needed(self):
+        """Test that backreference templates expand and fixed names pass through."""
+        service = ServiceFromPathProcessor({'path_patterns': [(r'/opt/([^/]+)/', r'svc-\1')]})
+        site_env = SiteEnvTagsProcessor({'site_patterns': [(r'^(\w+)-lab\.', {'site': r'\1', 'env': 'lab'})]})
+        
+        self.assertEqual(service._matchers[0][3], True)
+        self.assertEqual(service._extract_service_from_path('/opt/billing/x.log'), 'svc-billing')
+        self.assertEqual(site_env._rules[0][2:], (True, 'lab', False))
+        self.assertEqual(site_env._extract_site_env('paris-lab.example.com'), ('paris', 'lab'))
+        self.assertEqual(site_env._extract_site_env('paris.example.com'), (None, None))
+    
+    def test_geo_hint_subnet_lookup(self):
+        """Test that subnet hints prefer the most specific prefix and skip bad input."""
+        processor = GeoHintProcessor({
+            'ip_location_map': {'10.0.0.1': {'site': 'gateway'}},
+            'subnet_location_map': {
+                '10.0.0.0/8': {'site': 'corp'},
+                '10.1.0.0/16': {'site': 'lab'},
+                '192.168.1.7': {'site': 'printer'},
+                'bogus/99': {'site': 'never'}
+            }
+        })
+        
+        self.assertEqual(processor._get_location_hint('10.0.0.1'), {'site': 'gateway'})
+        self.assertEqual(processor._get_location_hint('10.1.2.3'), {'site': 'lab'})
+        self.assertEqual(processor._get_location_hint('10.2.2.3'), {'site': 'corp'})
+        self.assertEqual(processor._get_location_hint('192.168.1.7'), {'site': 'printer'})
+        self.assertIsNone(processor._get_location_hint('192.168.1.8'))
+        self.assertIsNone(processor._get_location_hint('10.1'))
+        self.assertIsNone(processor._get_location_hint('fe80::1'))
+        
+        # Zero-padded octets read as decimal; trailing junk never matches
+        exact = GeoHintProcessor({'subnet_location_map': {'10.0.0.10/32': {'site': 'host'}}})
+        self.assertEqual(exact._get_location_hint('10.0.0.010'), {'site': 'host'})
+        self.assertIsNone(exact._get_location_hint('10.0.0.10 junk'))
+        self.assertIsNone(exact._get_location_hint('10.0.0.266'))
+    
+    def test_enrichment_lookups_memoized(self):
+        """Test that repeated paths and IPs hit the per-instance lookup caches."""
+        service = ServiceFromPathProcessor({})
+        geo = GeoHintProcessor({'subnet_location_map': {'10.0.0.0/8': {'site': 'corp'}}})
+        
+        for _ in range(3):
+            self.assertEqual(service.process_sync({'path': '/var/log/nginx/a.log'})['service'], 'nginx')
+            self.assertEqual(geo.process_sync({'source_ip': '10.1.1.1'})['geo_hint'], {'site': 'corp'})
+        
+        self.assertEqual(service._service_for_path.cache_info().hits, 2)
+        self.assertEqual(geo._location_for_ip.cache_info().misses, 1)
+    
+    def test_columnar_batch_matches_per_event(self):
+        """Test that column-wise batches resolve each key once and match process_sync."""
+        processor = SiteEnvTagsProcessor({'default_env': 'unknown'})
+        events = [
+            {'hostname': 'web1.us.prod.example.com'},
+            {'host': 'db1.eu.dev.example.com', 'tags': {}},
+            {'hostname': 'web1.us.prod.example.com'},
+            {'message': 'no host'}
+        ]
+        expected = [processor.process_sync(dict(e, tags=dict(e['tags'])) if 'tags' in e else dict(e))
+                    for e in events]
+        
+        with patch.object(processor, '_resolve', wraps=processor._resolve) as mock_resolve:
+            results = asyncio.run(processor.process_batch(events))
+            self.assertEqual(mock_resolve.call_count, 3)
+        
+        self.assertEqual(results, expected)
+        self.assertIs(results[3], events[3])
+        self.assertEqual(processor.get_stats()['processed'], 4)
+    
+    def test_columnar_batch_falls_back_per_event(self):
+        """Test that a failing column pass is retried event by event."""
+        processor = ServiceFromPathProcessor({})
+        
+        with patch.object(processor, '_resolve', side_effect=[RuntimeError('boom'), 'nginx', None]):
+            results = asyncio.run(processor.process_batch([{'path': 'a'}, {'path': 'b'}]))
+        
+        self.assertEqual(results[0]['service'], 'nginx')
+        self.assertNotIn('service', results[1])
+    
+    def test_debug_logging_skipped_when_disabled(self):
+        """Test that per-event debug logs are only emitted when DEBUG is enabled."""
+        processor = ServiceFromPathProcessor({})
+        
+        for enabled in (False, True):
+            with patch('pipeline.processors_enrich.logger') as mock_logger, \
+                    patch('pipeline.processors_enrich._level_logger') as mock_level:
+                mock_level.isEnabledFor.return_value = enabled
+                processor.process_sync({'path': '/var/log/nginx/access.log'})
+                self.assertEqual(mock_logger.debug.called, enabled)
+    
+    def test_timestamp_iso_fast_path(self):
+        """Test that ISO shapes parse without strptime and others still fall back."""
+        processor = TimestampNormalizer({})
+        
+        with patch('pipeline.processors_enrich.datetime') as mock_datetime:
+            mock_datetime.fromisoformat.side_effect = datetime.fromisoformat
+            self.assertEqual(processor._normalize_timestamp('2022-01-01T10:11:12.5Z'), '2022-01-01T10:11:12Z')
+            self.assertEqual(processor._normalize_timestamp('2022-01-01 10:11:12'), '2022-01-01T10:11:12Z')
+            mock_datetime.strptime.assert_not_called()
+        
+        self.assertEqual(processor._normalize_timestamp('2022/01/01 10:11:12'), '2022-01-01T10:11:12Z')
+        self.assertEqual(processor._normalize_timestamp('2022-1-1 0:0:0'), '2022-01-01T00:00:00Z')
+        self.assertEqual(processor._normalize_timestamp('2022-01-01T00:00:00+02:00'), '2022-01-01T00:00:00+02:00')
+        self.assertIsNone(processor._normalize_timestamp('2022-13-01 00:00:00'))
+    
+    def test_timestamp_default_shared_within_batch(self):
+        """Test that events missing a timestamp share one per-batch value."""
+        processor = TimestampNormalizer({})
+        
+        with patch('pipeline.processors_enrich.datetime', wraps=datetime) as mock_datetime:
+            results = asyncio.run(processor.process_batch([{'message': str(i)} for i in range(5)]))
+            self.assertEqual(mock_datetime.now.call_count, 1)
+        
+        self.assertEqual(len({r['timestamp'] for r in results}), 1)
+        self.assertIsNone(processor._now_iso)
+    
     def test_timestamp_normalizer(self):
         """Test timestamp normalization."""
         config = {'timestamp_fields': ['timestamp', 'time']}
@@ -285,6 +610,152 @@ class TestPipeline(unittest.TestCase):
         self.assertEqual(stats['successful_events'], 5)
         self.assertIn('processors', stats)
         self.assertIn('AddTags', stats['processors'])
+    
+    def test_processor_stats_timing_units(self):
+        """Test that timings accumulate as integer ns and report seconds."""
+        processor = AddTagsProcessor({'add_tags': {'test': 'true'}})
+        asyncio.run(processor.process_batch([{'message': 'a'}, {'message': 'b'}]))
+        
+        stats = processor.get_stats()
+        self.assertIsInstance(stats['total_ns'], int)
+        self.assertAlmostEqual(stats['total_time'], stats['total_ns'] / 1e9)
+        self.assertAlmostEqual(stats['avg_processing_time'], stats['total_ns'] / 2 / 1e9)
+    
+    def test_processor_stats_view_cached_until_batch(self):
+        """Test that get_stats returns a read-only view rebuilt after each batch."""
+        processor = AddTagsProcessor({'add_tags': {'test': 'true'}})
+        stats = processor.get_stats()
+        self.assertIs(processor.get_stats(), stats)
+        with self.assertRaises(TypeError):
+            stats['processed'] = 5
+        
+        asyncio.run(processor.process_batch([{'message': 'a'}]))
+        self.assertIsNot(processor.get_stats(), stats)
+        self.assertEqual(processor.get_stats()['processed'], 1)
+    
+    def test_processor_concurrent_batch(self):
+        """Test that concurrent batches overlap, keep order and count errors."""
+        class SlowProcessor(Processor):
+            def __init__(self, config):
+                super().__init__(config)
+                self.in_flight = 0
+                self.max_in_flight = 0
+            
+            async def process(self, event):
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.01)
+                self.in_flight -= 1
+                if event['n'] == 3:
+                    raise ValueError('boom')
+                return {**event, 'done': True}
+        
+        processor = SlowProcessor({'concurrency': 4})
+        events = [{'n': i} for i in range(10)]
+        results = asyncio.run(processor.process_batch(events))
+        
+        self.assertEqual([r['n'] for r in results], list(range(10)))
+        self.assertNotIn('done', results[3])
+        self.assertEqual(processor.max_in_flight, 4)
+        stats = processor.get_stats()
+        self.assertEqual(stats['processed'], 9)
+        self.assertEqual(stats['errors'], 1)
+    
+    def test_sync_processor_batch_fast_path(self):
+        """Test that sync processors batch through process_sync and still yield."""
+        class UpperProcessor(SyncProcessor):
+            SYNC_YIELD_EVERY = 2
+            
+            def process_sync(self, event):
+                if event['message'] == 'bad':
+                    raise ValueError('boom')
+                return {**event, 'message': event['message'].upper()}
+        
+        processor = UpperProcessor({})
+        events = [{'message': 'a'}, {'message': 'bad'}, {'message': 'c'}, {'message': 'd'}]
+        
+        with patch('pipeline.processor.asyncio.sleep', wraps=asyncio.sleep) as mock_sleep:
+            results = asyncio.run(processor.process_batch(events))
+        
+        self.assertEqual([r['message'] for r in results], ['A', 'bad', 'C', 'D'])
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(processor.get_stats()['errors'], 1)
+        self.assertEqual(asyncio.run(processor.process({'message': 'x'}))['message'], 'X')
+    
+    def test_pipeline_fuses_adjacent_sync_processors(self):
+        """Test that adjacent stock sync processors share one pass per batch."""
+        class UpperProcessor(SyncProcessor):
+            def process_sync(self, event):
+                if event['message'] == 'bad':
+                    raise ValueError('boom')
+                return {**event, 'message': event['message'].upper()}
+        
+        pipeline = Pipeline({})
+        drop = DropFieldsProcessor({'drop_fields': ['secret']})
+        upper = UpperProcessor({})
+        tags = AddTagsProcessor({'add_tags': {'seen': 'true'}})
+        service = ServiceFromPathProcessor({})
+        for processor in (drop, upper, tags, service):
+            pipeline.add_processor(processor)
+        
+        # ServiceFromPath keeps its own columnar batch, so it is not fused
+        self.assertEqual(pipeline._stages, [(drop, upper, tags), service])
+        
+        events = [{'message': 'a', 'secret': 1}, {'message': 'bad', 'secret': 2}]
+        with patch.object(Processor, '_process_batch_sync') as batch_sync:
+            results = asyncio.run(pipeline.process_events(events))
+        
+        batch_sync.assert_not_called()
+        self.assertEqual([r['message'] for r in results], ['A', 'bad'])
+        for result in results:
+            self.assertNotIn('secret', result)
+            self.assertEqual(result['tags']['seen'], 'true')
+        self.assertEqual(upper.get_stats()['processed'], 1)
+        self.assertEqual(upper.get_stats()['errors'], 1)
+        self.assertEqual(tags.get_stats()['processed'], 2)
+        self.assertGreater(tags.get_stats()['total_ns'], 0)
+    
+    def test_fused_batch_records_stats_when_cancelled(self):
+        """Test that a cancelled fused batch still records the events it finished."""
+        class CountProcessor(SyncProcessor):
+            SYNC_YIELD_EVERY = 1
+            
+            def process_sync(self, event):
+                return event
+        
+        first, second = CountProcessor({}, 'first'), CountProcessor({}, 'second')
+        parent = Processor({}, 'parent')
+        
+        async def run():
+            task = asyncio.create_task(
+                run_fused_batch([first, second], [{'n': i} for i in range(10)], parent=parent))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        
+        asyncio.run(run())
+        
+        self.assertEqual(first.get_stats()['processed'], 1)
+        self.assertEqual(second.get_stats()['processed'], 1)
+        self.assertEqual(parent.get_stats()['processed'], 1)
+
+
+
+class TestProcessingContext(unittest.TestCase):
+    """Test processing context audit logging."""
+    
+    def test_audit_log_bounded(self):
+        """Test that the audit log keeps only the newest entries."""
+        context = ProcessingContext('test', audit_max=2)
+        context.add_audit_entry('DropFields', 'drop')
+        context.add_audit_entry('MaskPatterns', 'mask', {'count': 1})
+        context.add_audit_entry('HashFields', 'hash')
+        
+        audit_log = context.to_dict()['audit_log']
+        self.assertEqual([e['processor'] for e in audit_log], ['MaskPatterns', 'HashFields'])
+        self.assertEqual(audit_log[0]['details'], {'count': 1})
+        self.assertEqual(audit_log[1]['details'], {})
 
 
 if __name__ == '__main__':
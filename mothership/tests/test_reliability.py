@@ -15,6 +15,7 @@ from app.storage.reliability import (
 )
 from app.storage.resilient_sink import ResilientSink
 from app.storage.protocols import StorageSink
+from app.reliability import CircuitBreaker, CircuitState, IdempotencyManager, RetryManager
 
 
 class TestResponseRetryLogic:
@@ -122,6 +123,35 @@ class TestSinkRetryManager:
             backoff = retry_manager.calculate_backoff(3)  # Fourth retry - should be capped
             assert backoff == 8.0  # 8000ms = 8s (max_backoff_ms)
             
+    def test_backoff_jitter_modes(self):
+        """Test that sink retries honour jitter_mode without keeping per-sink state."""
+        full = SinkRetryManager("test", {'jitter_mode': 'full', 'initial_backoff_ms': 100,
+                                         'max_backoff_ms': 1000})
+        decorrelated = SinkRetryManager("test", {'jitter_mode': 'decorrelated',
+                                                 'initial_backoff_ms': 100, 'max_backoff_ms': 1000})
+        
+        with patch('app.storage.reliability.random.uniform', side_effect=lambda low, high: high):
+            assert full.calculate_backoff(2) == 0.4
+            assert decorrelated.calculate_backoff(0) == 0.3
+            assert decorrelated.calculate_backoff(1, prev_backoff_ms=300) == 0.9
+            assert decorrelated.calculate_backoff(2, prev_backoff_ms=900) == 1.0
+            assert decorrelated.calculate_backoff(1, retry_after=5.0) == 5.0
+        
+        assert SinkRetryManager("test", {'jitter_mode': 'bogus'}).jitter_mode == 'symmetric'
+    
+    @pytest.mark.asyncio
+    async def test_decorrelated_delay_chained_per_call(self):
+        """Test that execute_with_retry carries the previous delay within one call only."""
+        retry_manager = SinkRetryManager("test", {'jitter_mode': 'decorrelated', 'max_retries': 2,
+                                                  'initial_backoff_ms': 100, 'max_backoff_ms': 1000})
+        operation = AsyncMock(side_effect=[httpx.ConnectError("down"), httpx.ConnectError("down"), "ok"])
+        
+        with patch('app.storage.reliability.random.uniform', side_effect=lambda low, high: high), \
+                patch('app.storage.reliability.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            assert await retry_manager.execute_with_retry(operation, []) == "ok"
+        
+        assert [c.args[0] for c in mock_sleep.await_args_list] == [0.3, 0.9]
+    
     def test_backoff_respects_retry_after(self):
         """Test that Retry-After header is respected."""
         retry_manager = SinkRetryManager("test", {})
@@ -581,4 +611,169 @@ class TestResilientSink:
         await resilient.stop()
         
         # Queue processor should eventually succeed
-        assert len(mock_sink.calls) >= 1
\ No newline at end of file
+        assert len(mock_sink.calls) >= 1
+
+
+class TestCircuitBreakerStates:
+    """Test state handling in the per-sink CircuitBreaker."""
+    
+    def test_state_cycle(self):
+        """Test closed -> open -> half-open -> closed and reopening from half-open."""
+        breaker = CircuitBreaker("test", {'failure_threshold': 2, 'open_duration_sec': 10})
+        
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED and breaker.can_execute()
+        
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN and not breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state == CircuitState.OPEN
+        
+        breaker.opened_time -= 10
+        assert breaker.can_execute() and breaker.state == CircuitState.HALF_OPEN
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        
+        breaker.opened_time -= 10
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED and breaker.failure_count == 0
+        assert breaker.get_state_info()['state'] == 'CLOSED'
+        assert breaker.state == 0 and hash(CircuitState.HALF_OPEN) == 2
+    
+    def test_half_open_admits_limited_trials(self):
+        """Test that half-open state hands out at most half_open_max_inflight slots."""
+        breaker = CircuitBreaker("test", {'failure_threshold': 1, 'open_duration_sec': 10,
+                                          'half_open_max_inflight': 2})
+        breaker.record_failure()
+        breaker.opened_time -= 10
+        
+        assert [breaker.can_execute() for _ in range(3)] == [True, True, False]
+        assert breaker.half_open_requests == 2
+        breaker.record_success()
+        assert breaker.can_execute() and breaker.half_open_requests == 0
+    
+    def test_abandoned_half_open_trial_expires(self):
+        """Test that a reserved trial that never reports back does not wedge the breaker."""
+        breaker = CircuitBreaker("test", {'failure_threshold': 1, 'open_duration_sec': 10})
+        breaker.record_failure()
+        breaker.opened_time -= 10
+        
+        # The trial caller is cancelled before record_success/record_failure
+        assert breaker.can_execute() and breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.can_execute()
+        
+        breaker.half_open_time -= 10
+        assert breaker.can_execute() and breaker.half_open_requests == 1
+        assert not breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_state_info_reports_wall_clock_times(self):
+        """Test that get_state_info reports epoch seconds, not monotonic readings."""
+        breaker = CircuitBreaker("test", {'failure_threshold': 1, 'open_duration_sec': 10})
+        assert breaker.get_state_info()['last_failure_time'] == 0
+        
+        with patch('app.reliability.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('app.reliability.time.monotonic', return_value=105.0), \
+                patch('app.reliability.time.time', return_value=1700000000.0):
+            info = breaker.get_state_info()
+        
+        assert info['last_failure_time'] == 1699999995.0
+        assert info['opened_time'] == 1699999995.0
+    
+    def test_open_reads_clock_once(self):
+        """Test that a failure which opens the breaker reads the monotonic clock once."""
+        breaker = CircuitBreaker("test", {'failure_threshold': 1, 'open_duration_sec': 10})
+        
+        with patch('app.reliability.time.monotonic', return_value=50.0) as mock_clock:
+            breaker.record_failure()
+        
+        assert mock_clock.call_count == 1
+        assert breaker.opened_time == breaker.last_failure_time == 50.0
+
+class TestRetryManagerDecisions:
+    """Test retry decisions and Retry-After handling in RetryManager."""
+    
+    def test_should_retry_by_status(self):
+        """Test that only missing statuses, 429 and 5xx are retried."""
+        manager = RetryManager("test", {'max_retries': 3})
+        
+        def error_with_status(status_code):
+            error = Exception("boom")
+            error.response = MagicMock(status_code=status_code)
+            return error
+        
+        assert manager.should_retry(0, Exception("timeout"))
+        assert manager.should_retry(0, error_with_status(None))
+        assert manager.should_retry(0, error_with_status(429))
+        assert manager.should_retry(0, error_with_status(501))
+        assert not manager.should_retry(0, error_with_status(404))
+        assert not manager.should_retry(0, error_with_status(302))
+        assert not manager.should_retry(3, error_with_status(503))
+    
+    def test_retry_after_seconds_and_http_date(self):
+        """Test that Retry-After accepts delta-seconds and HTTP dates."""
+        manager = RetryManager("test", {})
+        
+        assert manager.get_retry_after_delay({'retry-after': '7'}) == 7.0
+        assert manager.get_retry_after_delay(httpx.Headers({'RETRY-AFTER': '3'})) == 3.0
+        assert manager.get_retry_after_delay({}) is None
+        assert manager.get_retry_after_delay({'Retry-After': 'soon'}) is None
+        with patch('app.reliability.time.time', return_value=1192874390.0):
+            assert manager.get_retry_after_delay({'Retry-After': 'Sat, 20 Oct 2007 10:00:00 GMT'}) == 10.0
+            assert manager.get_retry_after_delay({'retry-after': 'Sat, 20 Oct 2007 09:00:00 GMT'}) == 0.0
+    
+    def test_jitter_modes(self):
+        """Test that full and decorrelated jitter stay within their bounds."""
+        full = RetryManager("test", {'jitter_mode': 'full', 'initial_backoff_ms': 100, 'max_backoff_ms': 1000})
+        decorrelated = RetryManager("test", {'jitter_mode': 'decorrelated',
+                                             'initial_backoff_ms': 100, 'max_backoff_ms': 1000})
+        
+        with patch('app.reliability.random.uniform', side_effect=lambda low, high: high):
+            assert full.calculate_backoff(2) == 0.4
+            delays, prev_ms = [], None
+            for attempt in range(4):
+                delays.append(decorrelated.calculate_backoff(attempt, prev_ms))
+                prev_ms = delays[-1] * 1000
+            assert delays == [0.3, 0.9, 1.0, 1.0]
+            assert decorrelated.calculate_backoff(0, prev_ms) == 0.3
+            # No state is kept on the manager between calls
+            assert decorrelated.calculate_backoff(1) == 0.3
+        
+        assert RetryManager("test", {'jitter_mode': 'bogus'}).jitter_mode == 'symmetric'
+
+class TestIdempotencyManager:
+    """Test batch key generation and duplicate detection."""
+    
+    def test_batch_key_ignores_item_order(self):
+        """Test that batch keys depend on content, not item order."""
+        manager = IdempotencyManager({})
+        batch = [{"message": "a", "timestamp": 1}, {"message": "b", "timestamp": 2}]
+        
+        key = manager.generate_batch_key(batch)
+        assert key == manager.generate_batch_key(list(reversed(batch)))
+        assert len(key) == 32
+        assert key != manager.generate_batch_key([{"message": "a", "timestamp": 2}, {"message": "b", "timestamp": 1}])
+    
+    def test_batch_key_field_boundaries(self):
+        """Test that shifting text between message and timestamp changes the key."""
+        manager = IdempotencyManager({})
+        
+        assert (manager.generate_batch_key([{"message": "ab", "timestamp": "c"}]) !=
+                manager.generate_batch_key([{"message": "a", "timestamp": "bc"}]))
+    
+    def test_expired_keys_evicted_oldest_first(self):
+        """Test that keys leave the cache once they fall outside the window."""
+        manager = IdempotencyManager({'window_sec': 10})
+        
+        with patch('app.reliability.time.time', side_effect=[100.0, 105.0, 105.0, 112.0, 112.0]):
+            assert not manager.is_duplicate("a")
+            assert not manager.is_duplicate("b")
+            assert manager.is_duplicate("b")
+            assert not manager.is_duplicate("a")
+            assert list(manager._seen_keys) == ["b", "a"]
+            assert manager.is_duplicate("b")
@@ -3,6 +3,7 @@ import unittest
 import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 import json
+from datetime import datetime
 import sys
 import os
 from pathlib import Path
@@ -117,6 +118,68 @@ class TestIngestEndpoint(unittest.TestCase):
         for event in processed_events:
             self.assertTrue(event['processed'])
     
+    def test_ingest_runs_pipeline_once_per_batch(self):
+        """Test that /ingest runs the batch through the pipeline in one call, falling back per event."""
+        from app.server import app, app_state
+        
+        sinks_manager = MagicMock()
+        sinks_manager.write_events = AsyncMock(return_value={})
+        pipeline = MagicMock()
+        pipeline.process_events = AsyncMock(side_effect=lambda events: events)
+        pipeline.process_single_event = AsyncMock(side_effect=[ValueError('bad'), {'type': 'ok'}])
+        body = {'messages': [{'type': 'syslog'}, {'type': 'log'}]}
+        client = TestClient(app)
+        
+        with patch.dict(app_state, {'pipeline': pipeline, 'sinks_manager': sinks_manager}):
+            self.assertEqual(client.post('/ingest', json=body).json()['processed_events'], 2)
+            pipeline.process_events.assert_awaited_once()
+            pipeline.process_single_event.assert_not_called()
+            
+            pipeline.process_events.side_effect = RuntimeError('batch failed')
+            self.assertEqual(client.post('/ingest', json=body).json()['processed_events'], 1)
+            self.assertEqual(pipeline.process_single_event.await_count, 2)
+    
+    def test_ingest_response_serialized_by_model(self):
+        """Test that the /ingest response body is the model's own JSON serialization."""
+        from app.server import app, app_state
+        
+        sinks_manager = MagicMock()
+        sinks_manager.write_events = AsyncMock(return_value={
+            'loki': {'written': 1, 'last_write': datetime(2024, 1, 1, 12, 0, 0)}
+        })
+        pipeline = MagicMock()
+        pipeline.process_events = AsyncMock(side_effect=lambda events: events)
+        client = TestClient(app)
+        
+        with patch.dict(app_state, {'pipeline': pipeline, 'sinks_manager': sinks_manager}):
+            response = client.post('/ingest', json={'messages': [{'type': 'syslog'}]})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-type'], 'application/json')
+        result = response.json()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['processed_events'], 1)
+        self.assertIsNone(result['errors'])
+        self.assertEqual(result['sink_results']['loki'],
+                         {'written': 1, 'last_write': '2024-01-01T12:00:00'})
+    
+    def test_per_event_failures_logged_sparingly(self):
+        """Test that only the first few per-event failures are logged while all are counted."""
+        from app.server import _process_events_individually, _EVENT_ERROR_LOG_LIMIT
+        from app.metrics import mship_event_errors_total
+        
+        pipeline = MagicMock()
+        pipeline.process_single_event = AsyncMock(side_effect=ValueError('bad'))
+        events = [{'type': 'log'} for _ in range(_EVENT_ERROR_LOG_LIMIT + 3)]
+        before = mship_event_errors_total._value.get()
+        
+        with patch('app.server.logger') as mock_logger:
+            self.assertEqual(asyncio.run(_process_events_individually(pipeline, events)), [])
+        
+        self.assertEqual(mock_logger.error.call_count, _EVENT_ERROR_LOG_LIMIT)
+        self.assertEqual(mock_logger.warning.call_args.kwargs['suppressed'], 3)
+        self.assertEqual(mship_event_errors_total._value.get() - before, len(events))
+    
     def test_pipeline_failure(self):
         """Test handling of pipeline failures."""
         self.mock_pipeline.should_fail = True
@@ -199,6 +262,75 @@ class TestRequestValidation(unittest.TestCase):
         event = Event(**event_data)
         # Should not raise validation error
         self.assertEqual(event.type, 'syslog')
+    
+    def test_parse_ingest_body_from_bytes(self):
+        """Test that raw ingest bodies are parsed and validated in one step."""
+        from app.server import IngestRequest, _parse_ingest_body
+        from fastapi.exceptions import RequestValidationError
+        
+        body = b'{"messages": [{"type": "syslog", "message": "hi", "extra": 1, "data": {"k": [1]}}]}'
+        events = _parse_ingest_body(body)
+        self.assertEqual(events, [event.model_dump() for event in IngestRequest.model_validate_json(body).messages])
+        self.assertEqual(list(events[0]), ['timestamp', 'type', 'source', 'message', 'data', 'extra'])
+        
+        with self.assertRaises(RequestValidationError) as ctx:
+            _parse_ingest_body(b'{"messages": [{"message": "no type"}]}')
+        self.assertEqual(ctx.exception.errors()[0]['loc'], ('body', 'messages', 0, 'type'))
+        
+        with self.assertRaises(RequestValidationError):
+            _parse_ingest_body(b'{not json')
+    
+    def test_gzip_ingest_body_inflated(self):
+        """Test that gzip-encoded ingest bodies are inflated and bad ones rejected."""
+        import gzip
+        from app.server import app
+        
+        client = TestClient(app)
+        payload = gzip.compress(json.dumps({'messages': []}).encode())
+        
+        response = client.post('/ingest', content=payload, headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['processed_events'], 0)
+        
+        response = client.post('/ingest', content=payload[:-8], headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 400)
+        
+        response = client.post('/ingest', content=b'not gzip', headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_large_ingest_body_parsed_in_thread(self):
+        """Test that only bodies over the threshold are parsed off the event loop."""
+        from app import server
+        
+        client = TestClient(server.app)
+        payload = json.dumps({'messages': []}).encode()
+        
+        with patch('app.server.asyncio.to_thread', wraps=asyncio.to_thread) as mock_to_thread:
+            self.assertEqual(client.post('/ingest', content=payload).status_code, 200)
+            mock_to_thread.assert_not_called()
+            
+            with patch.object(server, '_THREADED_PARSE_MIN_BYTES', len(payload) - 1):
+                self.assertEqual(client.post('/ingest', content=payload).status_code, 200)
+            mock_to_thread.assert_called_once_with(server._parse_ingest_body, payload)
+    
+    def test_ingest_size_limits(self):
+        """Test that oversized and over-inflating bodies are rejected with 413."""
+        import gzip
+        from app.server import app, app_state
+        
+        client = TestClient(app)
+        bomb = gzip.compress(b' ' * 10000 + json.dumps({'messages': []}).encode())
+        
+        with patch.dict(app_state, {'ingest_limits': (len(bomb), 1000)}):
+            response = client.post('/ingest', content=bomb, headers={'Content-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 413)
+            
+            response = client.post('/ingest', content=b' ' * (len(bomb) + 1) + b'{}')
+            self.assertEqual(response.status_code, 413)
+        
+        with patch.dict(app_state, {'ingest_limits': (len(bomb), 20000)}):
+            response = client.post('/ingest', content=bomb, headers={'Content-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
 
 class TestHealthEndpoint(unittest.TestCase):
     """Test health check endpoint logic."""
@@ -240,6 +372,65 @@ class TestHealthEndpoint(unittest.TestCase):
         
         self.assertEqual(result['status'], 'degraded')
         self.assertFalse(result['database'])
+    
+    def test_healthz_uses_sinks_resolved_at_startup(self):
+        """Test that /healthz and /stats report the sinks and processors cached at startup."""
+        from app.server import app, app_state
+        
+        sink = MagicMock()
+        sink.health_check = AsyncMock(return_value=True)
+        sink.get_stats.return_value = {'written': 1}
+        client = TestClient(app)
+        
+        with patch.dict(app_state, {'sinks': (('loki', sink, True),), 'enabled_sinks': ['loki'],
+                                    'processor_names': ['RedactionPipeline']}):
+            result = client.get('/healthz').json()
+            stats = client.get('/stats').json()
+        
+        self.assertEqual(result['sinks'], {'loki': {'healthy': True, 'enabled': True}})
+        self.assertEqual(result['enabled_sinks'], ['loki'])
+        self.assertEqual(result['pipeline_processors'], ['RedactionPipeline'])
+        self.assertEqual(stats['sinks'], {'loki': {'written': 1}})
+        sink.is_enabled.assert_not_called()
+        self.assertEqual(client.get('/').json()['endpoints']['health'], '/healthz')
+    
+    def test_healthz_checks_run_concurrently(self):
+        """Test that sink and database checks overlap and a failing sink reports unhealthy."""
+        from app.server import app, app_state
+        
+        started = []
+        
+        async def slow_check(name):
+            started.append(name)
+            await asyncio.sleep(0.05)
+            # Every check has started before any one of them finishes
+            return len(started) == 3
+        
+        loki, tsdb_sink, tsdb_writer = MagicMock(), MagicMock(), MagicMock()
+        loki.health_check = lambda: slow_check('loki')
+        tsdb_sink.health_check = AsyncMock(side_effect=ConnectionError('down'))
+        tsdb_writer.health_check = lambda: slow_check('db')
+        sinks = (('loki', loki, True), ('timescaledb', tsdb_sink, True), ('spare', loki, False))
+        
+        with patch.dict(app_state, {'sinks': sinks, 'tsdb_writer': tsdb_writer}):
+            result = TestClient(app).get('/healthz').json()
+        
+        self.assertEqual(result['status'], 'healthy')
+        self.assertEqual(result['sinks']['loki'], {'healthy': True, 'enabled': True})
+        self.assertEqual(result['sinks']['timescaledb'], {'healthy': False, 'enabled': True})
+        self.assertEqual(result['sinks']['spare'], {'healthy': True, 'enabled': False})
+
+    def test_health_timestamp_cached_per_second(self):
+        """Test that the health timestamp is formatted once per wall-clock second."""
+        from app.server import _utcnow_iso
+        
+        with patch('app.server.time.time', side_effect=[1700000000.2, 1700000000.9, 1700000001.0]), \
+                patch('app.server.datetime') as mock_datetime:
+            mock_datetime.fromtimestamp.side_effect = datetime.fromtimestamp
+            self.assertEqual(_utcnow_iso(), '2023-11-14T22:13:20Z')
+            self.assertEqual(_utcnow_iso(), '2023-11-14T22:13:20Z')
+            self.assertEqual(_utcnow_iso(), '2023-11-14T22:13:21Z')
+            self.assertEqual(mock_datetime.fromtimestamp.call_count, 2)
 
 class TestStatsEndpoint(unittest.TestCase):
     """Test statistics endpoint logic."""
@@ -267,6 +458,36 @@ class TestStatsEndpoint(unittest.TestCase):
         self.assertEqual(result['pipeline']['total_events'], 1)
         self.assertEqual(result['database']['total_inserts'], 2)
         self.assertIn('processors', result['pipeline'])
+    
+    def test_stats_endpoint_serializes_processor_stats(self):
+        """Test that /stats returns processor stats views as JSON."""
+        from app.server import app, app_state
+        from app.pipeline.processor import Pipeline
+        from app.pipeline.processors_enrich import AddTagsProcessor
+        
+        pipeline = Pipeline({})
+        pipeline.add_processor(AddTagsProcessor({'add_tags': {'env': 'test'}}))
+        asyncio.run(pipeline.process_events([{'message': 'a'}]))
+        
+        with patch.dict(app_state, {'pipeline': pipeline, 'processor_names': ['AddTagsProcessor'],
+                                    'sinks': (), 'tsdb_writer': None, 'startup_time': 0}):
+            response = TestClient(app).get('/stats')
+        
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['pipeline']['processors']['AddTagsProcessor']
+        self.assertEqual(stats['processed'], 1)
+        self.assertEqual(stats['errors'], 0)
+    
+    def test_metrics_rendered_in_worker_thread(self):
+        """Test that /metrics renders the exposition off the event loop."""
+        from app import server
+        
+        with patch('app.server.asyncio.to_thread', wraps=asyncio.to_thread) as mock_to_thread:
+            response = TestClient(server.app).get('/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('mship_ingest_batches_total', response.text)
+        mock_to_thread.assert_called_once_with(server.get_metrics_payload)
 
 class TestDataFlow(unittest.TestCase):
     """Test end-to-end data flow."""